@@ -1,12 +1,18 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+import subprocess
+import sys
+
+# Compile assets, stylesheet and .ui files into resources_rc.py, which is
+# bundled as a module instead of loose data files
+subprocess.check_call([sys.executable, 'build_resources.py'], cwd=SPECPATH)
 
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('ui', 'ui'), ('assets', 'assets'), ('styles', 'styles')],
-    hiddenimports=[],
+    datas=[],
+    hiddenimports=['resources_rc'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
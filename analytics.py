@@ -0,0 +1,141 @@
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+# ===== SESSION ANALYTICS =====
+
+SESSION_DTYPE = np.dtype([
+    ('project_id', np.int64),
+    ('started_at', np.float64),
+    ('ended_at', np.float64),
+])
+
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+SESSION_PERCENTILES = [50, 75, 90, 95, 99]
+
+SECONDS_PER_HOUR = 3600
+HOURS_PER_WEEK = 7 * 24
+
+# 1970-01-01 (day 0 of the Unix epoch) was a Thursday
+EPOCH_WEEKDAY = 3
+
+
+def load_sessions(db, since=None):
+    """Load all sessions into a structured NumPy array in one pass over the cursor"""
+    return np.fromiter(db.iter_session_rows(since), dtype=SESSION_DTYPE)
+
+
+def local_utc_offset():
+    """Current offset of local time from UTC in seconds"""
+    return time.localtime().tm_gmtoff
+
+
+def local_utc_offsets(utc_hours):
+    """Offset of local time from UTC (seconds) in effect during each UTC hour.
+
+    Looked up once per distinct hour, so sessions on either side of a
+    daylight saving change each get their own offset.
+    """
+    unique_hours, inverse = np.unique(utc_hours, return_inverse=True)
+    offsets = np.array([time.localtime(int(hour) * SECONDS_PER_HOUR).tm_gmtoff for hour in unique_hours],
+                       dtype=np.float64)
+    return offsets[inverse]
+
+
+def split_into_hours(sessions):
+    """Split sessions at local hour boundaries.
+
+    Returns (session_index, hour_bucket, seconds) arrays, where hour_bucket
+    counts local hours since the epoch. Every piece lies inside one hour,
+    so weekday, hour-of-day and weekly totals can all be bincounted from it.
+    """
+    starts = sessions['started_at']
+    ends = np.maximum(sessions['ended_at'], starts)
+
+    # Split at UTC hour boundaries, where the local offset cannot change
+    first_hour = np.floor(starts / SECONDS_PER_HOUR).astype(np.int64)
+    last_hour = np.maximum(np.ceil(ends / SECONDS_PER_HOUR).astype(np.int64) - 1, first_hour)
+    pieces_per_session = last_hour - first_hour + 1
+
+    session_index = np.repeat(np.arange(len(sessions)), pieces_per_session)
+    piece_offsets = np.arange(len(session_index)) - np.repeat(
+        np.cumsum(pieces_per_session) - pieces_per_session, pieces_per_session)
+    utc_hour = first_hour[session_index] + piece_offsets
+
+    offsets = local_utc_offsets(utc_hour)
+    local_start = np.maximum(utc_hour * SECONDS_PER_HOUR, starts[session_index]) + offsets
+    local_end = np.minimum((utc_hour + 1) * SECONDS_PER_HOUR, ends[session_index]) + offsets
+
+    # With a half or quarter hour offset a UTC hour spans two local hours
+    hour_bucket = np.floor(local_start / SECONDS_PER_HOUR).astype(np.int64)
+    boundary = (hour_bucket + 1) * SECONDS_PER_HOUR
+    crosses = local_end > boundary
+
+    return (np.concatenate([session_index, session_index[crosses]]),
+            np.concatenate([hour_bucket, hour_bucket[crosses] + 1]),
+            np.concatenate([np.minimum(local_end, boundary) - local_start, local_end[crosses] - boundary[crosses]]))
+
+
+def weekday_hour_heatmap(hour_bucket, seconds):
+    """7x24 matrix of tracked hours, rows Monday..Sunday, columns hour of day"""
+    weekday = (hour_bucket // 24 + EPOCH_WEEKDAY) % 7
+    hour_of_day = hour_bucket % 24
+    totals = np.bincount(weekday * 24 + hour_of_day, weights=seconds, minlength=HOURS_PER_WEEK)
+    return totals.reshape(7, 24) / SECONDS_PER_HOUR
+
+
+def weekly_project_trend(project_ids, hour_bucket, seconds, weeks=12):
+    """Tracked hours per project for each of the last `weeks` local weeks.
+
+    Returns (week_start_dates, project_ids, matrix) where matrix has one
+    row per project and one column per week (oldest first).
+    """
+    # Week number counted from the Monday before the epoch
+    week = (hour_bucket // 24 + EPOCH_WEEKDAY) // 7
+    current_week = (int(time.time() + local_utc_offset()) // 86400 + EPOCH_WEEKDAY) // 7
+    first_week = current_week - weeks + 1
+
+    # Sessions dated after this week (clock skew, imported rows) are left out too
+    in_range = (week >= first_week) & (week <= current_week)
+    week = week[in_range] - first_week
+    project_ids = project_ids[in_range]
+    seconds = seconds[in_range]
+
+    unique_projects, project_index = np.unique(project_ids, return_inverse=True)
+    totals = np.bincount(project_index * weeks + week, weights=seconds,
+                         minlength=len(unique_projects) * weeks)
+
+    epoch_monday = date(1970, 1, 1) - timedelta(days=EPOCH_WEEKDAY)
+    week_starts = [epoch_monday + timedelta(weeks=first_week + i) for i in range(weeks)]
+
+    return week_starts, unique_projects, totals.reshape(len(unique_projects), weeks) / SECONDS_PER_HOUR
+
+
+def session_length_percentiles(sessions, percentiles=SESSION_PERCENTILES):
+    """Percentiles of session length in seconds, as a {percentile: seconds} dict"""
+    durations = sessions['ended_at'] - sessions['started_at']
+    if len(durations) == 0:
+        return {p: 0.0 for p in percentiles}
+    return dict(zip(percentiles, np.percentile(durations, percentiles).tolist()))
+
+
+def compute_report(db, weeks=12):
+    """Run every aggregate over the session history and return them in one dict"""
+    sessions = load_sessions(db)
+    session_index, hour_bucket, seconds = split_into_hours(sessions)
+
+    heatmap = weekday_hour_heatmap(hour_bucket, seconds)
+    week_starts, trend_projects, trend = weekly_project_trend(
+        sessions['project_id'][session_index], hour_bucket, seconds, weeks)
+
+    return {
+        'session_count': len(sessions),
+        'total_hours': float(seconds.sum()) / SECONDS_PER_HOUR,
+        'weekday_hours': heatmap.sum(axis=1),
+        'heatmap': heatmap,
+        'week_starts': week_starts,
+        'trend_projects': trend_projects,
+        'trend': trend,
+        'percentiles': session_length_percentiles(sessions),
+    }
@@ -0,0 +1,342 @@
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from urllib.parse import urlsplit
+
+from database_manager import DatabaseManager
+
+# ===== LOCAL HTTP / JSON API =====
+#
+# Read endpoints:
+#   GET  /projects                  per-project totals and status counts
+#   GET  /projects/<id>/tasks       tasks of one project
+#   GET  /totals                    totals over the whole database
+#   GET  /running                   running task(s) with their session start
+# Timer control (only when the server is given a controller):
+#   POST /timer/start               body {"task": <id or name>}
+#   POST /timer/pause               body {"task": <id or name>} (optional, default: all)
+#
+# GET responses carry an ETag derived from PRAGMA data_version, which only
+# changes when a commit happens. Polling with If-None-Match costs a single
+# pragma and an empty 304 while nothing changes, and even without it the
+# cached body is reused until the next commit.
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 64 * 1024
+
+PROJECT_TASKS_PATH = re.compile(r'^/projects/(\d+)/tasks$')
+
+STATUS_TEXT = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    409: 'Conflict',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class ApiServer:
+    """Embedded asyncio HTTP server running on its own thread.
+
+    controller, if given, is called with a command dict ({'action': 'start',
+    'task': ...} or {'action': 'pause'}, optionally with 'task') and returns a reply dict with 'ok'
+    and 'message' (see TimeTrackerApp.handle_remote_command). It is called
+    from a worker thread.
+    """
+
+    def __init__(self, db_path, controller=None, host=DEFAULT_HOST, port=DEFAULT_PORT, pool_size=4):
+        self.pool_size = pool_size
+        self.controller = controller
+        self.host = host
+        self.port = port
+        self.open_database(db_path)
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+        self.connections = {}  # handler task -> writer of each open (keep-alive) connection
+
+    def open_database(self, db_path):
+        """Serve db_path, starting with an empty cache"""
+        self.db = DatabaseManager(db_path, read_only=True, pool_size=self.pool_size)
+        # data_version is only meaningful on one long-lived connection
+        self.version_connection = self.db.open_connection()
+        # A new token per database, so no ETag of the previous one matches
+        self.instance_token = uuid.uuid4().hex[:8]
+        self.cache = {}
+
+    def set_database(self, db_path):
+        """Serve another database file (the app switched workspace). Callable from any thread."""
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.switch_database, db_path)
+        else:
+            self.switch_database(db_path)
+
+    def switch_database(self, db_path):
+        """Swap the database on the server thread, between requests"""
+        if db_path == self.db.db_path:
+            return
+        old_db, old_version_connection = self.db, self.version_connection
+        self.open_database(db_path)
+        old_version_connection.close()
+        old_db.close()
+        print(f"API server now serving {db_path}")
+
+    # ===== LIFECYCLE =====
+
+    def start(self):
+        """Start serving on a background thread. Returns once the port is bound."""
+        self.thread = threading.Thread(target=self.run, name="ApiServer", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.server is None:
+            raise OSError(f"Could not listen on {self.host}:{self.port}")
+        print(f"API server listening on http://{self.host}:{self.port}")
+
+    def run(self):
+        """Thread body: run the event loop until stop() is called"""
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.server = self.loop.run_until_complete(
+                asyncio.start_server(self.handle_connection, self.host, self.port))
+        except OSError as e:
+            print(f"API server failed to start: {e}")
+            self.ready.set()
+            return
+
+        self.ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.server.close()
+            # Idle keep-alive connections would otherwise wait for a request
+            # forever: closing them ends their handlers at the next read
+            for writer in self.connections.values():
+                writer.close()
+            self.loop.run_until_complete(asyncio.gather(*self.connections, return_exceptions=True))
+            self.loop.run_until_complete(self.server.wait_closed())
+            self.loop.close()
+
+    def stop(self):
+        """Stop the server and close its connections"""
+        if self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+        self.version_connection.close()
+        self.db.close()
+
+    # ===== HTTP =====
+
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one (keep-alive) connection"""
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self.send(writer, 400, {'error': 'Malformed request line'}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length_text = headers.get('content-length', '') or '0'
+                if not length_text.isdecimal():
+                    await self.send(writer, 400, {'error': 'Invalid Content-Length'}, keep_alive=False)
+                    break
+                length = int(length_text)
+                if length > MAX_BODY_BYTES:
+                    await self.send(writer, 413, {'error': 'Request body too large'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                status, payload, etag = await self.dispatch(method, urlsplit(target).path, body)
+
+                if status == 200 and etag is not None and headers.get('if-none-match') == etag:
+                    await self.send(writer, 304, None, etag, keep_alive)
+                else:
+                    await self.send(writer, status, payload, etag, keep_alive)
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.pop(task, None)
+            writer.close()
+
+    async def send(self, writer, status, payload, etag=None, keep_alive=True):
+        """Write one JSON response (payload may be pre-encoded bytes)"""
+        if payload is None:
+            body = b''
+        elif isinstance(payload, bytes):
+            body = payload
+        else:
+            body = json.dumps(payload).encode('utf-8')
+
+        head = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            "Cache-Control: no-cache",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if etag is not None:
+            head.append(f"ETag: {etag}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def dispatch(self, method, path, body):
+        """Route a request, returns (status, payload, etag)"""
+        if path.startswith('/timer/'):
+            if method != 'POST':
+                return 405, {'error': 'Use POST'}, None
+            return await self.control(path, body)
+
+        if method != 'GET':
+            return 405, {'error': 'Use GET'}, None
+
+        if path == '/projects':
+            query = self.read_projects
+        elif path == '/totals':
+            query = self.read_totals
+        elif path == '/running':
+            query = self.read_running
+        else:
+            match = PROJECT_TASKS_PATH.match(path)
+            if match is None:
+                return 404, {'error': f"Unknown path {path}"}, None
+            project_id = int(match.group(1))
+            query = lambda: self.read_tasks(project_id)
+
+        try:
+            return await self.cached(path, query)
+        except sqlite3.Error as e:
+            return 500, {'error': str(e)}, None
+
+    # ===== CACHING =====
+
+    def current_etag(self):
+        """ETag for the current database state"""
+        data_version = self.version_connection.execute('PRAGMA data_version').fetchone()[0]
+        return f'"{self.instance_token}-{data_version}"'
+
+    async def cached(self, path, query):
+        """Serve the cached body for path while the database is unchanged"""
+        etag = self.current_etag()
+        entry = self.cache.get(path)
+        if entry is not None and entry[0] == etag:
+            return 200, entry[1], etag
+
+        payload = await self.loop.run_in_executor(None, query)
+        if payload is None:
+            return 404, {'error': 'Not found'}, None
+
+        body = json.dumps(payload).encode('utf-8')
+        self.cache[path] = (etag, body)
+        return 200, body, etag
+
+    # ===== READ ENDPOINTS (run on executor threads) =====
+
+    def read_projects(self):
+        return [
+            {
+                'id': project_id,
+                'name': name,
+                'total_seconds': total_seconds,
+                'task_count': task_count,
+                'finished_count': finished_count,
+                'running_count': running_count,
+            }
+            for project_id, name, total_seconds, task_count, finished_count, running_count
+            in self.db.get_project_summaries()
+        ]
+
+    def read_tasks(self, project_id):
+        if self.db.get_project_summary(project_id) is None:
+            return None
+        return [
+            {
+                'id': task_id,
+                'name': name,
+                'total_seconds': total_seconds,
+                'is_finished': bool(is_finished),
+                'is_running': bool(is_running),
+            }
+            for task_id, name, total_seconds, is_finished, is_running
+            in self.db.get_tasks_for_project(project_id)
+        ]
+
+    def read_totals(self):
+        project_count, task_count, total_seconds, finished_count, running_count = self.db.get_totals()
+        return {
+            'project_count': project_count,
+            'task_count': task_count,
+            'total_seconds': total_seconds,
+            'finished_count': finished_count,
+            'running_count': running_count,
+        }
+
+    def read_running(self):
+        # Clients add (now - started_at) to total_seconds for the live time,
+        # so this response stays cacheable while the timer runs
+        return [
+            {
+                'task_id': task_id,
+                'project_id': project_id,
+                'name': name,
+                'total_seconds': total_seconds,
+                'started_at': started_at,
+            }
+            for task_id, project_id, name, total_seconds, started_at
+            in self.db.get_running_sessions()
+        ]
+
+    # ===== TIMER CONTROL =====
+
+    async def control(self, path, body):
+        """Forward a timer command to the controller"""
+        if self.controller is None:
+            return 404, {'error': 'Timer control is not enabled'}, None
+
+        try:
+            request = json.loads(body or b'{}')
+        except ValueError:
+            return 400, {'error': 'Body must be JSON'}, None
+        if not isinstance(request, dict):
+            return 400, {'error': 'Body must be a JSON object'}, None
+
+        if path == '/timer/start':
+            if 'task' not in request:
+                return 400, {'error': "Missing 'task'"}, None
+            command = {'action': 'start', 'task': str(request['task'])}
+        elif path == '/timer/pause':
+            command = {'action': 'pause'}
+            if request.get('task') is not None:
+                command['task'] = str(request['task'])
+        else:
+            return 404, {'error': f"Unknown path {path}"}, None
+
+        reply = await self.loop.run_in_executor(None, self.controller, command)
+        return (200 if reply.get('ok') else 409), reply, None
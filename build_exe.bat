@@ -2,13 +2,14 @@
 echo Building Time Tracker executable...
 echo.
 
+rem Assets, stylesheet and .ui files go into the exe as the resources_rc module
+python build_resources.py || exit /b 1
+
 pyinstaller --name="TimeTracker" ^
     --windowed ^
     --onefile ^
     --icon=assets/stopwatch.ico ^
-    --add-data="ui;ui" ^
-    --add-data="assets;assets" ^
-    --add-data="styles;styles" ^
+    --hidden-import=resources_rc ^
     main.py
 
 echo.
@@ -0,0 +1,185 @@
+import argparse
+import os
+import re
+import struct
+import sys
+import zlib
+
+# ===== COMPILED QT RESOURCES =====
+#
+# PyQt6 no longer ships pyrcc, so this writes the Qt resource bundle itself:
+# every file of assets/, styles/ and ui/ packed in the rcc binary format
+# (the format of "rcc -binary", version 1) inside resources_rc.py, which
+# registers it with QResource.registerResourceData on import. The app then
+# reads everything through :/ paths instead of loose files.
+#
+# The stylesheet is processed here rather than at every start: comments and
+# blank space are stripped and url(assets/...) is pointed into the bundle.
+#
+#   python build_resources.py
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESOURCE_DIRS = ('assets', 'styles', 'ui')
+OUTPUT_FILE = 'resources_rc.py'
+
+RCC_VERSION = 1
+FLAG_COMPRESSED = 0x01
+FLAG_DIRECTORY = 0x02
+LANGUAGE_C = 1  # QLocale::C with AnyTerritory (0): the file is not localized
+COMPRESS_THRESHOLD = 0.7  # Only compress when it saves at least 30%
+LINE_BYTES = 96  # Bytes per line of the generated literal
+
+
+def qt_hash(name):
+    """Qt's qt_hash() of a name, used to order and look up resource nodes"""
+    h = 0
+    for code_unit in struct.unpack(f'>{len(name.encode("utf-16-be")) // 2}H', name.encode('utf-16-be')):
+        h = (h << 4) + code_unit
+        h ^= (h & 0xf0000000) >> 23
+        h &= 0x0fffffff
+    return h
+
+
+def preprocess_stylesheet(text):
+    """Strip comments and blank space, and point url(assets/...) into the bundle"""
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.DOTALL)
+    text = re.sub(r'url\(\s*["\']?(assets/[^)"\']+)["\']?\s*\)', r'url(:/\1)', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};:,])\s*', r'\1', text)
+    return text.strip().encode('utf-8')
+
+
+def read_resource_file(relative_path):
+    """File contents as they go into the bundle"""
+    with open(os.path.join(BASE_DIR, relative_path), 'rb') as f:
+        data = f.read()
+    if relative_path.endswith('.qss'):
+        data = preprocess_stylesheet(data.decode('utf-8'))
+    return data
+
+
+def collect_files():
+    """Map of bundle path ('ui/main_window.ui') -> contents"""
+    files = {}
+    for directory in RESOURCE_DIRS:
+        for root, _, names in os.walk(os.path.join(BASE_DIR, directory)):
+            for name in names:
+                relative_path = os.path.relpath(os.path.join(root, name), BASE_DIR).replace(os.sep, '/')
+                files[relative_path] = read_resource_file(relative_path)
+    return files
+
+
+def build_tree(files):
+    """Nested dict of directories (dicts) and files (bytes)"""
+    tree = {}
+    for path, data in files.items():
+        node = tree
+        *directories, file_name = path.split('/')
+        for directory in directories:
+            node = node.setdefault(directory, {})
+        node[file_name] = data
+    return tree
+
+
+def build_rcc(files):
+    """Pack files into the rcc binary format (version 1)"""
+    names = bytearray()
+    name_offsets = {}
+    data = bytearray()
+
+    def name_offset(name):
+        if name not in name_offsets:
+            encoded = name.encode('utf-16-be')
+            name_offsets[name] = len(names)
+            names.extend(struct.pack('>HI', len(encoded) // 2, qt_hash(name)))
+            names.extend(encoded)
+        return name_offsets[name]
+
+    def data_offset(contents):
+        offset = len(data)
+        compressed = struct.pack('>I', len(contents)) + zlib.compress(contents, 9)
+        if len(compressed) < len(contents) * COMPRESS_THRESHOLD:
+            data.extend(struct.pack('>I', len(compressed)) + compressed)
+            return offset, FLAG_COMPRESSED
+        data.extend(struct.pack('>I', len(contents)) + contents)
+        return offset, 0
+
+    # Nodes are laid out breadth first: the children of a directory are
+    # consecutive and sorted by name hash, which Qt binary searches
+    nodes = [None]
+    queue = [(0, '', build_tree(files))]
+    while queue:
+        index, name, children = queue.pop(0)
+        first_child = len(nodes)
+        ordered = sorted(children.items(), key=lambda item: qt_hash(item[0]))
+        nodes.extend([None] * len(ordered))
+        nodes[index] = struct.pack('>IHII', name_offset(name), FLAG_DIRECTORY, len(ordered), first_child)
+
+        for position, (child_name, child) in enumerate(ordered):
+            child_index = first_child + position
+            if isinstance(child, dict):
+                queue.append((child_index, child_name, child))
+            else:
+                offset, flags = data_offset(child)
+                nodes[child_index] = struct.pack('>IHHHI', name_offset(child_name), flags, 0, LANGUAGE_C, offset)
+
+    tree = b''.join(nodes)
+    header_size = 20
+    tree_offset = header_size
+    data_start = tree_offset + len(tree)
+    names_start = data_start + len(data)
+    header = b'qres' + struct.pack('>IIII', RCC_VERSION, tree_offset, data_start, names_start)
+    return header + tree + bytes(data) + bytes(names)
+
+
+def write_module(rcc_data, file_stamps, output_path):
+    """Write resources_rc.py holding the bundle"""
+    lines = [
+        '# Generated by build_resources.py from assets/, styles/ and ui/ - do not edit.',
+        '# Run "python build_resources.py" again after changing any of those files.',
+        'from PyQt6.QtCore import QResource',
+        '',
+        '# Modification time (ns) of every source file when the bundle was built',
+        f'SOURCE_MTIMES = {file_stamps!r}',
+        '',
+        'qt_resource_data = (',
+    ]
+    for start in range(0, len(rcc_data), LINE_BYTES):
+        lines.append(f'    {rcc_data[start:start + LINE_BYTES]!r}')
+    lines += [
+        ')',
+        '',
+        '',
+        'def qInitResources():',
+        '    QResource.registerResourceData(qt_resource_data)',
+        '',
+        '',
+        'def qCleanupResources():',
+        '    QResource.unregisterResourceData(qt_resource_data)',
+        '',
+        '',
+        'qInitResources()',
+        '',
+    ]
+    with open(output_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('\n'.join(lines))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compile assets, stylesheet and .ui files into resources_rc.py")
+    parser.add_argument("--output", default=os.path.join(BASE_DIR, OUTPUT_FILE))
+    args = parser.parse_args(argv)
+
+    files = collect_files()
+    file_stamps = {path: os.stat(os.path.join(BASE_DIR, path)).st_mtime_ns for path in sorted(files)}
+    rcc_data = build_rcc(files)
+    write_module(rcc_data, file_stamps, args.output)
+
+    source_size = sum(os.path.getsize(os.path.join(BASE_DIR, path)) for path in files)
+    print(f"Compiled {len(files)} files ({source_size / 1024:.0f} KB) into {args.output} "
+          f"({len(rcc_data) / 1024:.0f} KB bundle)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
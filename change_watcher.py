@@ -0,0 +1,83 @@
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class ChangeWatcher(QObject):
+    """Detect commits made by other connections (other instances, scripts).
+
+    Polls PRAGMA data_version on one long-lived connection. The value only
+    changes when another connection commits, so an idle poll is a single
+    cheap pragma. When it changes, the projects touched since the last
+    check are looked up through the change_seq indexes and
+    reported through projectsChanged.
+    """
+
+    projectsChanged = pyqtSignal(set)
+
+    def __init__(self, db, interval_ms=500, parent=None):
+        super().__init__(parent)
+        self.db = db
+        # Its own connection, outside db's pool: held for the watcher's lifetime
+        self.connection = db.open_connection()
+        self.data_version = None
+        self.watermark = 0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.check_for_changes)
+
+    def start(self):
+        """Start polling"""
+        self.catch_up()
+        self.timer.start()
+
+    def stop(self):
+        """Stop polling and release the connection"""
+        self.timer.stop()
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def pause(self):
+        """Stop polling but keep the connection and the last seen state"""
+        self.timer.stop()
+
+    def resume(self):
+        """Poll again, reporting whatever was committed while paused"""
+        self.timer.start()
+        self.check_for_changes()
+
+    def read_data_version(self):
+        """Read the connection's data_version (changes on every external commit)"""
+        return self.connection.execute('PRAGMA data_version').fetchone()[0]
+
+    def catch_up(self):
+        """Treat everything committed so far as seen.
+
+        Called right before a full reload of the tree: anything committed
+        after this point is still reported by the next check.
+        """
+        if self.connection is None:
+            return
+        self.data_version = self.read_data_version()
+        self.watermark = self.db.get_change_watermark(self.connection)
+
+    def check_for_changes(self):
+        """Timer tick: emit the ids of projects changed since the last check"""
+        if self.connection is None:
+            return
+
+        # A working set hands over what its flusher thread has read
+        project_ids = self.db.take_changed_project_ids()
+
+        data_version = self.read_data_version()
+        if data_version != self.data_version:
+            self.data_version = data_version
+
+            # Read the new watermark first so a commit landing in between is
+            # reported again next time rather than skipped
+            watermark = self.db.get_change_watermark(self.connection)
+            project_ids |= self.db.get_changed_project_ids(self.watermark, self.connection)
+            self.watermark = max(self.watermark, watermark)
+
+        if project_ids:
+            self.projectsChanged.emit(project_ids)
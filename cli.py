@@ -0,0 +1,315 @@
+import argparse
+import csv
+import json
+import sys
+import time
+
+from database_manager import DatabaseManager, DEFAULT_DB_PATH
+
+# ===== HEADLESS COMMAND LINE =====
+#
+# Works on the same database as the app without importing Qt:
+#
+#   python cli.py import old_tool.csv
+#   python cli.py list --tasks
+#   python cli.py report
+#   python cli.py report --tag billable --client Acme --from 2026-10-01
+#   python cli.py export exports/time.parquet
+#   python cli.py serve --port 8765
+#   python cli.py maintain
+#
+# Import files are CSV, JSON (a list of objects) or JSON Lines with the
+# columns project, task, seconds (or time as HH:MM:SS) and finished.
+# The JSON Lines written by "Export for Analytics" can be imported as-is.
+
+PROJECT_KEYS = ('project', 'project_name')
+TASK_KEYS = ('task', 'task_name', 'name')
+SECONDS_KEYS = ('seconds', 'total_seconds')
+FINISHED_KEYS = ('finished', 'is_finished')
+TRUE_VALUES = ('1', 'true', 'yes', 'y', 'finished')
+
+
+def first_value(record, keys, default=None):
+    """Return the value of the first key present in the record"""
+    for key in keys:
+        if key in record and record[key] not in (None, ''):
+            return record[key]
+    return default
+
+
+def parse_seconds(record):
+    """Read the tracked time of a record as seconds"""
+    seconds = first_value(record, SECONDS_KEYS)
+    if seconds is not None:
+        return int(float(seconds))
+
+    time_str = first_value(record, ('time', 'Time (HH:MM:SS)'), '0:0:0')
+    hours, minutes, seconds = (int(part) for part in str(time_str).split(':'))
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def parse_finished(record):
+    """Read whether a record's task is finished"""
+    finished = first_value(record, FINISHED_KEYS)
+    if finished is None:
+        finished = first_value(record, ('status',), '')
+    if isinstance(finished, bool):
+        return finished
+    return str(finished).strip().lower() in TRUE_VALUES
+
+
+def normalize_record(record):
+    """Turn an input row into a (project, task, seconds, finished) tuple (or None to skip)"""
+    project_name = first_value(record, PROJECT_KEYS)
+    task_name = first_value(record, TASK_KEYS)
+    if project_name is None or task_name is None:
+        return None
+    return str(project_name), str(task_name), parse_seconds(record), parse_finished(record)
+
+
+def lower_keys(row):
+    """Make column names case-insensitive"""
+    return {key.strip().lower(): value for key, value in row.items()}
+
+
+def read_rows(file_path):
+    """Stream raw rows (dicts with lower-case keys) from a CSV, JSON or JSON Lines file"""
+    lower_path = file_path.lower()
+
+    if lower_path.endswith('.json'):
+        with open(file_path, encoding='utf-8') as f:
+            for row in json.load(f):
+                yield lower_keys(row)
+    elif lower_path.endswith(('.jsonl', '.ndjson')):
+        with open(file_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield lower_keys(json.loads(line))
+    else:
+        with open(file_path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            # Lower-case the header once instead of every row
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+            yield from reader
+
+
+def read_records(file_path):
+    """Stream import records from a CSV, JSON or JSON Lines file"""
+    for row in read_rows(file_path):
+        record = normalize_record(row)
+        if record is not None:
+            yield record
+
+
+def format_seconds(total_seconds):
+    """Format seconds as HH:MM:SS"""
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+# ===== SUBCOMMANDS =====
+
+def command_import(db, args):
+    """Bulk import projects/tasks/time"""
+    start = time.perf_counter()
+    projects_created, tasks_created = db.bulk_import(read_records(args.file), args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"Imported {tasks_created} task(s) and {projects_created} new project(s) in {elapsed:.2f}s")
+    return 0
+
+
+def command_list(db, args):
+    """List projects (and optionally their tasks)"""
+    for project_id, project_name, total_seconds, task_count, finished_count, running_count in db.get_project_summaries():
+        print(f"[{project_id}] {project_name}  {format_seconds(total_seconds)}  {task_count} task(s)")
+
+        if args.tasks and task_count:
+            for task_id, task_name, task_seconds, is_finished, is_running in db.get_tasks_for_project(project_id):
+                if is_finished:
+                    status = "Finished"
+                elif is_running:
+                    status = "Running"
+                else:
+                    status = "Paused"
+                print(f"    [{task_id}] {task_name}  {format_seconds(task_seconds)}  {status}")
+    return 0
+
+
+def parse_date(date_str):
+    """Turn YYYY-MM-DD (local time) into a Unix timestamp"""
+    return time.mktime(time.strptime(date_str, '%Y-%m-%d'))
+
+
+def command_report(db, args):
+    """Print per-project totals and status"""
+    if args.client or args.tag or args.date_from or args.date_to:
+        return report_filtered(db, args)
+
+    grand_total = 0
+    print(f"{'Project':<40} {'Time':>10} {'Tasks':>6}  Status")
+    for project_id, project_name, total_seconds, task_count, finished_count, running_count in db.get_project_summaries():
+        grand_total += total_seconds
+
+        if not task_count:
+            status = "No tasks"
+        elif finished_count == task_count:
+            status = "Finished"
+        elif running_count:
+            status = "Running"
+        else:
+            status = "Open"
+        print(f"{project_name[:40]:<40} {format_seconds(total_seconds):>10} {task_count:>6}  {status}")
+
+    print(f"{'Total:':<40} {format_seconds(grand_total):>10}")
+    return 0
+
+
+def report_filtered(db, args):
+    """Print per-project totals for a client, tag and/or date range"""
+    start = parse_date(args.date_from) if args.date_from else None
+    # --to is inclusive: count up to the end of that day
+    end = parse_date(args.date_to) + 86400 if args.date_to else None
+
+    grand_total = 0
+    print(f"{'Project':<40} {'Time':>10}")
+    for project_id, project_name, total_seconds in db.get_filtered_totals(args.client, args.tag, start, end):
+        grand_total += total_seconds
+        print(f"{project_name[:40]:<40} {format_seconds(total_seconds):>10}")
+
+    print(f"{'Total:':<40} {format_seconds(grand_total):>10}")
+    return 0
+
+
+def command_export(db, args):
+    """Export to CSV, XLSX, Parquet, Arrow or JSON Lines (chosen by extension)"""
+    import exporters
+
+    if args.changes:
+        if len(args.files) != 1:
+            raise ValueError("--changes writes a single file")
+        count = exporters.export_delta(db, args.files[0], args.target)
+        print(f"Exported {count} change(s) to {args.files[0]}")
+        return 0
+
+    if len(args.files) == 1:
+        # One file streams straight from the database
+        results = {args.files[0]: exporters.export_file(db, args.files[0])}
+    else:
+        # Several files are written in parallel from one snapshot, so they all match
+        snapshot = exporters.ExportSnapshot.read(db)
+        try:
+            results = exporters.export_files(snapshot, args.files)
+        finally:
+            snapshot.close()
+
+    for file_path, count in results.items():
+        if count is None:
+            print(f"Exported to {file_path}")
+        else:
+            print(f"Exported {count} row(s) to {file_path}")
+    return 0
+
+
+def command_serve(db, args):
+    """Serve the read-only HTTP/JSON API until interrupted"""
+    import threading
+    from api_server import ApiServer
+
+    server = ApiServer(db.db_path, host=args.host, port=args.port)
+    server.start()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+def command_maintain(db, args):
+    """Run database maintenance now, or show what earlier runs did"""
+    if not args.log:
+        db.run_maintenance()
+        if args.full:
+            db.full_vacuum()
+
+    print(f"{'Step':<20} {'Started':<20} {'Time':>9}  Detail")
+    for step, started_at, duration, detail in db.get_maintenance_log(args.limit):
+        started = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started_at))
+        print(f"{step:<20} {started:<20} {duration * 1000:>7.0f}ms  {detail}")
+    return 0
+
+
+def build_parser():
+    """Build the argument parser"""
+    parser = argparse.ArgumentParser(prog="cli.py", description="Time Tracker (headless)")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="database file (default: %(default)s)")
+    parser.add_argument("--workspace", help="use the database of a workspace registered in the app")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = subparsers.add_parser("import", help="bulk import from CSV, JSON or JSON Lines")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--batch-size", type=int, default=50000,
+                               help="rows per transaction (default: %(default)s)")
+    import_parser.set_defaults(handler=command_import)
+
+    list_parser = subparsers.add_parser("list", help="list projects")
+    list_parser.add_argument("--tasks", action="store_true", help="also list tasks")
+    list_parser.set_defaults(handler=command_list)
+
+    report_parser = subparsers.add_parser("report", help="per-project totals")
+    report_parser.add_argument("--client", help="only projects of this client")
+    report_parser.add_argument("--tag", help="only tasks with this tag (e.g. billable)")
+    report_parser.add_argument("--from", dest="date_from", metavar="YYYY-MM-DD",
+                               help="only session time from this day on")
+    report_parser.add_argument("--to", dest="date_to", metavar="YYYY-MM-DD",
+                               help="only session time up to and including this day")
+    report_parser.set_defaults(handler=command_report)
+
+    export_parser = subparsers.add_parser("export", help="export by file extension "
+                                          "(.csv, .xlsx, .parquet, .arrow, .jsonl)")
+    export_parser.add_argument("files", nargs="+", metavar="file",
+                               help="one or more files, several are written from the same snapshot")
+    export_parser.add_argument("--changes", action="store_true",
+                               help="only rows changed since the last --changes export (JSON Lines)")
+    export_parser.add_argument("--target", default="default",
+                               help="sync target whose watermark --changes uses (default: %(default)s)")
+    export_parser.set_defaults(handler=command_export)
+
+    serve_parser = subparsers.add_parser("serve", help="serve the read-only HTTP/JSON API")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address (default: %(default)s)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="port (default: %(default)s)")
+    serve_parser.set_defaults(handler=command_serve)
+
+    maintain_parser = subparsers.add_parser("maintain", help="optimize, analyze, vacuum and checkpoint now")
+    maintain_parser.add_argument("--log", action="store_true", help="only show the maintenance log")
+    maintain_parser.add_argument("--full", action="store_true",
+                                 help="also rebuild the file with a full VACUUM (blocks other writers while it runs)")
+    maintain_parser.add_argument("--limit", type=int, default=20, help="log entries to show (default: %(default)s)")
+    maintain_parser.set_defaults(handler=command_maintain)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.workspace:
+        from workspaces import WorkspaceRegistry
+
+        registry = WorkspaceRegistry()
+        if args.workspace not in registry.names():
+            print(f"Error: unknown workspace '{args.workspace}' "
+                  f"(known: {', '.join(registry.names())})", file=sys.stderr)
+            return 1
+        args.db = registry.db_path(args.workspace)
+    db = DatabaseManager(args.db, verbose=False)
+    try:
+        return args.handler(db, args)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
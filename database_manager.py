@@ -1,134 +1,1028 @@
-import sqlite3
-from database_setup import create_database
-
-class DatabaseManager:
-    def __init__(self, db_path='database/timetracker.db'):
-        self.db_path = db_path
-        create_database()
-    
-    def get_connection(self):
-        """Create and return a database connection"""
-        return sqlite3.connect(self.db_path)
-    
-    # ===== PROJECT METHODS =====
-    
-    def add_project(self, name):
-        """Add a new project"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('INSERT INTO projects (name) VALUES (?)', (name,))
-        project_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return project_id
-    
-    def get_all_projects(self):
-        """Get all projects"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, name FROM projects ORDER BY created_at DESC')
-        projects = cursor.fetchall()
-        conn.close()
-        return projects
-    
-    def rename_project(self, project_id, new_name):
-        """Rename a project"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE projects SET name = ? WHERE id = ?', (new_name, project_id))
-        conn.commit()
-        conn.close()
-    
-    def delete_project(self, project_id):
-        """Delete a project and all its tasks"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM projects WHERE id = ?', (project_id,))
-        conn.commit()
-        conn.close()
-    
-    # ===== TASK METHODS =====
-    
-    def add_task(self, project_id, name):
-        """Add a new task to a project"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('INSERT INTO tasks (project_id, name) VALUES (?, ?)', (project_id, name))
-        task_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        return task_id
-    
-    def get_tasks_for_project(self, project_id):
-        """Get all tasks for a specific project"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, name, total_seconds, is_finished, is_running FROM tasks WHERE project_id = ?', (project_id,))
-        tasks = cursor.fetchall()
-        conn.close()
-        return tasks
-    
-    def update_task_time(self, task_id, total_seconds):
-        """Update the total time for a task"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE tasks SET total_seconds = ? WHERE id = ?', (total_seconds, task_id))
-        conn.commit()
-        conn.close()
-    
-    def finish_task(self, task_id):
-        """Mark a task as finished"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE tasks SET is_finished = 1 WHERE id = ?', (task_id,))
-        conn.commit()
-        conn.close()
-    
-    def reopen_task(self, task_id):
-        """Reopen a finished task"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE tasks SET is_finished = 0 WHERE id = ?', (task_id,))
-        conn.commit()
-        conn.close()
-    
-    def rename_task(self, task_id, new_name):
-        """Rename a task"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE tasks SET name = ? WHERE id = ?', (new_name, task_id))
-        conn.commit()
-        conn.close()
-    
-    def delete_task(self, task_id):
-        """Delete a task"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-        conn.commit()
-        conn.close()
-
-    def start_task(self, task_id):
-        """Mark a task as running"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE tasks SET is_running = 1 WHERE id = ?', (task_id,))
-        conn.commit()
-        conn.close()
-    
-    def pause_task(self, task_id):
-        """Mark a task as paused (not running)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE tasks SET is_running = 0 WHERE id = ?', (task_id,))
-        conn.commit()
-        conn.close()
-    
-    def get_running_task(self):
-        """Get the currently running task (if any)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, project_id, name FROM tasks WHERE is_running = 1 LIMIT 1')
-        task = cursor.fetchone()
-        conn.close()
-        return task
\ No newline at end of file
+import os
+import queue
+import random
+import sqlite3
+import sys
+import threading
+import time
+from urllib.request import pathname2url
+from database_setup import create_database, NOW_EXPRESSION
+
+# The default database lives next to the program (or the .exe), whatever the working directory
+if getattr(sys, 'frozen', False):
+    APP_DIR = os.path.dirname(sys.executable)
+else:
+    APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DB_PATH = os.path.join(APP_DIR, 'database', 'timetracker.db')
+
+# How long a connection waits on a lock held by another writer (seconds)
+DEFAULT_BUSY_TIMEOUT = 5.0
+
+# How long a thread waits for a free pooled connection before giving up
+# (seconds); raising beats waiting forever on a pool that is used up
+POOL_ACQUIRE_TIMEOUT = 30.0
+
+# Retries of a write transaction that still hit a lock, with jittered backoff
+WRITE_RETRIES = 5
+RETRY_BASE_DELAY = 0.05
+RETRY_MAX_DELAY = 1.0
+
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+
+# Maintenance: rows ANALYZE samples per index, pages freed per vacuum slice,
+# and SQLite instructions between checks whether a step should stop
+ANALYSIS_LIMIT = 400
+VACUUM_PAGES_PER_STEP = 256
+INTERRUPT_CHECK_STEPS = 10000
+MAINTENANCE_LOG_DAYS = 90
+
+# Ids per "IN (...)" list in bulk statements (well below SQLite's variable limit)
+BULK_CHUNK_SIZE = 500
+
+# Per-project totals and status counts, only reads idx_tasks_project_totals
+PROJECT_SUMMARY_QUERY = '''
+    SELECT p.id,
+           p.name,
+           COALESCE(SUM(t.total_seconds), 0),
+           COUNT(t.id),
+           COALESCE(SUM(CASE WHEN t.is_finished THEN 1 ELSE 0 END), 0),
+           COALESCE(SUM(CASE WHEN t.is_running THEN 1 ELSE 0 END), 0)
+    FROM projects p
+    LEFT JOIN tasks t ON t.project_id = p.id
+'''
+
+# Flat task rows (with empty projects) for the columnar exports
+TASK_ROWS_QUERY = '''
+    SELECT p.id,
+           p.name,
+           strftime('%Y-%m-%dT%H:%M:%SZ', p.created_at),
+           t.id,
+           t.name,
+           COALESCE(t.total_seconds, 0),
+           CASE
+               WHEN t.id IS NULL THEN NULL
+               WHEN t.is_finished THEN 'Finished'
+               WHEN t.is_running THEN 'Running'
+               ELSE 'Paused'
+           END,
+           t.is_finished,
+           t.is_running,
+           strftime('%Y-%m-%dT%H:%M:%SZ', t.created_at)
+    FROM projects p
+    LEFT JOIN tasks t ON t.project_id = p.id
+    ORDER BY p.id, t.id
+'''
+
+class PooledConnection:
+    """Wraps a pooled connection so that close() hands it back to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def close(self):
+        if self._conn is not None:
+            if self._conn.in_transaction:
+                self._conn.rollback()
+            self._pool.release(self._conn)
+            self._conn = None
+
+class ConnectionPool:
+    """A fixed-size pool of connections shared between threads"""
+
+    def __init__(self, connect, size, timeout=POOL_ACQUIRE_TIMEOUT):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Get an idle connection, open a new one, or wait (up to timeout) for one to be released"""
+        try:
+            return PooledConnection(self, self.idle.get_nowait())
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            can_create = self.created < self.size
+            if can_create:
+                self.created += 1
+        if can_create:
+            return PooledConnection(self, self.connect())
+        try:
+            return PooledConnection(self, self.idle.get(timeout=self.timeout))
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"No pooled connection was released within {self.timeout:g}s (pool of {self.size})")
+
+    def release(self, conn):
+        self.idle.put(conn)
+
+    def close_all(self):
+        """Close every idle connection (later acquires open new ones)"""
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self.lock:
+                self.created -= 1
+
+def is_busy_error(error):
+    """True if an OperationalError means another connection holds a lock"""
+    error_code = getattr(error, 'sqlite_errorcode', None)
+    if error_code is not None:
+        return error_code & 0xff in (SQLITE_BUSY, SQLITE_LOCKED)
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+class DatabaseManager:
+    def __init__(self, db_path=DEFAULT_DB_PATH, verbose=True, read_only=False, pool_size=0,
+                 busy_timeout=DEFAULT_BUSY_TIMEOUT, write_retries=WRITE_RETRIES):
+        self.db_path = os.path.abspath(db_path)
+        self.read_only = read_only
+        self.busy_timeout = busy_timeout
+        self.write_retries = write_retries
+        self.pool = ConnectionPool(self.open_connection, pool_size) if pool_size else None
+        # Per thread: the cursor of the run_batch transaction in progress
+        self.batch = threading.local()
+        if not read_only:
+            create_database(self.db_path, verbose, busy_timeout)
+    
+    def open_connection(self):
+        """Open a new database connection"""
+        if self.read_only:
+            uri = f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.busy_timeout, check_same_thread=False)
+        else:
+            # Pooled connections move between threads (one at a time)
+            conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout,
+                                   check_same_thread=self.pool is None)
+        # Needed for ON DELETE CASCADE (and the tombstones of cascaded tasks)
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+    
+    def get_connection(self):
+        """Create and return a database connection (taken from the pool, if there is one)"""
+        if self.pool is not None:
+            return self.pool.acquire()
+        return self.open_connection()
+
+    def close(self):
+        """Close pooled connections"""
+        if self.pool is not None:
+            self.pool.close_all()
+
+    def flush(self):
+        """Write changes held back in memory to the database file (see WorkingSetDatabase), return how many"""
+        return 0
+
+    def take_changed_project_ids(self):
+        """Projects changed elsewhere that were read in the background (see WorkingSetDatabase)"""
+        return set()
+
+    def run_write(self, operation):
+        """Run operation(cursor) in one BEGIN IMMEDIATE transaction and return its result.
+
+        The write lock is taken up front, so a busy database fails at BEGIN
+        (after busy_timeout) instead of half way through. Busy failures are
+        retried with jittered exponential backoff; nothing of a failed
+        attempt was committed, so retrying is safe. Inside run_batch the
+        operation joins the batch's transaction instead.
+        """
+        batch_cursor = getattr(self.batch, 'cursor', None)
+        if batch_cursor is not None:
+            return operation(batch_cursor)
+
+        for attempt in range(self.write_retries + 1):
+            conn = self.get_connection()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                result = operation(conn.cursor())
+                conn.commit()
+                return result
+            except sqlite3.OperationalError as e:
+                if conn.in_transaction:
+                    conn.rollback()
+                if not is_busy_error(e) or attempt == self.write_retries:
+                    raise
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                print(f"Database busy, retrying write in {delay:.2f}s (attempt {attempt + 1})")
+                time.sleep(random.uniform(0, delay))
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+    def run_batch(self, operation):
+        """Like run_write, but every write method called by operation(cursor) joins the same transaction"""
+        def batch(cursor):
+            self.batch.cursor = cursor
+            try:
+                return operation(cursor)
+            finally:
+                self.batch.cursor = None
+
+        return self.run_write(batch)
+    
+    # ===== PROJECT METHODS =====
+    
+    def add_project(self, name):
+        """Add a new project"""
+        return self.run_write(
+            lambda cursor: cursor.execute('INSERT INTO projects (name) VALUES (?)', (name,)).lastrowid)
+    
+    def get_all_projects(self):
+        """Get all projects"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, name FROM projects ORDER BY created_at DESC, id DESC')
+        projects = cursor.fetchall()
+        conn.close()
+        return projects
+    
+    def get_project_summaries(self):
+        """Get (id, name, total_seconds, task_count, finished_count, running_count) for every project.
+
+        Aggregated in SQL over the covering idx_tasks_project_totals index,
+        ordered like get_all_projects.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(PROJECT_SUMMARY_QUERY + '''
+            GROUP BY p.id
+            ORDER BY p.created_at DESC, p.id DESC
+        ''')
+        summaries = cursor.fetchall()
+        conn.close()
+        return summaries
+
+    def get_project_summary(self, project_id):
+        """Get the summary row of a single project (or None if it no longer exists)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(PROJECT_SUMMARY_QUERY + '''
+            WHERE p.id = ?
+            GROUP BY p.id
+        ''', (project_id,))
+        summary = cursor.fetchone()
+        conn.close()
+        return summary
+    
+    def get_totals(self):
+        """Get (project_count, task_count, total_seconds, finished_count, running_count) over everything"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT (SELECT COUNT(*) FROM projects),
+                   COUNT(*),
+                   COALESCE(SUM(total_seconds), 0),
+                   COALESCE(SUM(CASE WHEN is_finished THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN is_running THEN 1 ELSE 0 END), 0)
+            FROM tasks
+        ''')
+        totals = cursor.fetchone()
+        conn.close()
+        return totals
+    
+    def rename_project(self, project_id, new_name):
+        """Rename a project"""
+        self.run_write(lambda cursor: cursor.execute(
+            'UPDATE projects SET name = ? WHERE id = ?', (new_name, project_id)))
+    
+    def delete_project(self, project_id):
+        """Delete a project and all its tasks"""
+        self.run_write(lambda cursor: cursor.execute('DELETE FROM projects WHERE id = ?', (project_id,)))
+    
+    # ===== TASK METHODS =====
+    
+    def add_task(self, project_id, name):
+        """Add a new task to a project"""
+        return self.run_write(lambda cursor: cursor.execute(
+            'INSERT INTO tasks (project_id, name) VALUES (?, ?)', (project_id, name)).lastrowid)
+    
+    def get_tasks_for_project(self, project_id):
+        """Get all tasks for a specific project"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, name, total_seconds, is_finished, is_running FROM tasks WHERE project_id = ? ORDER BY id', (project_id,))
+        tasks = cursor.fetchall()
+        conn.close()
+        return tasks
+    
+    def find_task(self, task):
+        """Find a task by id or (case-insensitive) name, preferring open tasks"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if str(task).isdigit():
+            cursor.execute('SELECT id, project_id, name, is_finished FROM tasks WHERE id = ?', (int(task),))
+        else:
+            cursor.execute('''
+                SELECT id, project_id, name, is_finished
+                FROM tasks
+                WHERE name = ? COLLATE NOCASE
+                ORDER BY is_finished, id DESC
+                LIMIT 1
+            ''', (task,))
+        result = cursor.fetchone()
+        conn.close()
+        return result
+    
+    def update_task_time(self, task_id, total_seconds):
+        """Update the total time for a task"""
+        self.run_write(lambda cursor: cursor.execute(
+            'UPDATE tasks SET total_seconds = ? WHERE id = ?', (total_seconds, task_id)))
+    
+    def finish_task(self, task_id, now=None):
+        """Mark a task as finished (crediting and closing its session if it is running)"""
+        def finish(cursor):
+            self._close_session(cursor, task_id, now if now is not None else time.time())
+            cursor.execute('UPDATE tasks SET is_finished = 1, is_running = 0 WHERE id = ?', (task_id,))
+
+        self.run_write(finish)
+    
+    def reopen_task(self, task_id):
+        """Reopen a finished task"""
+        self.run_write(lambda cursor: cursor.execute(
+            'UPDATE tasks SET is_finished = 0 WHERE id = ?', (task_id,)))
+    
+    def rename_task(self, task_id, new_name):
+        """Rename a task"""
+        self.run_write(lambda cursor: cursor.execute(
+            'UPDATE tasks SET name = ? WHERE id = ?', (new_name, task_id)))
+    
+    def delete_task(self, task_id):
+        """Delete a task"""
+        self.run_write(lambda cursor: cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,)))
+
+    # ===== BULK TASK METHODS =====
+
+    def finish_tasks(self, task_ids, now=None):
+        """Finish many tasks in one transaction (crediting the open sessions of running ones)"""
+        task_ids = list(task_ids)
+
+        def finish(cursor):
+            ended_at = now if now is not None else time.time()
+            selected = set(task_ids)
+            # Only running tasks have an open session, there are few of them
+            cursor.execute('SELECT task_id FROM sessions WHERE ended_at IS NULL')
+            for (task_id,) in cursor.fetchall():
+                if task_id in selected:
+                    self._close_session(cursor, task_id, ended_at)
+            cursor.executemany('UPDATE tasks SET is_finished = 1, is_running = 0 WHERE id = ?',
+                               [(task_id,) for task_id in task_ids])
+
+        self.run_write(finish)
+
+    def reopen_tasks(self, task_ids):
+        """Reopen many finished tasks in one transaction"""
+        self.run_write(lambda cursor: cursor.executemany(
+            'UPDATE tasks SET is_finished = 0 WHERE id = ? AND is_finished != 0',
+            [(task_id,) for task_id in task_ids]))
+
+    def rename_tasks(self, new_names):
+        """Rename many tasks in one transaction, new_names maps task id -> name"""
+        self.run_write(lambda cursor: cursor.executemany(
+            'UPDATE tasks SET name = ? WHERE id = ?',
+            [(name, task_id) for task_id, name in new_names.items()]))
+
+    def delete_tasks(self, task_ids):
+        """Delete many tasks (and their sessions) in one transaction"""
+        self.run_write(lambda cursor: cursor.executemany(
+            'DELETE FROM tasks WHERE id = ?', [(task_id,) for task_id in task_ids]))
+
+    def move_tasks(self, task_ids, project_id):
+        """Move many tasks to another project in one transaction, return the ids of the projects they left"""
+        task_ids = list(task_ids)
+
+        def move(cursor):
+            source_ids = set()
+            for start in range(0, len(task_ids), BULK_CHUNK_SIZE):
+                chunk = task_ids[start:start + BULK_CHUNK_SIZE]
+                cursor.execute(f'SELECT DISTINCT project_id FROM tasks WHERE id IN ({", ".join("?" * len(chunk))})',
+                               chunk)
+                source_ids.update(row[0] for row in cursor.fetchall())
+            source_ids.discard(project_id)
+
+            cursor.executemany('UPDATE tasks SET project_id = ? WHERE id = ?',
+                               [(project_id, task_id) for task_id in task_ids])
+            # The moved tasks only mark their new project as changed, touch the old ones
+            # so other instances and delta exports notice them too
+            cursor.executemany(f'UPDATE projects SET updated_at = {NOW_EXPRESSION} WHERE id = ?',
+                               [(source_id,) for source_id in source_ids])
+            return source_ids
+
+        return self.run_write(move)
+
+    def start_task(self, task_id, exclusive=False, started_at=None):
+        """Mark a task as running and open a session for it.
+
+        Idempotent: starting a task that already has an open session keeps
+        that session. With exclusive=True nothing happens while another task
+        is running (checked inside the same write transaction, so two
+        processes cannot both win). Returns the session's start time, or
+        None if the task was not started.
+        """
+        def start(cursor):
+            cursor.execute('SELECT started_at FROM sessions WHERE task_id = ? AND ended_at IS NULL', (task_id,))
+            open_session = cursor.fetchone()
+            if open_session:
+                return open_session[0]
+
+            if exclusive:
+                cursor.execute('SELECT 1 FROM tasks WHERE is_running = 1 AND id != ? LIMIT 1', (task_id,))
+                if cursor.fetchone():
+                    return None
+
+            session_start = started_at if started_at is not None else time.time()
+            cursor.execute('INSERT INTO sessions (task_id, started_at) VALUES (?, ?)', (task_id, session_start))
+            cursor.execute('UPDATE tasks SET is_running = 1 WHERE id = ?', (task_id,))
+            return session_start
+
+        return self.run_write(start)
+    
+    def pause_task(self, task_id, now=None):
+        """Mark a task as paused (not running), adding its open session to its total time.
+
+        Idempotent: pausing a task without an open session credits nothing.
+        Returns the number of seconds credited.
+        """
+        def pause(cursor):
+            credited = self._close_session(cursor, task_id, now if now is not None else time.time())
+            cursor.execute('UPDATE tasks SET is_running = 0 WHERE id = ? AND is_running != 0', (task_id,))
+            return credited
+
+        return self.run_write(pause)
+
+    def _close_session(self, cursor, task_id, now):
+        """Close the task's open session and add its whole seconds to total_seconds"""
+        cursor.execute('SELECT id, started_at FROM sessions WHERE task_id = ? AND ended_at IS NULL', (task_id,))
+        open_session = cursor.fetchone()
+        if open_session is None:
+            return 0
+
+        session_id, session_start = open_session
+        ended_at = max(now, session_start)
+        credited = int(ended_at - session_start)
+        cursor.execute('UPDATE sessions SET ended_at = ? WHERE id = ?', (ended_at, session_id))
+        cursor.execute('UPDATE tasks SET total_seconds = total_seconds + ? WHERE id = ?', (credited, task_id))
+        return credited
+    
+    def get_running_sessions(self):
+        """Get (task_id, project_id, task_name, total_seconds, started_at) for every open session"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT t.id, t.project_id, t.name, t.total_seconds, s.started_at
+            FROM sessions s
+            JOIN tasks t ON t.id = s.task_id
+            WHERE s.ended_at IS NULL AND t.is_running = 1
+            ORDER BY s.started_at
+        ''')
+        sessions = cursor.fetchall()
+        conn.close()
+        return sessions
+
+    def get_last_worked(self, project_ids=None):
+        """Get {task_id: time of its latest session end} (now for open sessions)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        query = '''
+            SELECT s.task_id, MAX(COALESCE(s.ended_at, ?))
+            FROM sessions s
+        '''
+        params = [time.time()]
+        if project_ids is not None:
+            project_ids = list(project_ids)
+            query += f'''
+            JOIN tasks t ON t.id = s.task_id
+            WHERE t.project_id IN ({', '.join('?' * len(project_ids))})
+            '''
+            params.extend(project_ids)
+        cursor.execute(query + ' GROUP BY s.task_id', params)
+        last_worked = dict(cursor.fetchall())
+        conn.close()
+        return last_worked
+
+    def get_running_task(self):
+        """Get the currently running task (if any)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, project_id, name FROM tasks WHERE is_running = 1 LIMIT 1')
+        task = cursor.fetchone()
+        conn.close()
+        return task
+
+    # ===== CLIENT AND TAG METHODS =====
+
+    def get_clients(self):
+        """Get all clients as (id, name)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, name FROM clients ORDER BY name')
+        clients = cursor.fetchall()
+        conn.close()
+        return clients
+
+    def get_tags(self):
+        """Get all tags as (id, name)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, name FROM tags ORDER BY name')
+        tags = cursor.fetchall()
+        conn.close()
+        return tags
+
+    def get_project_clients(self, project_id):
+        """Get the names of a project's clients"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT c.name FROM project_clients pc
+            JOIN clients c ON c.id = pc.client_id
+            WHERE pc.project_id = ?
+            ORDER BY c.name
+        ''', (project_id,))
+        names = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return names
+
+    def get_task_tags(self, task_id):
+        """Get the names of a task's tags"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT t.name FROM task_tags tt
+            JOIN tags t ON t.id = tt.tag_id
+            WHERE tt.task_id = ?
+            ORDER BY t.name
+        ''', (task_id,))
+        names = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return names
+
+    def set_project_clients(self, project_id, client_names):
+        """Replace a project's clients (creating clients that don't exist yet)"""
+        self.run_write(lambda cursor: self._set_links(
+            cursor, 'clients', 'project_clients', 'project_id', 'client_id', 'projects', project_id, client_names))
+
+    def set_task_tags(self, task_id, tag_names):
+        """Replace a task's tags (creating tags that don't exist yet)"""
+        self.run_write(lambda cursor: self._set_links(
+            cursor, 'tags', 'task_tags', 'task_id', 'tag_id', 'tasks', task_id, tag_names))
+
+    def _set_links(self, cursor, name_table, link_table, owner_column, name_column, owner_table, owner_id, names):
+        """Make the owner's links exactly the given names, inside the caller's transaction"""
+        # Names are unique regardless of case, keep the first spelling
+        unique_names = {}
+        for name in names:
+            if name.strip():
+                unique_names.setdefault(name.strip().lower(), name.strip())
+        names = list(unique_names.values())
+        cursor.executemany(f'INSERT OR IGNORE INTO {name_table} (name) VALUES (?)', [(name,) for name in names])
+        cursor.execute(f'DELETE FROM {link_table} WHERE {owner_column} = ?', (owner_id,))
+        cursor.executemany(f'''
+            INSERT INTO {link_table} ({owner_column}, {name_column})
+            SELECT ?, id FROM {name_table} WHERE name = ?
+        ''', [(owner_id, name) for name in names])
+        # Touch the owner so change tracking (other instances, delta exports) sees the new links
+        cursor.execute(f'UPDATE {owner_table} SET updated_at = {NOW_EXPRESSION} WHERE id = ?', (owner_id,))
+
+    def get_task_ids_with_tag(self, tag_name):
+        """Get the ids of every task carrying a tag (reads idx_task_tags_tag only)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT tt.task_id FROM task_tags tt
+            WHERE tt.tag_id = (SELECT id FROM tags WHERE name = ?)
+        ''', (tag_name,))
+        task_ids = {row[0] for row in cursor.fetchall()}
+        conn.close()
+        return task_ids
+
+    def get_filtered_totals(self, client=None, tag=None, start=None, end=None):
+        """Get (project_id, project_name, seconds) per project, filtered by client, tag and time.
+
+        client and tag are names. With a start and/or end (Unix seconds) only
+        session time inside that range counts, clipped at the range edges
+        and with open sessions counted up to now. Without a range the stored
+        task totals are summed (which includes imported time).
+        """
+        where = []
+        params = []
+
+        if start is None and end is None:
+            seconds = 'SUM(t.total_seconds)'
+            source = 'tasks t'
+        else:
+            now = time.time()
+            start = start if start is not None else 0
+            end = end if end is not None else now
+            seconds = 'SUM(MAX(0, MIN(COALESCE(s.ended_at, ?), ?) - MAX(s.started_at, ?)))'
+            params.extend([now, end, start])
+            source = 'sessions s JOIN tasks t ON t.id = s.task_id'
+            where.append('(s.ended_at > ? OR s.ended_at IS NULL) AND s.started_at < ?')
+
+        query_params = []
+        if start is not None or end is not None:
+            query_params.extend([start, end])
+        if client is not None:
+            where.append('''t.project_id IN (
+                SELECT project_id FROM project_clients
+                WHERE client_id = (SELECT id FROM clients WHERE name = ?))''')
+            query_params.append(client)
+        if tag is not None:
+            where.append('''t.id IN (
+                SELECT task_id FROM task_tags
+                WHERE tag_id = (SELECT id FROM tags WHERE name = ?))''')
+            query_params.append(tag)
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT p.id, p.name, CAST({seconds} AS INTEGER)
+            FROM {source}
+            JOIN projects p ON p.id = t.project_id
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            GROUP BY p.id
+            ORDER BY p.name
+        ''', params + query_params)
+        totals = cursor.fetchall()
+        conn.close()
+        return totals
+
+    # ===== SETTINGS METHODS =====
+
+    def get_setting(self, key, default=None):
+        """Get a stored setting value (as text)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
+        row = cursor.fetchone()
+        conn.close()
+        return row[0] if row else default
+
+    def set_setting(self, key, value):
+        """Store a setting value"""
+        self.run_write(lambda cursor: cursor.execute(
+            'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (key, str(value))))
+
+    # ===== IMPORT METHODS =====
+
+    def bulk_import(self, records, batch_size=50000):
+        """Import (project_name, task_name, total_seconds, is_finished) records.
+
+        Projects are matched by name and created when missing. Every batch
+        is written with executemany inside one transaction.
+        Returns (projects_created, tasks_created).
+        """
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('SELECT name, MAX(id) FROM projects GROUP BY name')
+            project_ids = dict(cursor.fetchall())
+        finally:
+            conn.close()
+
+        projects_created = 0
+        tasks_created = 0
+
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                projects_created += self._import_batch(project_ids, batch)
+                tasks_created += len(batch)
+                batch = []
+        if batch:
+            projects_created += self._import_batch(project_ids, batch)
+            tasks_created += len(batch)
+
+        return projects_created, tasks_created
+
+    def _import_batch(self, project_ids, batch):
+        """Insert one batch of records in a single transaction, returns the number of new projects"""
+        new_names = list(dict.fromkeys(record[0] for record in batch if record[0] not in project_ids))
+
+        def insert(cursor):
+            # Set updated_at and change_seq directly instead of through the
+            # per-row insert trigger, taking the sequence numbers as one block
+            now = time.time()
+            cursor.execute('SELECT value FROM change_sequence')
+            first_seq = cursor.fetchone()[0] + 1
+            cursor.execute('UPDATE change_sequence SET value = value + ?', (len(new_names) + len(batch),))
+            batch_project_ids = dict(project_ids)
+            if new_names:
+                # Nobody else can insert while we hold the write lock, so the
+                # new projects are exactly the rows above the current max id
+                cursor.execute('SELECT COALESCE(MAX(id), 0) FROM projects')
+                max_id = cursor.fetchone()[0]
+                cursor.executemany('INSERT INTO projects (name, updated_at, change_seq) VALUES (?, ?, ?)',
+                                   [(name, now, first_seq + i) for i, name in enumerate(new_names)])
+                cursor.execute('SELECT name, id FROM projects WHERE id > ?', (max_id,))
+                batch_project_ids.update(cursor.fetchall())
+
+            first_task_seq = first_seq + len(new_names)
+            cursor.executemany(
+                'INSERT INTO tasks (project_id, name, total_seconds, is_finished, updated_at, change_seq) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(batch_project_ids[project_name], task_name, int(total_seconds), int(bool(is_finished)), now,
+                  first_task_seq + i)
+                 for i, (project_name, task_name, total_seconds, is_finished) in enumerate(batch)]
+            )
+            return batch_project_ids
+
+        # Only remember new project ids once the batch is committed
+        project_ids.update(self.run_write(insert))
+        return len(new_names)
+
+    # ===== EXPORT METHODS =====
+
+    def iter_task_rows(self, batch_size=50000):
+        """Yield flat task rows in batches, all read from a single cursor"""
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(TASK_ROWS_QUERY)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+
+
+    def get_export_snapshot(self, snapshot_path):
+        """Copy the database into snapshot_path for a round of exports, returns its change watermark.
+
+        SQLite's online backup copies every page in one step, so the copy is
+        a single consistent state even while timers keep writing. Export
+        worker processes each open the copy instead of being sent the rows.
+        """
+        conn = self.get_connection()
+        target = sqlite3.connect(snapshot_path)
+        try:
+            conn.backup(target)
+            # Readers of the copy open it read-only, which WAL mode would not allow without a -shm file
+            target.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            target.close()
+            conn.close()
+        return DatabaseManager(snapshot_path, read_only=True).get_change_watermark()
+
+    def get_changes_since(self, watermark):
+        """Get everything changed after the watermark from one consistent snapshot.
+
+        Returns (projects, tasks, deletions, new_watermark). Pass a watermark
+        of None to get every row. Watermarks are change_seq numbers, which
+        never repeat or go back the way updated_at can.
+        """
+        if watermark is None:
+            watermark = -1
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            cursor.execute('''
+                SELECT id, name, created_at, updated_at
+                FROM projects
+                WHERE change_seq > ?
+                ORDER BY change_seq
+            ''', (watermark,))
+            projects = cursor.fetchall()
+            cursor.execute('''
+                SELECT id, project_id, name, total_seconds, is_finished, is_running, created_at, updated_at
+                FROM tasks
+                WHERE change_seq > ?
+                ORDER BY change_seq
+            ''', (watermark,))
+            tasks = cursor.fetchall()
+            cursor.execute('''
+                SELECT table_name, row_id, deleted_at
+                FROM deleted_rows
+                WHERE change_seq > ?
+                ORDER BY change_seq
+            ''', (watermark,))
+            deletions = cursor.fetchall()
+            new_watermark = self.get_change_watermark(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+        return projects, tasks, deletions, new_watermark
+
+    # ===== CHANGE TRACKING METHODS =====
+
+    def get_change_watermark(self, conn=None):
+        """Get the change sequence number of the most recent insert, update or delete"""
+        own_connection = conn is None
+        if own_connection:
+            conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT value FROM change_sequence')
+        watermark = cursor.fetchone()[0]
+        if own_connection:
+            conn.close()
+        return watermark
+
+    def get_changed_project_ids(self, watermark, conn=None):
+        """Get the ids of projects whose own row or tasks changed after the watermark"""
+        own_connection = conn is None
+        if own_connection:
+            conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT id FROM projects WHERE change_seq > ?
+            UNION
+            SELECT project_id FROM tasks WHERE change_seq > ?
+            UNION
+            SELECT CASE WHEN table_name = 'projects' THEN row_id ELSE parent_id END
+            FROM deleted_rows
+            WHERE change_seq > ?
+        ''', (watermark, watermark, watermark))
+        project_ids = {row[0] for row in cursor.fetchall() if row[0] is not None}
+        if own_connection:
+            conn.close()
+        return project_ids
+
+    # ===== SESSION METHODS =====
+
+    def iter_session_rows(self, since=None):
+        """Yield (project_id, started_at, ended_at) for every session.
+
+        Sessions that are still open are reported as ending now.
+        """
+        now = time.time()
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT t.project_id, s.started_at, COALESCE(s.ended_at, ?)
+                FROM sessions s
+                JOIN tasks t ON t.id = s.task_id
+                WHERE COALESCE(s.ended_at, ?) >= ?
+            ''', (now, now, since if since is not None else 0))
+            yield from cursor
+        finally:
+            conn.close()
+
+    # ===== MAINTENANCE METHODS =====
+
+    def run_maintenance(self, should_continue=None):
+        """Run PRAGMA optimize, ANALYZE, incremental vacuum and a WAL checkpoint.
+
+        Each step is recorded in maintenance_log. should_continue() is asked
+        before every step, between vacuum slices and while a statement runs;
+        when it returns False the pass stops early (a running statement is
+        aborted). Returns True if every step ran.
+        """
+        steps = [
+            ('optimize', self._maintenance_optimize),
+            ('analyze', self._maintenance_analyze),
+            ('incremental_vacuum', lambda conn: self._maintenance_vacuum(conn, should_continue)),
+            ('wal_checkpoint', self._maintenance_checkpoint),
+        ]
+
+        conn = self.get_connection()
+        if should_continue is not None:
+            conn.set_progress_handler(lambda: 0 if should_continue() else 1, INTERRUPT_CHECK_STEPS)
+        try:
+            for step, operation in steps:
+                if should_continue is not None and not should_continue():
+                    return False
+
+                started_at = time.time()
+                start = time.perf_counter()
+                try:
+                    detail = operation(conn)
+                except sqlite3.OperationalError:
+                    # Aborted by the progress handler, nothing of the step was kept
+                    if should_continue is not None and not should_continue():
+                        conn.rollback()
+                        return False
+                    raise
+                duration = time.perf_counter() - start
+
+                self.run_write(lambda cursor: cursor.execute(
+                    'INSERT INTO maintenance_log (step, started_at, duration, detail) VALUES (?, ?, ?, ?)',
+                    (step, started_at, duration, detail)))
+                print(f"Maintenance: {step} took {duration * 1000:.0f} ms ({detail})")
+
+            self.run_write(lambda cursor: cursor.execute(
+                'DELETE FROM maintenance_log WHERE started_at < ?',
+                (time.time() - MAINTENANCE_LOG_DAYS * 86400,)))
+        finally:
+            conn.set_progress_handler(None, 0)
+            conn.close()
+        return True
+
+    def full_vacuum(self):
+        """Rewrite the whole file with VACUUM, returns the number of pages freed.
+
+        Holds the write lock until the file is rebuilt, so it only runs when
+        asked for (cli.py maintain --full), never as idle maintenance. When
+        no other connection is open, the file is also switched to incremental
+        auto_vacuum, so later idle passes can free pages in small steps.
+        """
+        conn = self.get_connection()
+        try:
+            free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            started_at = time.time()
+            start = time.perf_counter()
+
+            converted = False
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                # auto_vacuum can only change through VACUUM outside WAL mode,
+                # and leaving WAL needs the only connection to the file
+                try:
+                    if conn.execute('PRAGMA journal_mode = DELETE').fetchone()[0] == 'delete':
+                        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                        converted = True
+                except sqlite3.OperationalError:
+                    pass
+            try:
+                conn.execute('VACUUM')
+            finally:
+                if conn.execute('PRAGMA journal_mode').fetchone()[0] != 'wal':
+                    conn.execute('PRAGMA journal_mode = WAL')
+
+            duration = time.perf_counter() - start
+            detail = f"freed {free_pages} pages{', auto_vacuum now incremental' if converted else ''}"
+        finally:
+            conn.close()
+
+        self.run_write(lambda cursor: cursor.execute(
+            'INSERT INTO maintenance_log (step, started_at, duration, detail) VALUES (?, ?, ?, ?)',
+            ('full_vacuum', started_at, duration, detail)))
+        print(f"Maintenance: full_vacuum took {duration * 1000:.0f} ms ({detail})")
+        return free_pages
+
+    def _maintenance_optimize(self, conn):
+        """Let SQLite refresh the statistics it thinks are stale"""
+        conn.execute(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}')
+        conn.execute('PRAGMA optimize')
+        return 'ok'
+
+    def _maintenance_analyze(self, conn):
+        """Gather planner statistics (sampled, so it stays quick on big files)"""
+        conn.execute(f'PRAGMA analysis_limit = {ANALYSIS_LIMIT}')
+        conn.execute('ANALYZE')
+        conn.commit()
+        return 'ok'
+
+    def _maintenance_vacuum(self, conn, should_continue=None):
+        """Give free pages back to the file system a slice at a time"""
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if free_pages == 0:
+            return 'no free pages'
+
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0]
+        if auto_vacuum != 2:
+            # Databases created before incremental auto_vacuum can only be
+            # compacted by a full VACUUM, which blocks writers throughout
+            # and is left to an explicit full_vacuum
+            return f'{free_pages} of {page_count} pages free, auto_vacuum off (maintain --full compacts)'
+
+        freed = 0
+        while free_pages:
+            conn.execute(f'PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})').fetchall()
+            remaining = conn.execute('PRAGMA freelist_count').fetchone()[0]
+            if remaining >= free_pages:
+                break
+            freed += free_pages - remaining
+            free_pages = remaining
+            if should_continue is not None and not should_continue():
+                break
+        return f'freed {freed} pages, {free_pages} left'
+
+    def _maintenance_checkpoint(self, conn):
+        """Copy the WAL into the database and truncate it"""
+        busy, log_frames, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+        if busy:
+            return f'busy, {checkpointed} of {log_frames} frames checkpointed'
+        return 'ok'
+
+    def get_maintenance_log(self, limit=20):
+        """Get the most recent (step, started_at, duration, detail) maintenance entries"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT step, started_at, duration, detail
+            FROM maintenance_log
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (limit,))
+        log = cursor.fetchall()
+        conn.close()
+        return log
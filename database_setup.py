@@ -1,44 +1,304 @@
-import sqlite3
-import os
-
-def create_database():
-    # Create database folder if it doesn't exist
-    if not os.path.exists('database'):
-        os.makedirs('database')
-    
-    # Connect to database (creates it if it doesn't exist)
-    conn = sqlite3.connect('database/timetracker.db')
-    cursor = conn.cursor()
-    
-    # Create Projects table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS projects (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    # Create Tasks table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            project_id INTEGER NOT NULL,
-            name TEXT NOT NULL,
-            total_seconds INTEGER DEFAULT 0,
-            is_finished INTEGER DEFAULT 0,
-            is_running INTEGER DEFAULT 0,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
-        )
-    ''')
-    
-    # Commit and close
-    conn.commit()
-    conn.close()
-    
-    print("Database created successfully!")
-    print("Location: database/timetracker.db")
-
-if __name__ == '__main__':
-    create_database()
\ No newline at end of file
+import sqlite3
+import os
+
+# Current time as a Unix timestamp with millisecond precision
+NOW_EXPRESSION = "((julianday('now') - 2440587.5) * 86400.0)"
+
+# Settings holding change watermarks, converted when change_seq is introduced
+WATERMARK_SETTINGS_FILTER = "key LIKE 'delta_watermark:%' OR key = 'export_last_watermark'"
+
+def add_column_if_missing(cursor, table, column, definition):
+    """Add a column to an existing table (used to upgrade older databases), True if it was added"""
+    columns = [row[1] for row in cursor.execute(f'PRAGMA table_info({table})')]
+    if column not in columns:
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        return True
+    return False
+
+# Takes the next number of the change sequence (two statements of a trigger body)
+NEXT_CHANGE_SEQ = 'UPDATE change_sequence SET value = value + 1'
+CURRENT_CHANGE_SEQ = '(SELECT value FROM change_sequence)'
+
+def create_change_tracking(cursor, table, parent_column=None):
+    """Stamp every insert/update with updated_at and the next change_seq, and record deletions.
+
+    change_seq is the watermark of change tracking: unlike the wall clock
+    it never repeats or goes back, so no change is skipped.
+    """
+    parent_value = f'OLD.{parent_column}' if parent_column else 'NULL'
+    # Inserts that already supply change_seq (bulk import) skip the extra UPDATE.
+    # Always recreated so older databases pick up the current bodies.
+    cursor.execute(f'DROP TRIGGER IF EXISTS {table}_touch_after_insert')
+    cursor.execute(f'''
+        CREATE TRIGGER {table}_touch_after_insert
+        AFTER INSERT ON {table}
+        WHEN NEW.change_seq IS NULL
+        BEGIN
+            {NEXT_CHANGE_SEQ};
+            UPDATE {table}
+            SET updated_at = COALESCE(NULLIF(NEW.updated_at, 0), {NOW_EXPRESSION}),
+                change_seq = {CURRENT_CHANGE_SEQ}
+            WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute(f'DROP TRIGGER IF EXISTS {table}_touch_after_update')
+    cursor.execute(f'''
+        CREATE TRIGGER {table}_touch_after_update
+        AFTER UPDATE ON {table}
+        WHEN NEW.change_seq IS OLD.change_seq
+        BEGIN
+            {NEXT_CHANGE_SEQ};
+            UPDATE {table}
+            SET updated_at = CASE WHEN NEW.updated_at IS OLD.updated_at
+                                  THEN {NOW_EXPRESSION} ELSE NEW.updated_at END,
+                change_seq = {CURRENT_CHANGE_SEQ}
+            WHERE id = NEW.id;
+        END
+    ''')
+    cursor.execute(f'DROP TRIGGER IF EXISTS {table}_tombstone_after_delete')
+    cursor.execute(f'''
+        CREATE TRIGGER {table}_tombstone_after_delete
+        AFTER DELETE ON {table}
+        BEGIN
+            {NEXT_CHANGE_SEQ};
+            INSERT INTO deleted_rows (table_name, row_id, parent_id, deleted_at, change_seq)
+            VALUES ('{table}', OLD.id, {parent_value}, {NOW_EXPRESSION}, {CURRENT_CHANGE_SEQ});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_{table}_updated_at
+        ON {table} (updated_at)
+    ''')
+    cursor.execute(f'''
+        CREATE INDEX IF NOT EXISTS idx_{table}_change_seq
+        ON {table} (change_seq)
+    ''')
+
+def number_existing_changes(cursor):
+    """Give the rows of a database from before change_seq sequence numbers in updated_at order.
+
+    Stored watermarks (timestamps until now) become the number of the
+    last change they covered, so the next delta export carries on from
+    where the previous one stopped.
+    """
+    cursor.execute('''
+        CREATE TEMP TABLE change_order AS
+        SELECT table_name, row_id, changed_at,
+               ROW_NUMBER() OVER (ORDER BY changed_at, table_name, row_id) AS seq
+        FROM (
+            SELECT 'projects' AS table_name, id AS row_id, updated_at AS changed_at FROM projects
+            UNION ALL
+            SELECT 'tasks', id, updated_at FROM tasks
+            UNION ALL
+            SELECT 'deleted_rows', id, deleted_at FROM deleted_rows
+        )
+    ''')
+    cursor.execute('CREATE INDEX temp.idx_change_order ON change_order (table_name, row_id)')
+    for table in ('projects', 'tasks', 'deleted_rows'):
+        cursor.execute(f'''
+            UPDATE {table}
+            SET change_seq = (SELECT seq FROM change_order WHERE table_name = '{table}' AND row_id = {table}.id)
+        ''')
+    cursor.execute(f'''
+        UPDATE settings
+        SET value = (SELECT COALESCE(MAX(seq), 0) FROM change_order
+                     WHERE changed_at <= CAST(settings.value AS REAL))
+        WHERE {WATERMARK_SETTINGS_FILTER}
+    ''')
+    cursor.execute('UPDATE change_sequence SET value = (SELECT COALESCE(MAX(seq), 0) FROM change_order)')
+    cursor.execute('DROP TABLE change_order')
+
+def create_database(db_path='database/timetracker.db', verbose=True, busy_timeout=5.0):
+    # Create database folder if it doesn't exist
+    db_folder = os.path.dirname(db_path)
+    if db_folder and not os.path.exists(db_folder):
+        os.makedirs(db_folder)
+    
+    # Connect to database (creates it if it doesn't exist)
+    conn = sqlite3.connect(db_path, timeout=busy_timeout)
+    cursor = conn.cursor()
+
+    # New databases give freed pages back in small steps (see run_maintenance)
+    cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
+    # WAL lets readers (other instances, the API server, the CLI) keep
+    # working while one connection writes. The mode is stored in the file.
+    cursor.execute('PRAGMA journal_mode=WAL')
+
+    # Run the whole setup as one write transaction so several processes
+    # starting at once (which drop and recreate triggers) take turns
+    cursor.execute('BEGIN IMMEDIATE')
+    
+    # Create Projects table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS projects (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at REAL DEFAULT 0,
+            change_seq INTEGER
+        )
+    ''')
+    
+    # Create Tasks table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            project_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            total_seconds INTEGER DEFAULT 0,
+            is_finished INTEGER DEFAULT 0,
+            is_running INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at REAL DEFAULT 0,
+            change_seq INTEGER,
+            FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Create Sessions table (one row per start/pause interval of a task)
+    # started_at / ended_at are Unix timestamps in seconds
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id INTEGER NOT NULL,
+            started_at REAL NOT NULL,
+            ended_at REAL,
+            FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sessions_task
+        ON sessions (task_id, started_at, ended_at)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sessions_open
+        ON sessions (task_id)
+        WHERE ended_at IS NULL
+    ''')
+    
+    # Covering index for per-project totals (and task lookups by project)
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_tasks_project_totals
+        ON tasks (project_id, total_seconds, is_finished, is_running)
+    ''')
+    
+    # Upgrade databases created before change tracking existed
+    add_column_if_missing(cursor, 'projects', 'updated_at', 'REAL DEFAULT 0')
+    add_column_if_missing(cursor, 'tasks', 'updated_at', 'REAL DEFAULT 0')
+    
+    # Create Deleted Rows table (tombstones for incremental exports)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS deleted_rows (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            parent_id INTEGER,
+            deleted_at REAL NOT NULL,
+            change_seq INTEGER
+        )
+    ''')
+    add_column_if_missing(cursor, 'deleted_rows', 'parent_id', 'INTEGER')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_deleted_rows_deleted_at
+        ON deleted_rows (deleted_at)
+    ''')
+    
+    # Create Change Sequence table (one row: the number of the latest change)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_sequence (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            value INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO change_sequence (id, value) VALUES (1, 0)')
+    # Upgrade databases created before the change sequence existed
+    sequence_added = [add_column_if_missing(cursor, table, 'change_seq', 'INTEGER')
+                      for table in ('projects', 'tasks', 'deleted_rows')]
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_deleted_rows_change_seq
+        ON deleted_rows (change_seq)
+    ''')
+    
+    create_change_tracking(cursor, 'projects')
+    create_change_tracking(cursor, 'tasks', parent_column='project_id')
+    
+    # Create Settings table (key/value store for app state such as export watermarks)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+    if any(sequence_added):
+        number_existing_changes(cursor)
+    
+    # Create Clients and Tags tables, linked many-to-many to projects / tasks
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS project_clients (
+            project_id INTEGER NOT NULL,
+            client_id INTEGER NOT NULL,
+            PRIMARY KEY (project_id, client_id),
+            FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
+            FOREIGN KEY (client_id) REFERENCES clients (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_project_clients_client
+        ON project_clients (client_id, project_id)
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS task_tags (
+            task_id INTEGER NOT NULL,
+            tag_id INTEGER NOT NULL,
+            PRIMARY KEY (task_id, tag_id),
+            FOREIGN KEY (task_id) REFERENCES tasks (id) ON DELETE CASCADE,
+            FOREIGN KEY (tag_id) REFERENCES tags (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_task_tags_tag
+        ON task_tags (tag_id, task_id)
+    ''')
+    
+    # Covering index for sessions overlapping a date range (filtered totals):
+    # recent ranges only scan sessions that ended after the range start
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_sessions_ended
+        ON sessions (ended_at, started_at, task_id)
+    ''')
+    
+    # Create Maintenance Log table (what idle-time maintenance ran and how long it took)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS maintenance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            step TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            duration REAL NOT NULL,
+            detail TEXT
+        )
+    ''')
+    
+    # Commit and close
+    conn.commit()
+    conn.close()
+    
+    if verbose:
+        print("Database created successfully!")
+        print(f"Location: {db_path}")
+
+if __name__ == '__main__':
+    from database_manager import DEFAULT_DB_PATH
+    create_database(DEFAULT_DB_PATH)
\ No newline at end of file
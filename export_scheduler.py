@@ -0,0 +1,346 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+from PyQt6.QtCore import QCoreApplication, QEvent, QObject, QThread, QTimer, pyqtSignal, pyqtSlot
+
+from database_manager import DatabaseManager
+
+# ===== SCHEDULED EXPORTS =====
+
+SCHEDULE_SETTING = 'export_schedule'
+DIRECTORY_SETTING = 'export_directory'
+FORMATS_SETTING = 'export_formats'
+LAST_RUN_SETTING = 'export_last_run'
+LAST_WATERMARK_SETTING = 'export_last_watermark'
+
+EXPORT_FORMATS = ('csv', 'xlsx', 'columnar')
+DEFAULT_FORMATS = 'csv'
+
+SCHEDULE_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+    '@monthly': '0 0 1 * *',
+}
+
+# (name, lowest, highest) of the five cron fields
+CRON_FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day of month', 1, 31),
+    ('month', 1, 12),
+    ('day of week', 0, 7),
+)
+
+MAX_SEARCH_DAYS = 5 * 366  # "31 2 *" style schedules never match
+
+STOP_TIMEOUT_MS = 2000  # How long stop() waits for a cancelled export
+
+# Exports cancelled by ExportScheduler.stop() that are still writing a
+# file; held here (without a parent) so closing the app never destroys a
+# running thread
+detached_workers = set()
+
+
+def parse_cron_field(text, name, lowest, highest):
+    """Parse one cron field ("*", "5", "1-5", "*/15", "0,30") into a set of values"""
+    values = set()
+    for part in text.split(','):
+        step = 1
+        if '/' in part:
+            part, step_text = part.split('/', 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise ValueError(f"Invalid step in {name} field: {text}")
+            step = int(step_text)
+
+        if part == '*':
+            start, end = lowest, highest
+        elif '-' in part:
+            start_text, end_text = part.split('-', 1)
+            if not (start_text.isdigit() and end_text.isdigit()):
+                raise ValueError(f"Invalid range in {name} field: {text}")
+            start, end = int(start_text), int(end_text)
+        elif part.isdigit():
+            start = int(part)
+            end = highest if step > 1 else start
+        else:
+            raise ValueError(f"Invalid {name} field: {text}")
+
+        if start < lowest or end > highest or start > end:
+            raise ValueError(f"{name.capitalize()} must be between {lowest} and {highest}: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """A five field cron schedule: minute hour day-of-month month day-of-week"""
+
+    def __init__(self, spec):
+        self.spec = spec.strip()
+        fields = SCHEDULE_ALIASES.get(self.spec, self.spec).split()
+        if len(fields) != 5:
+            raise ValueError("A schedule needs five fields: minute hour day month weekday")
+
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            parse_cron_field(text, *field) for text, field in zip(fields, CRON_FIELDS))
+        # Cron counts Sunday as 0 (and 7)
+        self.weekdays = {day % 7 for day in weekdays}
+
+        # As in cron, a restricted day of month and day of week match either one
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+    def matches_day(self, moment):
+        """True if the schedule runs on the day of moment"""
+        day_match = moment.day in self.days
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def next_after(self, timestamp):
+        """Get the first run time (Unix seconds) after timestamp, None if there is none"""
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        last = moment + timedelta(days=MAX_SEARCH_DAYS)
+
+        # Skip whole months, days and hours that cannot match
+        while moment < last:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1) + timedelta(days=32)).replace(day=1, hour=0, minute=0)
+            elif not self.matches_day(moment):
+                moment = (moment + timedelta(days=1)).replace(hour=0, minute=0)
+            elif moment.hour not in self.hours:
+                moment = (moment + timedelta(hours=1)).replace(minute=0)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        return None
+
+
+def export_extension(export_format):
+    """File extension written for an export format"""
+    if export_format == 'columnar':
+        from exporters import pyarrow_available
+        return '.parquet' if pyarrow_available() else '.jsonl'
+    return f'.{export_format}'
+
+
+class ExportWorker(QThread):
+    """Write one round of exports from a read-only connection.
+
+    Every format is written from the same snapshot (in parallel worker
+    processes for large workspaces). Skips the round when the change
+    watermark has not moved since last_watermark. Files are written under
+    a hidden name and renamed once complete, so sync tools never pick up
+    half-written exports. requestInterruption() cancels the round before
+    its next format; nothing is emitted for a cancelled round.
+    """
+
+    exported = pyqtSignal(list, object)
+    skipped = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self, db_path, directory, formats, last_watermark=None, parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.directory = directory
+        self.formats = formats
+        self.last_watermark = last_watermark
+
+    def run(self):
+        """Thread body"""
+        from exporters import ExportSnapshot, export_files
+
+        db = None
+        try:
+            # Read-only: the worker never takes the write lock a running timer needs
+            db = DatabaseManager(self.db_path, verbose=False, read_only=True)
+            watermark = db.get_change_watermark()
+            if self.last_watermark is not None and watermark <= self.last_watermark:
+                self.skipped.emit()
+                return
+
+            snapshot = ExportSnapshot.read(db)
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                file_names = [f"time_tracker_{stamp}{export_extension(export_format)}"
+                              for export_format in self.formats]
+                export_files(snapshot, [os.path.join(self.directory, f".{file_name}") for file_name in file_names],
+                             should_continue=lambda: not self.isInterruptionRequested())
+            finally:
+                snapshot.close()
+
+            if self.isInterruptionRequested():
+                for file_name in file_names:
+                    hidden_path = os.path.join(self.directory, f".{file_name}")
+                    if os.path.exists(hidden_path):
+                        os.remove(hidden_path)
+                print("Export cancelled")
+                return
+
+            paths = []
+            for file_name in file_names:
+                file_path = os.path.join(self.directory, file_name)
+                os.replace(os.path.join(self.directory, f".{file_name}"), file_path)
+                paths.append(file_path)
+
+            self.exported.emit(paths, snapshot.watermark)
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            # No handle on the workspace file outlives the round (e.g. after a switch)
+            if db is not None:
+                db.close()
+
+
+def release_detached_worker(worker):
+    """Drop a detached export once its thread has ended"""
+    worker.wait()
+    detached_workers.discard(worker)
+
+
+class ExportScheduler(QObject):
+    """Run ExportWorker whenever the configured cron schedule is due.
+
+    The schedule, target directory and formats live in the settings table.
+    A run missed while the app was closed is made up once at the next
+    check. Exports run on a low priority thread, so the timers and the
+    tree keep updating while files are written. A round's outcome is
+    recorded in the database it exported (worker_db), even when db has
+    been switched to another workspace since.
+    """
+
+    statusChanged = pyqtSignal(str)
+
+    def __init__(self, db, check_interval_ms=30000, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.worker = None
+        self.worker_db = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(check_interval_ms)
+        self.timer.timeout.connect(self.check_due)
+
+    def start(self):
+        """Start checking the schedule"""
+        self.timer.start()
+
+    def stop(self):
+        """Stop checking and cancel a running export.
+
+        The export stops before its next format. One still writing after
+        STOP_TIMEOUT_MS is left to finish in the background, and its result
+        is dropped.
+        """
+        self.timer.stop()
+        if self.worker is None:
+            return
+
+        self.worker.requestInterruption()
+        if self.worker.wait(STOP_TIMEOUT_MS):
+            # Record its outcome now, while worker_db is surely still open
+            QCoreApplication.sendPostedEvents(self, QEvent.Type.MetaCall.value)
+            if self.worker is not None:
+                self.worker.deleteLater()
+                self.worker = None
+                self.worker_db = None
+            return
+
+        print("Scheduled export still writing, leaving it to finish in the background")
+        worker = self.worker
+        self.worker = None
+        self.worker_db = None
+        for signal in (worker.exported, worker.skipped, worker.failed, worker.finished):
+            signal.disconnect()
+        worker.setParent(None)
+        detached_workers.add(worker)
+        worker.finished.connect(lambda: release_detached_worker(worker))
+
+    def get_schedule(self):
+        """Get the configured CronSchedule, None when scheduled exports are off"""
+        spec = self.db.get_setting(SCHEDULE_SETTING, '')
+        if not spec.strip():
+            return None
+        try:
+            return CronSchedule(spec)
+        except ValueError as e:
+            print(f"Ignoring invalid export schedule '{spec}': {e}")
+            return None
+
+    def get_formats(self):
+        """Get the configured export formats"""
+        formats = self.db.get_setting(FORMATS_SETTING, DEFAULT_FORMATS).split(',')
+        return [export_format for export_format in formats if export_format in EXPORT_FORMATS]
+
+    def configure(self, spec, directory, formats):
+        """Store a new schedule; the first run is the next scheduled time from now"""
+        if spec.strip():
+            CronSchedule(spec)  # Raises ValueError for an invalid schedule
+        self.db.set_setting(SCHEDULE_SETTING, spec.strip())
+        self.db.set_setting(DIRECTORY_SETTING, directory)
+        self.db.set_setting(FORMATS_SETTING, ','.join(formats))
+        self.db.set_setting(LAST_RUN_SETTING, time.time())
+
+    def next_run(self):
+        """Get the next scheduled run time (Unix seconds), None when there is none"""
+        schedule = self.get_schedule()
+        if schedule is None:
+            return None
+        last_run = float(self.db.get_setting(LAST_RUN_SETTING, time.time()))
+        return schedule.next_after(last_run)
+
+    def check_due(self):
+        """Timer tick: start an export if the schedule is due"""
+        if self.worker is not None:
+            return
+
+        directory = self.db.get_setting(DIRECTORY_SETTING, '')
+        formats = self.get_formats()
+        next_run = self.next_run()
+        if next_run is None or not directory or not formats or next_run > time.time():
+            return
+
+        last_watermark = self.db.get_setting(LAST_WATERMARK_SETTING)
+        self.db.flush()  # The worker reads the database file
+        self.worker_db = self.db
+        self.worker = ExportWorker(
+            self.db.db_path, directory, formats,
+            None if last_watermark is None else int(last_watermark), parent=self)
+        self.worker.exported.connect(self.on_exported)
+        self.worker.skipped.connect(self.on_skipped)
+        self.worker.failed.connect(self.on_failed)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.worker.start(QThread.Priority.LowestPriority)
+
+    @pyqtSlot(list, object)
+    def on_exported(self, paths, watermark):
+        """Remember what was exported"""
+        self.worker_db.set_setting(LAST_RUN_SETTING, time.time())
+        self.worker_db.set_setting(LAST_WATERMARK_SETTING, watermark)
+        print(f"Scheduled export wrote {', '.join(paths)}")
+        self.statusChanged.emit(f"Scheduled export saved to {os.path.dirname(paths[0])}")
+
+    @pyqtSlot()
+    def on_skipped(self):
+        """Nothing changed since the last export"""
+        self.worker_db.set_setting(LAST_RUN_SETTING, time.time())
+        print("Scheduled export skipped, nothing changed since the last one")
+
+    @pyqtSlot(str)
+    def on_failed(self, message):
+        """Report the error and wait for the next scheduled time"""
+        self.worker_db.set_setting(LAST_RUN_SETTING, time.time())
+        print(f"Scheduled export failed: {message}")
+        self.statusChanged.emit(f"Scheduled export failed: {message}")
+
+    @pyqtSlot()
+    def on_worker_finished(self):
+        """Release the finished worker"""
+        if self.worker is not None:
+            self.worker.deleteLater()
+            self.worker = None
+            self.worker_db = None
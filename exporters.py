@@ -0,0 +1,413 @@
+import csv
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+# pyarrow is optional: without it columnar exports fall back to JSON Lines
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    import pyarrow.parquet as pa_parquet
+except ImportError:
+    pa = None
+
+# ===== SPREADSHEET EXPORT =====
+
+def format_seconds(total_seconds):
+    """Format seconds as HH:MM:SS"""
+    h = total_seconds // 3600
+    m = (total_seconds % 3600) // 60
+    s = total_seconds % 60
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+def task_status(is_finished, is_running):
+    """Human readable status of a task"""
+    if is_finished:
+        return "Finished"
+    elif is_running:
+        return "Running"
+    return "Paused"
+
+
+def write_csv(db, file_path):
+    """Write all projects and tasks to a human readable CSV file"""
+    with open(file_path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+
+        # Header
+        headers = ['Project', 'Task', 'Time (HH:MM:SS)', 'Status']
+        writer.writerow(headers)
+
+        projects = db.get_project_summaries()
+
+        for project_id, project_name, total_seconds, task_count, finished_count, running_count in projects:
+            if not task_count:
+                project_time = "00:00:00"
+                project_status = "N/A"
+                writer.writerow([project_name, '', project_time, 'No tasks'])
+            else:
+                tasks = db.get_tasks_for_project(project_id)
+                project_time = format_seconds(total_seconds)
+
+                # Determine project status
+                project_status = "Finished" if finished_count == task_count else "Open"
+
+                # First task in the same row as the project, remaining tasks below it
+                for index, (task_id, task_name, task_seconds, is_finished, is_running) in enumerate(tasks):
+                    writer.writerow([
+                        project_name if index == 0 else '',
+                        task_name,
+                        format_seconds(task_seconds),
+                        task_status(is_finished, is_running)
+                    ])
+
+            # Project Total row
+            writer.writerow([
+                "Total:",
+                '',
+                project_time,
+                f"{task_count} task(s), Status: {project_status}"
+            ])
+
+
+def write_excel(db, file_path):
+    """Write all projects and tasks to a formatted Excel workbook"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Time Tracker"
+
+    # Header
+    headers = ['Project', 'Task', 'Time (HH:MM:SS)', 'Status']
+    ws.append(headers)
+
+    # Bold header
+    for cell in ws[ws.max_row]:
+        cell.font = Font(bold=True)
+
+    projects = db.get_project_summaries()
+
+    for project_id, project_name, total_seconds, task_count, finished_count, running_count in projects:
+        if not task_count:
+            ws.append([project_name, 'N/A', '00:00:00', 'No tasks'])
+            ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
+        else:
+            tasks = db.get_tasks_for_project(project_id)
+            project_time = format_seconds(total_seconds)
+
+            # Determine project status
+            if finished_count == task_count:
+                project_status = "Finished"
+            else:
+                project_status = "In Progress"
+
+            projectFirstLine = True
+
+            for task_id, task_name, task_seconds, is_finished, is_running in tasks:
+                time_str = format_seconds(task_seconds)
+                status = task_status(is_finished, is_running)
+
+                #Include project name in the first line of the project
+                if (projectFirstLine):
+                    ws.append([
+                        f"{project_name}",
+                        task_name,
+                        time_str,
+                        status
+                    ])
+                    ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
+                    projectFirstLine = False
+                else:
+                    ws.append([
+                        "",
+                        task_name,
+                        time_str,
+                        status
+                    ])
+
+
+            # Project summary row
+            ws.append([
+                '',
+                f"{task_count} task(s)",
+                project_time,
+                project_status
+            ])
+
+            for cell in ws[ws.max_row]:
+                cell.font = Font(bold=True)
+            
+        # Empty row between projects
+        ws.append([])
+
+    # Auto-size columns
+    for column in ws.columns:
+        max_length = max(len(str(cell.value)) if cell.value else 0 for cell in column)
+        ws.column_dimensions[column[0].column_letter].width = max_length + 2
+
+    wb.save(file_path)
+
+# ===== COLUMNAR EXPORT =====
+
+COLUMNAR_FIELDS = [
+    'project_id',
+    'project_name',
+    'project_created_at',
+    'task_id',
+    'task_name',
+    'seconds',
+    'status',
+    'is_finished',
+    'is_running',
+    'task_created_at',
+]
+
+PARQUET_EXTENSIONS = ('.parquet',)
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+
+
+def pyarrow_available():
+    """Return True if Parquet / Arrow IPC exports are possible"""
+    return pa is not None
+
+
+def columnar_format_for_path(file_path):
+    """Pick the export format from the file extension"""
+    lower_path = file_path.lower()
+    if pa is not None and lower_path.endswith(PARQUET_EXTENSIONS):
+        return 'parquet'
+    if pa is not None and lower_path.endswith(ARROW_EXTENSIONS):
+        return 'arrow'
+    return 'jsonl'
+
+
+def _arrow_schema():
+    """Typed schema shared by the Parquet and Arrow IPC writers"""
+    timestamp = pa.timestamp('s', tz='UTC')
+    return pa.schema([
+        ('project_id', pa.int64()),
+        ('project_name', pa.string()),
+        ('project_created_at', timestamp),
+        ('task_id', pa.int64()),
+        ('task_name', pa.string()),
+        ('seconds', pa.int64()),
+        ('status', pa.string()),
+        ('is_finished', pa.bool_()),
+        ('is_running', pa.bool_()),
+        ('task_created_at', timestamp),
+    ])
+
+
+def _rows_to_record_batch(rows, schema):
+    """Convert a list of row tuples into an Arrow record batch"""
+    columns = list(zip(*rows))
+    arrays = []
+    for index, field in enumerate(schema):
+        values = columns[index]
+        if pa.types.is_timestamp(field.type):
+            # Timestamps arrive as ISO-8601 strings, let Arrow parse them in bulk
+            arrays.append(pa.array(values, pa.string()).cast(field.type))
+        elif pa.types.is_boolean(field.type):
+            # SQLite stores flags as 0/1 integers
+            arrays.append(pa.array(values, pa.int8()).cast(field.type))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def export_columnar(db, file_path, batch_size=50000):
+    """Export flat, typed task rows as Parquet, Arrow IPC or JSON Lines.
+
+    Rows are streamed from a single cursor in batches, so memory stays
+    bounded by batch_size regardless of workspace size.
+    Returns the number of rows written.
+    """
+    export_format = columnar_format_for_path(file_path)
+    batches = db.iter_task_rows(batch_size)
+    row_count = 0
+
+    if export_format == 'jsonl':
+        with open(file_path, mode='w', encoding='utf-8') as f:
+            for rows in batches:
+                lines = []
+                for row in rows:
+                    record = dict(zip(COLUMNAR_FIELDS, row))
+                    for flag in ('is_finished', 'is_running'):
+                        if record[flag] is not None:
+                            record[flag] = bool(record[flag])
+                    lines.append(json.dumps(record, ensure_ascii=False))
+                f.write('\n'.join(lines))
+                f.write('\n')
+                row_count += len(rows)
+        return row_count
+
+    schema = _arrow_schema()
+    if export_format == 'parquet':
+        writer = pa_parquet.ParquetWriter(file_path, schema)
+    else:
+        writer = pa_ipc.new_file(file_path, schema)
+
+    try:
+        for rows in batches:
+            batch = _rows_to_record_batch(rows, schema)
+            if export_format == 'parquet':
+                writer.write_batch(batch)
+            else:
+                writer.write(batch)
+            row_count += len(rows)
+    finally:
+        writer.close()
+
+    return row_count
+
+# ===== EXPORT BY FILE TYPE =====
+
+def export_file(db, file_path):
+    """Write an export in the format given by the file extension.
+
+    .csv and .xlsx write the spreadsheet layout, anything else a columnar
+    export. Returns the number of task rows for columnar exports, None
+    for spreadsheets.
+    """
+    lower_path = file_path.lower()
+    if lower_path.endswith('.csv'):
+        write_csv(db, file_path)
+        return None
+    if lower_path.endswith('.xlsx'):
+        write_excel(db, file_path)
+        return None
+    return export_columnar(db, file_path)
+
+# ===== MULTI-FORMAT EXPORT =====
+
+# Below this many task rows, starting worker processes costs more than it saves
+PARALLEL_MIN_ROWS = 20000
+
+
+class ExportSnapshot:
+    """A consistent copy of the database, made once for a round of exports.
+
+    Worker processes are only sent its path: each opens the copy read-only
+    and streams its format from it, exactly as export_file does from the
+    live database. close() removes the copy.
+    """
+
+    def __init__(self, db_path, watermark, row_count, temp_dir=None):
+        self.db_path = db_path
+        self.watermark = watermark
+        self.row_count = row_count
+        self.temp_dir = temp_dir
+
+    @classmethod
+    def read(cls, db):
+        """Take a snapshot of a database (see DatabaseManager.get_export_snapshot)"""
+        temp_dir = tempfile.mkdtemp(prefix='timetracker-export-')
+        try:
+            db_path = os.path.join(temp_dir, 'snapshot.db')
+            watermark = db.get_export_snapshot(db_path)
+            snapshot = cls(db_path, watermark, 0, temp_dir)
+            snapshot.row_count = snapshot.open().get_totals()[1]
+            return snapshot
+        except Exception:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+
+    def open(self):
+        """Read-only DatabaseManager on the copy"""
+        from database_manager import DatabaseManager
+        return DatabaseManager(self.db_path, verbose=False, read_only=True)
+
+    def close(self):
+        """Remove the copy"""
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+
+def _export_snapshot_file(snapshot_path, file_path):
+    """Worker process job: write one export from the snapshot copy"""
+    from database_manager import DatabaseManager
+    return export_file(DatabaseManager(snapshot_path, verbose=False, read_only=True), file_path)
+
+
+def export_files(snapshot, file_paths, max_workers=None, should_continue=None):
+    """Write several exports (format by file extension) from one snapshot.
+
+    Each file is written by its own worker process, so the wall time is
+    close to that of the slowest format. Small snapshots (or a single CPU)
+    are written one after the other in this process instead, asking
+    should_continue() before each one. Returns {file_path: result of
+    export_file} for the files written.
+    """
+    max_workers = min(max_workers or len(file_paths), len(file_paths), os.cpu_count() or 1)
+    if max_workers < 2 or snapshot.row_count < PARALLEL_MIN_ROWS:
+        db = snapshot.open()
+        try:
+            results = {}
+            for file_path in file_paths:
+                if should_continue is not None and not should_continue():
+                    break
+                results[file_path] = export_file(db, file_path)
+            return results
+        finally:
+            db.close()
+
+    # Spawned workers: forking a process that runs Qt threads is not safe
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+        futures = {file_path: pool.submit(_export_snapshot_file, snapshot.db_path, file_path)
+                   for file_path in file_paths}
+        return {file_path: future.result() for file_path, future in futures.items()}
+
+# ===== DELTA EXPORT =====
+
+PROJECT_DELTA_FIELDS = ['id', 'name', 'created_at', 'updated_at']
+TASK_DELTA_FIELDS = ['id', 'project_id', 'name', 'total_seconds', 'is_finished', 'is_running',
+                     'created_at', 'updated_at']
+
+
+def delta_watermark_key(target):
+    """Settings key holding the watermark of a sync target"""
+    return f'delta_watermark:{target}'
+
+
+def export_delta(db, file_path, target='default'):
+    """Export only rows changed since the last delta export to `target`, as JSON Lines.
+
+    Each line is an upsert of a project/task or a delete tombstone. The
+    watermark is only advanced after the file has been written, so a failed
+    export is simply repeated next time.
+    Returns the number of changes written.
+    """
+    stored_watermark = db.get_setting(delta_watermark_key(target))
+    watermark = int(stored_watermark) if stored_watermark is not None else None
+
+    projects, tasks, deletions, new_watermark = db.get_changes_since(watermark)
+
+    with open(file_path, mode='w', encoding='utf-8') as f:
+        for row in projects:
+            record = {'op': 'upsert', 'table': 'projects'}
+            record.update(zip(PROJECT_DELTA_FIELDS, row))
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        for row in tasks:
+            record = {'op': 'upsert', 'table': 'tasks'}
+            record.update(zip(TASK_DELTA_FIELDS, row))
+            record['is_finished'] = bool(record['is_finished'])
+            record['is_running'] = bool(record['is_running'])
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        for table_name, row_id, deleted_at in deletions:
+            record = {'op': 'delete', 'table': table_name, 'id': row_id, 'deleted_at': deleted_at}
+            f.write(json.dumps(record) + '\n')
+
+    if watermark is None or new_watermark > watermark:
+        db.set_setting(delta_watermark_key(target), repr(new_watermark))
+
+    return len(projects) + len(tasks) + len(deletions)
@@ -1,956 +1,1981 @@
-import sys
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QDialog, QMessageBox, QFileDialog,
-                             QTreeWidgetItem, QPushButton, QHBoxLayout, QWidget, QInputDialog, QMenu)
-from PyQt6 import uic
-from database_manager import DatabaseManager
-from PyQt6.QtCore import QTimer, Qt
-from datetime import datetime
-from PyQt6.QtGui import QCloseEvent, QIcon, QBrush, QColor
-import csv
-from openpyxl import Workbook
-from openpyxl.styles import Font
-import os
-import ctypes
-
-# ===== GET RESOURCE PATH =====
-
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and PyInstaller """
-    try:
-        base_path = sys._MEIPASS  # PyInstaller temp folder
-    except AttributeError:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
-
-class TimeTrackerApp(QMainWindow):
-
-    #INIT FUNCTION
-
-    def __init__(self):
-        super().__init__()
-        
-        # Set window title
-        self.setWindowTitle("Time Tracker")
-
-        # Set the window icon
-        self.setWindowIcon(QIcon("assets/stopwatch.png")) 
-
-        # Load the UI file
-        uic.loadUi(resource_path('ui/main_window.ui'), self)
-        
-         # Set window icon
-        icon_path = resource_path('assets/stopwatch.ico')
-        if os.path.exists(icon_path):
-            self.setWindowIcon(QIcon(icon_path))
-
-        self.projectTreeWidget.setUniformRowHeights(True)
-        self.projectTreeWidget.setIndentation(18)
-        
-        # Initialize database manager
-        self.db = DatabaseManager()
-
-        # Timer for updating running task
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_running_task)
-        self.timer.start(1000)  # Update every 1 second
-        
-        # Track the currently running task
-        self.running_task_id = None
-        self.running_task_item = None
-        self.task_start_time = None
-        self.task_elapsed_before_start = 0  # Seconds already accumulated
-        
-        # Connect toolbar actions to methods
-        self.actionAddProject.triggered.connect(self.add_project)
-        self.actionExportCSV.triggered.connect(self.export_to_csv)
-        self.actionActionExportExcel.triggered.connect(self.export_to_excel)
-        
-        # Load projects into the tree
-        self.load_projects()
-        self.setup_tree_context_menu()
-
-        # Set column widths
-        self.projectTreeWidget.setColumnWidth(0, 300)  # Name column
-        self.projectTreeWidget.setColumnWidth(1, 100)  # Time column
-        self.projectTreeWidget.setColumnWidth(2, 250)  # Actions column
-        self.projectTreeWidget.setColumnWidth(3, 100)  # Status column
-        
-        print("App initialized successfully!")
-
-    # ===== PROJECT METHODS =====
-
-    def add_project(self):
-        """Handler for Add Project button"""
-        try:            
-            running_task = self.db.get_running_task()
-            if running_task:
-                QMessageBox.warning(
-                    self, 
-                    "Task Running", 
-                    f"Please pause or finish the currently running task first:\n{running_task[2]}"
-                )
-                return
-            
-            # Load the dialog UI
-            dialog = QDialog(self)
-            uic.loadUi(resource_path('ui/add_project_dialog.ui'), dialog)
-            
-            dialog.buttonBox.accepted.connect(dialog.accept)
-            dialog.buttonBox.rejected.connect(dialog.reject)
-            
-            # Show the dialog and wait for user response
-            if dialog.exec() == QDialog.DialogCode.Accepted:
-                # Get the project name from the line edit
-                project_name = dialog.projectNameLineEdit.text().strip()
-                
-                
-                if project_name:
-                    # Add to database
-                    project_id = self.db.add_project(project_name)
-                    print(f"Added project: {project_name} (ID: {project_id})")
-
-                    QMessageBox.information(
-                        dialog,
-                        "Project Added",
-                        f"The project '{project_name}' has been successfully added!"
-                    )
-                    
-                    # Reload the tree
-                    self.load_projects()
-                else:
-                    QMessageBox.warning(self, "Error", "Project name cannot be empty!")
-            else:
-                reply = QMessageBox.question(
-                    dialog,
-                    "Cancel",
-                    "Are you sure you want to cancel adding the project?",
-                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
-
-                if reply == QMessageBox.StandardButton.Yes:
-                    dialog.reject()
-                    
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
-
-
-    def rename_project(self, project_id, old_name):
-         # Check if another task is already running
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Already Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-
-        """Rename a project"""
-        new_name, ok = QInputDialog.getText(
-            self,
-            "Rename Project",
-            "Enter new project name:",
-            text=old_name
-        )
-        
-        if ok and new_name.strip():
-            self.db.rename_project(project_id, new_name.strip())
-            self.load_projects()
-            print(f"Renamed project {project_id} to '{new_name}'")
-
-    def delete_project(self, project_id, project_name):
-        """Delete a project"""
-        # Check if another task is already running
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-        
-        reply = QMessageBox.question(
-            self,
-            "Delete Project",
-            f"Are you sure you want to delete the project '{project_name}'?\n\n"
-            "This will also delete all tasks in this project.\n"
-            "This action cannot be undone.",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-            QMessageBox.StandardButton.No
-        )
-        
-        if reply == QMessageBox.StandardButton.Yes:
-            self.db.delete_project(project_id)
-            self.load_projects()
-            print(f"Deleted project {project_id}")
-
-    # ===== TASK METHODS =====      
-   
-    def add_task_to_project(self, project_id, project_name):
-        """Handler for adding a task to a specific project"""
-        # Check if another task is already running
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-        
-        # Load the dialog UI
-        dialog = QDialog(self)
-        uic.loadUi(resource_path('ui/add_task_dialog.ui'), dialog)
-        dialog.buttonBox.accepted.connect(dialog.accept)
-        dialog.buttonBox.rejected.connect(dialog.reject)
-        
-        # Update dialog title to show which project
-        dialog.setWindowTitle(f"Add Task to {project_name}")
-        
-        # Show the dialog and wait for user response
-        result = dialog.exec()
-        print("Dialog result:", result)
-
-        if result == QDialog.DialogCode.Accepted:
-            # Get the task name from the line edit
-            task_name = dialog.taskNameLineEdit.text().strip()
-            
-            if task_name:
-                # Add to database
-                task_id = self.db.add_task(project_id, task_name)
-                print(f"Added task: {task_name} to project ID {project_id} (Task ID: {task_id})")
-                
-                # Reload the tree
-                self.load_projects()
-            else:
-                QMessageBox.warning(self, "Error", "Task name cannot be empty!")
-        else:            
-            reply = QMessageBox.question(
-                dialog,
-                "Cancel",
-                "Are you sure you want to cancel adding the project?",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
-            )
-
-            if reply == QMessageBox.StandardButton.Yes:
-                dialog.reject()  # Closes the dialog without saving anything
-
-    def create_task_buttons(self, task_item, task_id, is_finished, is_running):
-        """Create action buttons for a task"""
-
-        # Create a widget to hold the buttons
-        button_widget = QWidget()
-        button_layout = QHBoxLayout()
-        button_layout.setContentsMargins(2, 2, 2, 2)
-        button_widget.setLayout(button_layout)
-        
-        if is_finished:
-            # Show only Reopen button for finished tasks
-            reopen_btn = QPushButton("Reopen")            
-            reopen_btn.setObjectName("primary")
-            reopen_btn.clicked.connect(lambda: self.reopen_task(task_id))
-            button_layout.addWidget(reopen_btn)
-        else:
-            # Show Pause and Finish buttons for active tasks
-            if is_running:
-                pause_btn = QPushButton("Pause")           
-                pause_btn.setObjectName("primary")
-                pause_btn.clicked.connect(lambda: self.pause_task(task_id))
-                button_layout.addWidget(pause_btn)
-
-                finish_btn = QPushButton("Finish")           
-                finish_btn.setObjectName("primary")
-                finish_btn.clicked.connect(lambda: self.finish_task(task_id))
-                button_layout.addWidget(finish_btn)
-            else:
-                start_btn = QPushButton("Start")                
-                start_btn.setObjectName("primary")
-                start_btn.clicked.connect(lambda: self.start_task(task_id))
-                button_layout.addWidget(start_btn)
-            
-            
-        
-        return button_widget
-
-    def start_task(self, task_id):
-        """Start a task timer"""
-        # Check if another task is already running
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Already Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-        
-        # Get current task's total seconds from database
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT total_seconds FROM tasks WHERE id = ?', (task_id,))
-        result = cursor.fetchone()
-        conn.close()
-        
-        # Start the task
-        self.running_task_id = task_id
-        self.task_start_time = datetime.now()
-        self.task_elapsed_before_start = result[0] if result else 0
-        
-        # Mark task as running in database
-        self.db.start_task(task_id)
-        
-         # Refresh UI
-        self.load_projects()
-        
-        # Find and store reference to the running task item
-        self.find_and_store_running_task_item(task_id)
-        
-        print(f"Started task {task_id}")
-
-    def pause_task(self, task_id):
-        """Pause a task timer"""
-        if self.running_task_id != task_id:
-            return
-        
-        # Calculate final time
-        current_time = datetime.now()
-        elapsed_seconds = int((current_time - self.task_start_time).total_seconds())
-        total_seconds = self.task_elapsed_before_start + elapsed_seconds
-        
-        # Update database
-        self.db.update_task_time(task_id, total_seconds)
-        self.db.pause_task(task_id)
-        
-        # Stop tracking
-        self.running_task_id = None
-        self.task_start_time = None
-        self.task_elapsed_before_start = 0
-        self.running_task_item = None
-        
-        # Refresh UI
-        self.load_projects()
-        print(f"Paused task {task_id}")
-
-    def finish_task(self, task_id):
-        """Finish a task"""
-        # If task is running, pause it first to save the time
-        if self.running_task_id == task_id:
-            # Calculate final time
-            current_time = datetime.now()
-            elapsed_seconds = int((current_time - self.task_start_time).total_seconds())
-            total_seconds = self.task_elapsed_before_start + elapsed_seconds
-            
-            # Update database with final time
-            self.db.update_task_time(task_id, total_seconds)
-            
-            # Stop tracking
-            self.running_task_id = None
-            self.task_start_time = None
-            self.task_elapsed_before_start = 0
-            self.running_task_item = None
-        
-        
-        # Mark as finished AND not running
-        self.db.finish_task(task_id)
-        self.db.pause_task(task_id)  # Make sure it's not marked as running
-        
-        # Refresh UI
-        self.load_projects()
-        print(f"Finished task {task_id}")
-
-    def reopen_task(self, task_id):
-        """Reopen a finished task"""
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-
-        self.db.reopen_task(task_id)
-        self.db.pause_task(task_id)  # Make sure it starts as paused, not running
-        self.load_projects()
-        print(f"Reopened task {task_id}")
-
-    def find_and_store_running_task_item(self, task_id):
-        """Find the tree widget item for the running task"""
-        # Search through all projects
-        for i in range(self.projectTreeWidget.topLevelItemCount()):
-            project_item = self.projectTreeWidget.topLevelItem(i)
-            
-            # Search through all tasks in this project
-            for j in range(project_item.childCount()):
-                task_item = project_item.child(j)
-                
-                # Check if this is our task
-                if task_item.data(0, 1) == task_id:
-                    self.running_task_item = task_item
-                    return
-
-    def rename_task(self, task_id, old_name):
-        """Rename a task"""
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-
-        new_name, ok = QInputDialog.getText(
-            self,
-            "Rename Task",
-            "Enter new task name:",
-            text=old_name
-        )
-        
-        if ok and new_name.strip():
-            self.db.rename_task(task_id, new_name.strip())
-            self.load_projects()
-            print(f"Renamed task {task_id} to '{new_name}'")
-
-    def delete_task(self, task_id, task_name):
-        """Delete a task"""
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-
-        # Check if this task is currently running
-        if self.running_task_id == task_id:
-            QMessageBox.warning(
-                self,
-                "Cannot Delete",
-                "Cannot delete a running task. Please pause or finish it first."
-            )
-            return
-        
-        reply = QMessageBox.question(
-            self,
-            "Delete Task",
-            f"Are you sure you want to delete the task '{task_name}'?\n\n"
-            "This action cannot be undone.",
-            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-            QMessageBox.StandardButton.No
-        )
-        
-        if reply == QMessageBox.StandardButton.Yes:
-            self.db.delete_task(task_id)
-            self.load_projects()
-            print(f"Deleted task {task_id}")
-
-    # ===== TREE METHODS =====           
-    
-    def setup_tree_context_menu(self):
-        """Setup right-click context menu for the tree"""
-        from PyQt6.QtCore import Qt
-        self.projectTreeWidget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.projectTreeWidget.customContextMenuRequested.connect(self.show_context_menu)
-
-    def show_context_menu(self, position):
-        """Show context menu when right-clicking on tree items"""
-        item = self.projectTreeWidget.itemAt(position)
-        if item is None:
-            return
-        
-        menu = QMenu()
-        
-        # Check if this is a project item (parent is None) or task item (has parent)
-        if item.parent() is None:
-            # This is a PROJECT item
-            project_id = item.data(0, 1)
-            project_name = item.text(0)
-            
-            add_task_action = menu.addAction("Add Task")
-            rename_project_action = menu.addAction("Rename Project")
-            delete_project_action = menu.addAction("Delete Project")
-            
-            action = menu.exec(self.projectTreeWidget.viewport().mapToGlobal(position))
-            
-            if action == add_task_action:
-                self.add_task_to_project(project_id, project_name)
-            elif action == rename_project_action:
-                self.rename_project(project_id, project_name)
-            elif action == delete_project_action:
-                self.delete_project(project_id, project_name)
-        
-        else:
-            # This is a TASK item
-            task_id = item.data(0, 1)
-            task_name = item.text(0)
-            
-            rename_task_action = menu.addAction("Rename Task")
-            delete_task_action = menu.addAction("Delete Task")
-            
-            action = menu.exec(self.projectTreeWidget.viewport().mapToGlobal(position))
-            
-            if action == rename_task_action:
-                self.rename_task(task_id, task_name)
-            elif action == delete_task_action:
-                self.delete_task(task_id, task_name)
-
-    def get_tree_state(self):
-        state = {}
-        for i in range(self.projectTreeWidget.topLevelItemCount()):
-            item = self.projectTreeWidget.topLevelItem(i)
-            project_id = item.data(0, 1)
-            state[project_id] = item.isExpanded()
-        return state
-    
-    def restore_tree_state(self, state):
-        for i in range(self.projectTreeWidget.topLevelItemCount()):
-            item = self.projectTreeWidget.topLevelItem(i)
-            project_id = item.data(0, 1)
-            if project_id in state:
-                item.setExpanded(state[project_id])
-
-
-        
-    def load_projects(self):
-        """Load all projects from database into the tree widget"""
-        #Get current state of tree
-        tree_state = self.get_tree_state()
-
-        # Clear the tree
-        self.projectTreeWidget.clear()
-        
-        # Get all projects from database
-        projects = self.db.get_all_projects()
-        
-        print(f"Loaded {len(projects)} projects from database")
-        
-        # Add each project to the tree
-        for project in projects:
-            project_id, project_name = project
-            
-            # Create a tree item for the project
-            project_item = QTreeWidgetItem(self.projectTreeWidget)
-            project_item.setText(0, project_name)  # Column 0: Name
-            
-            # Store the project ID in the item (we'll need this later)
-            project_item.setData(0, 1, project_id)  # Store ID in role 1
-            
-            # Get tasks for this project
-            tasks = self.db.get_tasks_for_project(project_id)
-            
-            # Calculate total time for the project
-            total_seconds = sum(task[2] for task in tasks)  # task[2] is total_seconds
-            hours = total_seconds // 3600
-            minutes = (total_seconds % 3600) // 60
-            seconds = total_seconds % 60
-            time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-            
-            project_item.setText(1, time_str)  # Column 1: Time
-            project_item.setText(3, f"{len(tasks)} task(s)")  # Column 3: Status
-            
-            # Make project item expandable
-            project_item.setExpanded(False)
-
-            # Add tasks under this project
-            for task in tasks:
-                task_id, task_name, total_seconds, is_finished, is_running = task
-                
-                # Create a tree item for the task (child of project)
-                task_item = QTreeWidgetItem(project_item)
-                task_item.setText(0, task_name)  # Column 0: Task name
-                
-                # Store the task ID in the item
-                task_item.setData(0, 1, task_id)
-                
-                # Format and display time
-                hours = total_seconds // 3600
-                minutes = (total_seconds % 3600) // 60
-                seconds = total_seconds % 60
-                time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                task_item.setText(1, time_str)  # Column 1: Time
-                
-                # Column 2: Action buttons
-                button_widget = self.create_task_buttons(task_item, task_id, is_finished, is_running)
-                self.projectTreeWidget.setItemWidget(task_item, 2, button_widget)
-                
-                # Column 3: Status
-                if is_finished:
-                    task_item.setText(3, "Finished")
-                elif is_running:
-                    task_item.setText(3, "Running")
-                else:
-                    task_item.setText(3, "Paused")
-
-        # Highlight running task
-        if self.running_task_id is not None:
-            for i in range(self.projectTreeWidget.topLevelItemCount()):
-                projectOpen = False
-                project_item = self.projectTreeWidget.topLevelItem(i)
-                for j in range(project_item.childCount()):
-                    task_item = project_item.child(j)
-                    task_id = task_item.data(0, 1)
-                    
-                    if task_id == self.running_task_id:
-                        projectOpen = True
-
-                        # Set a light blue background
-                        for col in range(self.projectTreeWidget.columnCount()):
-                            task_item.setBackground(col, QBrush(QColor("#23cff6")))  # pale blue
-                            task_item.setForeground(col, QBrush(QColor("#1e3a8a")))  # dark blue text
-
-                            for col in range(self.projectTreeWidget.columnCount()):
-                                font = task_item.font(col)
-                                font.setBold(True)
-                                task_item.setFont(col, font)
-
-                # Highlight parent project
-                if projectOpen:
-                    for col in range(self.projectTreeWidget.columnCount()):
-                        project_item.setBackground(col, QBrush(QColor("#23cff6"))) 
-                        project_item.setForeground(col, QBrush(QColor("#1d4ed8")))
-
-                        for col in range(self.projectTreeWidget.columnCount()):
-                                font = project_item.font(col)
-                                font.setBold(True)
-                                project_item.setFont(col, font)
-        
-        #Stretch Collumns out with window
-        header = self.projectTreeWidget.header()
-        for col in range(self.projectTreeWidget.columnCount()):
-            header.setSectionResizeMode(col, header.ResizeMode.Stretch)
-
-
-        self.restore_tree_state(tree_state)
-
-
-    def update_project_total_time(self, project_item):
-        """Update the total time display for a project"""
-        total_seconds = 0
-        
-        # Sum up all child task times
-        for i in range(project_item.childCount()):
-            task_item = project_item.child(i)
-            time_text = task_item.text(1)  # Get time string like "00:05:23"
-            
-            # Parse the time string
-            time_parts = time_text.split(':')
-            if len(time_parts) == 3:
-                hours, minutes, seconds = map(int, time_parts)
-                total_seconds += hours * 3600 + minutes * 60 + seconds
-        
-        # Update project's time display
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        project_item.setText(1, time_str)
-
-    # ===== TIMER =====
-
-    def update_running_task(self):
-        """Called every second to update the running task's time display"""
-        if self.running_task_id is None or self.running_task_item is None:
-            return
-        
-        # Calculate elapsed time since start
-        current_time = datetime.now()
-        elapsed_seconds = int((current_time - self.task_start_time).total_seconds())
-        
-        # Total time = previous time + current session time
-        total_seconds = self.task_elapsed_before_start + elapsed_seconds
-        
-        # Update only the display (no database write yet)
-        hours = total_seconds // 3600
-        minutes = (total_seconds % 3600) // 60
-        seconds = total_seconds % 60
-        time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        
-        # Update only the time column in the UI
-        self.running_task_item.setText(1, time_str)
-        
-        # Also update the parent project's total time
-        parent_item = self.running_task_item.parent()
-        if parent_item:
-            self.update_project_total_time(parent_item)
-
-    # ===== HANDLE CLOSING =====
-
-    def closeEvent(self, event: QCloseEvent):
-        """Handle window close event"""
-        # Check if a task is running
-        if self.running_task_id is not None:
-            # Show warning
-            reply = QMessageBox.warning(
-                self,
-                "Task Running",
-                "A task is currently running. Are you sure you want to close?\n\n"
-                "The timer will stop and current progress will be saved.",
-                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                QMessageBox.StandardButton.No
-            )
-            
-            if reply == QMessageBox.StandardButton.No:
-                event.ignore()  # Cancel the close
-                return
-            else:
-                # Save the running task before closing
-                current_time = datetime.now()
-                elapsed_seconds = int((current_time - self.task_start_time).total_seconds())
-                total_seconds = self.task_elapsed_before_start + elapsed_seconds
-                self.db.update_task_time(self.running_task_id, total_seconds)
-                self.db.pause_task(self.running_task_id)
-        
-        # Accept the close event (actually close the application)
-        event.accept()
-   
-    # ===== EXPORTING =====
-
-    def export_to_csv(self):
-        # Check if another task is already running
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-
-        """Export all projects and tasks to CSV (.csv)"""
-        file_path, _ = QFileDialog.getSaveFileName(
-            self,
-            "Export to CSV",
-            "exports/time_tracker_export.csv",
-            "CSV Files (*.csv)"
-        )
-
-        if not file_path:
-            return
-
-        try:
-            with open(file_path, mode='w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-
-                # Header
-                headers = ['Project', 'Task', 'Time (HH:MM:SS)', 'Status']
-                writer.writerow(headers)
-
-                projects = self.db.get_all_projects()
-
-                for project_id, project_name in projects:
-                    tasks = self.db.get_tasks_for_project(project_id)
-
-                    if not tasks:
-                        project_time = "00:00:00"
-                        project_status = "N/A"
-                        writer.writerow([project_name, '', project_time, 'No tasks'])
-                    else:
-                        # Calculate total project time
-                        total_seconds = sum(task[2] for task in tasks)
-                        h = total_seconds // 3600
-                        m = (total_seconds % 3600) // 60
-                        s = total_seconds % 60
-                        project_time = f"{h:02d}:{m:02d}:{s:02d}"
-
-                        # Determine project status
-                        project_status = "Finished" if all(task[3] for task in tasks) else "Open"
-
-                        # First task in the same row as project
-                        task_id, task_name, task_seconds, is_finished, is_running = tasks[0]
-                        h = task_seconds // 3600
-                        m = (task_seconds % 3600) // 60
-                        s = task_seconds % 60
-                        time_str = f"{h:02d}:{m:02d}:{s:02d}"
-
-                        if is_finished:
-                            status = "Finished"
-                        elif is_running:
-                            status = "Running"
-                        else:
-                            status = "Paused"
-
-                        writer.writerow([project_name, task_name, time_str, status])
-
-                        # Remaining tasks
-                        for task in tasks[1:]:
-                            task_id, task_name, task_seconds, is_finished, is_running = task
-                            h = task_seconds // 3600
-                            m = (task_seconds % 3600) // 60
-                            s = task_seconds % 60
-                            time_str = f"{h:02d}:{m:02d}:{s:02d}"
-
-                            if is_finished:
-                                status = "Finished"
-                            elif is_running:
-                                status = "Running"
-                            else:
-                                status = "Paused"
-
-                            writer.writerow(['', task_name, time_str, status])
-
-                    # Project Total row
-                    writer.writerow([
-                        "Total:",
-                        '',
-                        project_time,
-                        f"{len(tasks)} task(s), Status: {project_status}"
-                    ])
-
-            # Automatically open the CSV file after saving (Windows)
-            import os
-            os.startfile(file_path)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to export CSV:\n{e}")
-
-    def export_to_excel(self):
-        """Export all projects and tasks to Excel (.xlsx)"""
-        # Check if another task is already running
-        running_task = self.db.get_running_task()
-        if running_task:
-            QMessageBox.warning(
-                self, 
-                "Task Running", 
-                f"Please pause or finish the currently running task first:\n{running_task[2]}"
-            )
-            return
-
-        file_path, _ = QFileDialog.getSaveFileName(
-            self,
-            "Export to Excel",
-            "exports/time_tracker_export.xlsx",
-            "Excel Files (*.xlsx)"
-        )
-
-        if not file_path:
-            return
-
-        try:
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Time Tracker"
-
-            # Header
-            headers = ['Project', 'Task', 'Time (HH:MM:SS)', 'Status']
-            ws.append(headers)
-
-            # Bold header
-            for cell in ws[ws.max_row]:
-                cell.font = Font(bold=True)
-
-            projects = self.db.get_all_projects()
-
-            for project_id, project_name in projects:
-                tasks = self.db.get_tasks_for_project(project_id)
-
-                if not tasks:
-                    ws.append([project_name, 'N/A', '00:00:00', 'No tasks'])
-                    ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
-                else:
-                    total_seconds = sum(task[2] for task in tasks)
-                    h = total_seconds // 3600
-                    m = (total_seconds % 3600) // 60
-                    s = total_seconds % 60
-                    project_time = f"{h:02d}:{m:02d}:{s:02d}"
-
-                    projectFirstLine = True
-
-                    for task_id, task_name, task_seconds, is_finished, is_running in tasks:
-                        h = task_seconds // 3600
-                        m = (task_seconds % 3600) // 60
-                        s = task_seconds % 60
-                        time_str = f"{h:02d}:{m:02d}:{s:02d}"
-
-                        # Determine project status
-                        if all(task[3] for task in tasks):  
-                            project_status = "Finished"
-                        else:
-                            project_status = "In Progress"  
-
-                        if is_finished:
-                            status = "Finished"
-                        elif is_running:
-                            status = "Running"
-                        else:
-                            status = "Paused"
-
-                        #Include project name in the first line of the project
-                        if (projectFirstLine):
-                            ws.append([
-                                f"{project_name}",
-                                task_name,
-                                time_str,
-                                status
-                            ])
-                            ws.cell(row=ws.max_row, column=1).font = Font(bold=True)
-                            projectFirstLine = False
-                        else:
-                            ws.append([
-                                "",
-                                task_name,
-                                time_str,
-                                status
-                            ])
-
-
-                    # Project summary row
-                    ws.append([
-                        '',
-                        f"{len(tasks)} task(s)",
-                        project_time,
-                        project_status
-                    ])
-
-                    for cell in ws[ws.max_row]:
-                        cell.font = Font(bold=True)
-                    
-                # Empty row between projects
-                ws.append([])
-
-            # Auto-size columns
-            for column in ws.columns:
-                max_length = max(len(str(cell.value)) if cell.value else 0 for cell in column)
-                ws.column_dimensions[column[0].column_letter].width = max_length + 2
-
-            wb.save(file_path)
-
-            QMessageBox.information(
-                self,
-                "Export Successful",
-                f"Data exported successfully to:\n{file_path}"
-            )
-
-            # Open the Excel file
-            os.startfile(file_path)
-
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Export Failed",
-                f"Failed to export data:\n{str(e)}"
-            )
-
-
-if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    app.setWindowIcon(QIcon(resource_path("assets/stopwatch.ico")))
-    with open(resource_path("styles/app.qss"), "r") as f:
-        stylesheet = f.read()
-        
-        # Replace relative paths with absolute paths for PyInstaller
-        stylesheet = stylesheet.replace(
-            "url(assets/arrowRight.svg)", 
-            f"url({resource_path('assets/arrowRight.svg').replace(chr(92), '/')})"
-        )
-        stylesheet = stylesheet.replace(
-            "url(assets/arrowDown.svg)", 
-            f"url({resource_path('assets/arrowDown.svg').replace(chr(92), '/')})"
-        )
-        
-        app.setStyleSheet(stylesheet)
-    window = TimeTrackerApp()
-    window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+import sys
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QDialog, QMessageBox, QFileDialog,
+                             QTreeWidget, QTreeWidgetItem, QPushButton, QHBoxLayout, QWidget, QInputDialog, QMenu,
+                             QTableWidgetItem, QAbstractItemView)
+from PyQt6 import uic
+from database_manager import DEFAULT_DB_PATH
+from working_set import WORKING_SET_SETTING, open_database
+from change_watcher import ChangeWatcher
+from maintenance import MaintenanceScheduler
+from export_scheduler import ExportScheduler
+from workspaces import DEFAULT_WORKSPACE, WorkspaceCache, WorkspaceRegistry
+from single_instance import CommandBridge, InstanceServer, instance_name, send_command
+from PyQt6.QtCore import QTimer, Qt, QUrl, QFile, QIODevice, QCoreApplication, QEvent, pyqtSignal
+from datetime import datetime
+from PyQt6.QtGui import QCloseEvent, QIcon, QBrush, QColor, QDesktopServices
+import os
+import io
+import multiprocessing
+import re
+import ctypes
+import argparse
+import time
+
+# ===== GET RESOURCE PATH =====
+
+# Assets, stylesheet and .ui files compiled by build_resources.py (loose files are used without it)
+try:
+    import resources_rc
+except ImportError:
+    resources_rc = None
+
+def compiled_resources_current():
+    """True if the compiled resources can be used (in a checkout: none of the files changed since)"""
+    if resources_rc is None:
+        return False
+    if getattr(sys, 'frozen', False):
+        return True
+    base_path = os.path.dirname(os.path.abspath(__file__))
+    for relative_path, mtime in resources_rc.SOURCE_MTIMES.items():
+        try:
+            if os.stat(os.path.join(base_path, relative_path)).st_mtime_ns != mtime:
+                break
+        except OSError:
+            break
+    else:
+        return True
+    print("resources_rc.py is out of date, using the loose files (run build_resources.py)")
+    return False
+
+USE_COMPILED_RESOURCES = compiled_resources_current()
+
+def resource_path(relative_path):
+    """ Get path to resource: in the compiled resources (:/...), or the file for dev and PyInstaller """
+    if USE_COMPILED_RESOURCES:
+        return f":/{relative_path}"
+
+    try:
+        base_path = sys._MEIPASS  # PyInstaller temp folder
+    except AttributeError:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+
+    return os.path.join(base_path, relative_path)
+
+def read_resource(relative_path):
+    """Read a resource's bytes (through QFile, which also reads :/ paths)"""
+    path = resource_path(relative_path)
+    resource_file = QFile(path)
+    if not resource_file.open(QIODevice.OpenModeFlag.ReadOnly):
+        raise OSError(f"Cannot read {path}")
+    data = bytes(resource_file.readAll())
+    resource_file.close()
+    return data
+
+def load_ui(relative_path, base_instance):
+    """Load a .ui file onto a widget (uic only opens real files, so hand it the bytes)"""
+    return uic.loadUi(io.BytesIO(read_resource(relative_path)), base_instance)
+
+def load_stylesheet():
+    """The app stylesheet, with its url()s pointing at the assets"""
+    stylesheet = read_resource('styles/app.qss').decode('utf-8')
+    if not USE_COMPILED_RESOURCES:
+        # The compiled stylesheet already points into :/assets, loose files need absolute paths
+        stylesheet = re.sub(
+            r'url\((assets/[^)]+)\)',
+            lambda match: f"url({resource_path(match.group(1)).replace(chr(92), '/')})",
+            stylesheet
+        )
+    return stylesheet
+
+def format_time(total_seconds):
+    """Format seconds as HH:MM:SS"""
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    seconds = total_seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+# Settings key: '1' lets several tasks run at the same time
+CONCURRENT_TIMERS_SETTING = 'concurrent_timers'
+
+# Settings keys for the order of the tree
+SORT_MODE_SETTING = 'tree_sort'
+GROUP_BY_STATUS_SETTING = 'tree_group_by_status'
+
+# (label, mode) for the Sort box. 'newest' is the order the database returns.
+SORT_MODES = [
+    ("Newest first", 'newest'),
+    ("Name", 'name'),
+    ("Time spent", 'time'),
+    ("Status", 'status'),
+    ("Last worked on", 'last_worked'),
+]
+
+# Rows per project removed one by one in bulk actions, more are taken out at once (see take_task_items)
+BULK_REMOVE_LIMIT = 200
+
+# ===== COMMAND LINE =====
+
+def parse_arguments(argv):
+    """Parse the command line (unknown arguments are left for Qt)"""
+    parser = argparse.ArgumentParser(prog="TimeTracker", description="Time Tracker")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--start", metavar="TASK", help="start a task, by id or name")
+    group.add_argument("--pause", nargs="?", const="", metavar="TASK",
+                       help="pause a running task (default: every running task)")
+    group.add_argument("--status", action="store_true", help="show the running task(s)")
+    parser.add_argument("--api-port", type=int, metavar="PORT",
+                        help="serve the local HTTP/JSON API on this port")
+    parser.add_argument("--api-host", default="127.0.0.1",
+                        help="address for the HTTP API (default: %(default)s)")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def command_from_arguments(args):
+    """Turn parsed arguments into a command for the (running) instance"""
+    if args.start:
+        return {'action': 'start', 'task': args.start}
+    if args.pause is not None:
+        command = {'action': 'pause'}
+        if args.pause:
+            command['task'] = args.pause
+        return command
+    if args.status:
+        return {'action': 'status'}
+    return {'action': 'show'}
+
+# ===== SORTABLE TREE ITEMS =====
+
+class SortableTreeItem(QTreeWidgetItem):
+    """Tree row that sorts by a precomputed key instead of its text.
+
+    The values the keys are built from are cached on the item when it is
+    filled, so re-sorting never goes back to the database. Qt moves the
+    rows' button widgets along with them.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.item_id = 0
+        self.is_project = False
+        self.name_key = ''
+        self.seconds = 0
+        self.status_rank = 0  # Running, open/paused, finished, empty
+        self.last_worked = 0
+        self.sort_key = ()
+
+    def __lt__(self, other):
+        return self.sort_key < other.sort_key
+
+    def update_sort_key(self, mode, group_by_status):
+        """Build the key for a sort mode (ascending; descending values are negated)"""
+        if mode == 'name':
+            key = (self.name_key, self.item_id)
+        elif mode == 'time':
+            key = (-self.seconds, self.item_id)
+        elif mode == 'status':
+            key = (self.status_rank, self.item_id)
+        elif mode == 'last_worked':
+            key = (-self.last_worked, self.item_id)
+        else:
+            # Database order: newest projects first, tasks in the order they were added
+            key = (-self.item_id,) if self.is_project else (self.item_id,)
+
+        if group_by_status:
+            key = (self.status_rank,) + key
+        self.sort_key = key
+
+# ===== WORKSPACES =====
+
+# Workspaces kept open (database, change watcher and filled tree) after switching away
+WORKSPACE_CACHE_SIZE = 3
+# Connections each open workspace keeps warm, closed when it leaves the cache.
+# Enough for the window's thread (with a nested read), the working set's
+# flusher and a maintenance pass (which logs each step while holding its
+# own connection) at once; the change watcher has its own connection
+WORKSPACE_POOL_SIZE = 6
+
+class WorkspaceState:
+    """The window's per-workspace attributes, parked while another workspace is shown"""
+
+    ATTRIBUTES = ('db', 'projectTreeWidget', 'change_watcher', 'running_tasks',
+                  'running_task_items', 'project_base_seconds', 'last_worked')
+
+    def __init__(self, window):
+        for name in self.ATTRIBUTES:
+            setattr(self, name, getattr(window, name))
+
+    def restore(self, window):
+        """Put the parked attributes back on the window"""
+        for name in self.ATTRIBUTES:
+            setattr(window, name, getattr(self, name))
+
+class TimeTrackerApp(QMainWindow):
+
+    # Database file of the workspace now shown, after a switch
+    workspaceSwitched = pyqtSignal(str)
+
+    #INIT FUNCTION
+
+    def __init__(self, db_path=None):
+        super().__init__()
+        
+        # Set window title
+        self.setWindowTitle("Time Tracker")
+
+        # Load the UI file
+        load_ui('ui/main_window.ui', self)
+        
+        # Set window icon
+        self.setWindowIcon(QIcon(resource_path('assets/stopwatch.ico')))
+
+        # Workspaces: named database files, the recently used ones stay open
+        self.workspaces = WorkspaceRegistry()
+        if db_path is None:
+            db_path = self.workspaces.db_path(self.workspaces.current)
+        self.workspace_cache = WorkspaceCache(WORKSPACE_CACHE_SIZE, lambda state: not state.running_tasks)
+        self.tree_header_labels = [self.projectTreeWidget.headerItem().text(col)
+                                   for col in range(self.projectTreeWidget.columnCount())]
+        self.setup_tree(self.projectTreeWidget)
+        
+        # Initialize database manager (held in memory if the workspace is set up for it)
+        self.db = open_database(db_path, pool_size=WORKSPACE_POOL_SIZE)
+
+        # Pick up changes committed by other instances or scripts
+        self.change_watcher = self.create_change_watcher()
+
+        # One shared timer updates every running task
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.update_running_tasks)
+        self.timer.start(1000)  # Update every 1 second
+        
+        # Track the running tasks: task_id -> (task_item, started_at, seconds before the session)
+        self.running_tasks = {}
+        self.running_task_items = {}  # Running task rows seen while filling the tree
+        self.project_base_seconds = {}  # Stored project totals (open sessions not included)
+
+        # Optimize/vacuum/checkpoint the database while no task runs and the user is away
+        self.maintenance = MaintenanceScheduler(self.db, lambda: bool(self.running_tasks), parent=self)
+
+        # Write exports to a folder on a schedule (Settings > Scheduled Export)
+        self.export_scheduler = ExportScheduler(self.db, parent=self)
+        self.export_scheduler.statusChanged.connect(lambda message: self.statusbar.showMessage(message, 10000))
+        self.export_worker = None  # Export All Formats running in the background
+
+        # Sorting and grouping work on values cached on the tree items
+        self.last_worked = {}  # task_id -> end of its latest session
+        for label, mode in SORT_MODES:
+            self.sortComboBox.addItem(label, mode)
+
+        # Concurrent timers, sort order and tags are stored in each workspace's database
+        self.load_workspace_settings()
+        self.refresh_workspace_options()
+        
+        # Connect toolbar actions to methods
+        self.actionAddProject.triggered.connect(self.add_project)
+        self.actionExportCSV.triggered.connect(self.export_to_csv)
+        self.actionActionExportExcel.triggered.connect(self.export_to_excel)
+        self.actionExportColumnar.triggered.connect(self.export_to_columnar)
+        self.actionExportAllFormats.triggered.connect(self.export_all_formats)
+        self.actionExportChanges.triggered.connect(self.export_changes)
+        self.actionTimeAnalytics.triggered.connect(self.show_time_analytics)
+        self.actionConcurrentTimers.toggled.connect(self.set_concurrent_timers)
+        self.actionWorkingSet.toggled.connect(self.set_working_set)
+        self.actionScheduledExport.triggered.connect(self.configure_scheduled_export)
+        self.actionNewWorkspace.triggered.connect(self.add_workspace)
+        self.actionRemoveWorkspace.triggered.connect(self.remove_workspace)
+
+        # Show only the tasks carrying the chosen tag
+        self.tagFilterComboBox.currentIndexChanged.connect(self.apply_tag_filter)
+        self.sortComboBox.currentIndexChanged.connect(self.change_sort)
+        self.groupByStatusCheckBox.toggled.connect(self.change_sort)
+        self.workspaceComboBox.currentIndexChanged.connect(self.change_workspace)
+        
+        # Load projects into the tree
+        self.load_projects()
+        self.change_watcher.start()
+        self.maintenance.start()
+        self.export_scheduler.start()
+        
+        print("App initialized successfully!")
+
+    # ===== PROJECT METHODS =====
+
+    def add_project(self):
+        """Handler for Add Project button"""
+        try:            
+            running_task = self.db.get_running_task()
+            if running_task:
+                QMessageBox.warning(
+                    self, 
+                    "Task Running", 
+                    f"Please pause or finish the currently running task first:\n{running_task[2]}"
+                )
+                return
+            
+            # Load the dialog UI
+            dialog = QDialog(self)
+            load_ui('ui/add_project_dialog.ui', dialog)
+            
+            dialog.buttonBox.accepted.connect(dialog.accept)
+            dialog.buttonBox.rejected.connect(dialog.reject)
+            
+            # Show the dialog and wait for user response
+            if dialog.exec() == QDialog.DialogCode.Accepted:
+                # Get the project name from the line edit
+                project_name = dialog.projectNameLineEdit.text().strip()
+                
+                
+                if project_name:
+                    # Add to database
+                    project_id = self.db.add_project(project_name)
+                    print(f"Added project: {project_name} (ID: {project_id})")
+
+                    QMessageBox.information(
+                        dialog,
+                        "Project Added",
+                        f"The project '{project_name}' has been successfully added!"
+                    )
+                    
+                    # Reload the tree
+                    self.load_projects()
+                else:
+                    QMessageBox.warning(self, "Error", "Project name cannot be empty!")
+            else:
+                reply = QMessageBox.question(
+                    dialog,
+                    "Cancel",
+                    "Are you sure you want to cancel adding the project?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+
+                if reply == QMessageBox.StandardButton.Yes:
+                    dialog.reject()
+                    
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"An error occurred: {str(e)}")
+
+
+    def rename_project(self, project_id, old_name):
+         # Check if another task is already running
+        running_task = self.db.get_running_task()
+        if running_task:
+            QMessageBox.warning(
+                self, 
+                "Task Already Running", 
+                f"Please pause or finish the currently running task first:\n{running_task[2]}"
+            )
+            return
+
+        """Rename a project"""
+        new_name, ok = QInputDialog.getText(
+            self,
+            "Rename Project",
+            "Enter new project name:",
+            text=old_name
+        )
+        
+        if ok and new_name.strip():
+            self.db.rename_project(project_id, new_name.strip())
+            self.load_projects()
+            print(f"Renamed project {project_id} to '{new_name}'")
+
+    def delete_project(self, project_id, project_name):
+        """Delete a project"""
+        # Check if another task is already running
+        running_task = self.db.get_running_task()
+        if running_task:
+            QMessageBox.warning(
+                self, 
+                "Task Running", 
+                f"Please pause or finish the currently running task first:\n{running_task[2]}"
+            )
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "Delete Project",
+            f"Are you sure you want to delete the project '{project_name}'?\n\n"
+            "This will also delete all tasks in this project.\n"
+            "This action cannot be undone.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            self.db.delete_project(project_id)
+            self.load_projects()
+            print(f"Deleted project {project_id}")
+
+    # ===== TASK METHODS =====      
+   
+    def add_task_to_project(self, project_id, project_name):
+        """Handler for adding a task to a specific project"""
+        # Check if another task is already running
+        running_task = self.db.get_running_task()
+        if running_task:
+            QMessageBox.warning(
+                self, 
+                "Task Running", 
+                f"Please pause or finish the currently running task first:\n{running_task[2]}"
+            )
+            return
+        
+        # Load the dialog UI
+        dialog = QDialog(self)
+        load_ui('ui/add_task_dialog.ui', dialog)
+        dialog.buttonBox.accepted.connect(dialog.accept)
+        dialog.buttonBox.rejected.connect(dialog.reject)
+        
+        # Update dialog title to show which project
+        dialog.setWindowTitle(f"Add Task to {project_name}")
+        
+        # Show the dialog and wait for user response
+        result = dialog.exec()
+        print("Dialog result:", result)
+
+        if result == QDialog.DialogCode.Accepted:
+            # Get the task name from the line edit
+            task_name = dialog.taskNameLineEdit.text().strip()
+            
+            if task_name:
+                # Add to database
+                task_id = self.db.add_task(project_id, task_name)
+                print(f"Added task: {task_name} to project ID {project_id} (Task ID: {task_id})")
+                
+                # Reload the tree
+                self.load_projects()
+            else:
+                QMessageBox.warning(self, "Error", "Task name cannot be empty!")
+        else:            
+            reply = QMessageBox.question(
+                dialog,
+                "Cancel",
+                "Are you sure you want to cancel adding the project?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+
+            if reply == QMessageBox.StandardButton.Yes:
+                dialog.reject()  # Closes the dialog without saving anything
+
+    def create_task_buttons(self, task_item, task_id, is_finished, is_running):
+        """Create action buttons for a task"""
+
+        # Create a widget to hold the buttons
+        button_widget = QWidget()
+        button_layout = QHBoxLayout()
+        button_layout.setContentsMargins(2, 2, 2, 2)
+        button_widget.setLayout(button_layout)
+        
+        if is_finished:
+            # Show only Reopen button for finished tasks
+            reopen_btn = QPushButton("Reopen")            
+            reopen_btn.setObjectName("primary")
+            reopen_btn.clicked.connect(lambda: self.reopen_task(task_id))
+            button_layout.addWidget(reopen_btn)
+        else:
+            # Show Pause and Finish buttons for active tasks
+            if is_running:
+                pause_btn = QPushButton("Pause")           
+                pause_btn.setObjectName("primary")
+                pause_btn.clicked.connect(lambda: self.pause_task(task_id))
+                button_layout.addWidget(pause_btn)
+
+                finish_btn = QPushButton("Finish")           
+                finish_btn.setObjectName("primary")
+                finish_btn.clicked.connect(lambda: self.finish_task(task_id))
+                button_layout.addWidget(finish_btn)
+            else:
+                start_btn = QPushButton("Start")                
+                start_btn.setObjectName("primary")
+                start_btn.clicked.connect(lambda: self.start_task(task_id))
+                button_layout.addWidget(start_btn)
+            
+            
+        
+        return button_widget
+
+    def start_task(self, task_id):
+        """Start a task timer"""
+        # Check if another task is already running
+        if not self.concurrent_timers:
+            running_task = self.db.get_running_task()
+            if running_task:
+                QMessageBox.warning(
+                    self, 
+                    "Task Already Running", 
+                    f"Please pause or finish the currently running task first:\n{running_task[2]}"
+                )
+                return
+        
+        # Mark task as running in database. The check for another running
+        # task is repeated inside the write, in case another instance won.
+        started_at = self.db.start_task(task_id, exclusive=not self.concurrent_timers)
+        if started_at is None:
+            running_task = self.db.get_running_task()
+            QMessageBox.warning(
+                self,
+                "Task Already Running",
+                "Please pause or finish the currently running task first:\n"
+                f"{running_task[2] if running_task else ''}"
+            )
+            return
+
+        # Refresh UI (the new session is picked up as a running task)
+        self.load_projects()
+        print(f"Started task {task_id}")
+
+    def pause_task(self, task_id):
+        """Pause a task timer"""
+        if task_id not in self.running_tasks:
+            return
+        
+        # Close the session and add its time in one write
+        self.db.pause_task(task_id)
+        
+        # Refresh UI
+        self.load_projects()
+        print(f"Paused task {task_id}")
+
+    def finish_task(self, task_id):
+        """Finish a task"""
+        # Mark as finished AND not running (a running session's time is saved)
+        self.db.finish_task(task_id)
+        
+        # Refresh UI
+        self.load_projects()
+        print(f"Finished task {task_id}")
+
+    def set_concurrent_timers(self, enabled):
+        """Allow (or stop allowing) several tasks to run at the same time"""
+        self.concurrent_timers = enabled
+        self.db.set_setting(CONCURRENT_TIMERS_SETTING, '1' if enabled else '0')
+        # Timers that are already running keep running
+        print(f"Concurrent timers {'enabled' if enabled else 'disabled'}")
+
+    def set_working_set(self, enabled):
+        """Keep the open workspace in memory with write-behind (or write straight to the database file)"""
+        self.db.set_setting(WORKING_SET_SETTING, '1' if enabled else '0')
+        self.reopen_database()
+        print(f"Working set {'enabled' if enabled else 'disabled'} for {self.db.db_path}")
+
+    def reopen_task(self, task_id):
+        """Reopen a finished task"""
+        running_task = self.db.get_running_task()
+        if running_task:
+            QMessageBox.warning(
+                self, 
+                "Task Running", 
+                f"Please pause or finish the currently running task first:\n{running_task[2]}"
+            )
+            return
+
+        self.db.reopen_task(task_id)
+        self.db.pause_task(task_id)  # Make sure it starts as paused, not running
+        self.load_projects()
+        print(f"Reopened task {task_id}")
+
+    def rename_task(self, task_id, old_name):
+        """Rename a task"""
+        running_task = self.db.get_running_task()
+        if running_task:
+            QMessageBox.warning(
+                self, 
+                "Task Running", 
+                f"Please pause or finish the currently running task first:\n{running_task[2]}"
+            )
+            return
+
+        new_name, ok = QInputDialog.getText(
+            self,
+            "Rename Task",
+            "Enter new task name:",
+            text=old_name
+        )
+        
+        if ok and new_name.strip():
+            self.db.rename_task(task_id, new_name.strip())
+            self.load_projects()
+            print(f"Renamed task {task_id} to '{new_name}'")
+
+    def delete_task(self, task_id, task_name):
+        """Delete a task"""
+        running_task = self.db.get_running_task()
+        if running_task:
+            QMessageBox.warning(
+                self, 
+                "Task Running", 
+                f"Please pause or finish the currently running task first:\n{running_task[2]}"
+            )
+            return
+
+        # Check if this task is currently running
+        if task_id in self.running_tasks:
+            QMessageBox.warning(
+                self,
+                "Cannot Delete",
+                "Cannot delete a running task. Please pause or finish it first."
+            )
+            return
+        
+        reply = QMessageBox.question(
+            self,
+            "Delete Task",
+            f"Are you sure you want to delete the task '{task_name}'?\n\n"
+            "This action cannot be undone.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        
+        if reply == QMessageBox.StandardButton.Yes:
+            self.db.delete_task(task_id)
+            self.load_projects()
+            print(f"Deleted task {task_id}")
+
+    # ===== BULK TASK METHODS =====
+    #
+    # Each bulk action is one transaction, after which the task rows are
+    # changed in place and only the touched project rows are refreshed,
+    # instead of rebuilding the whole tree per task.
+
+    def take_task_items(self, task_items):
+        """Take task rows out of their projects, return the project rows (id -> item) they left.
+
+        Every removeChild makes the tree move the buttons of all rows below,
+        so beyond BULK_REMOVE_LIMIT rows a project is emptied at once and the
+        rows that stay are put back with new buttons.
+        """
+        by_project = {}
+        for item in task_items:
+            by_project.setdefault(item.parent().data(0, 1), (item.parent(), []))[1].append(item)
+
+        for project_item, items in by_project.values():
+            if len(items) <= BULK_REMOVE_LIMIT:
+                for item in items:
+                    project_item.removeChild(item)
+                continue
+
+            taken = set(map(id, items))
+            remaining = [item for item in project_item.takeChildren() if id(item) not in taken]
+            project_item.addChildren(remaining)
+            for item in remaining:
+                self.set_task_item_state(item, item.status_rank == 2, item.data(0, 1) in self.running_tasks)
+
+        return {project_id: project_item for project_id, (project_item, _) in by_project.items()}
+
+    def get_selected_task_items(self):
+        """Selected task rows in tree order (rows hidden by the tag filter are left out)"""
+        task_items = []
+        for i in range(self.projectTreeWidget.topLevelItemCount()):
+            project_item = self.projectTreeWidget.topLevelItem(i)
+            for j in range(project_item.childCount()):
+                task_item = project_item.child(j)
+                if task_item.isSelected() and not task_item.isHidden():
+                    task_items.append(task_item)
+        return task_items
+
+    def show_bulk_menu(self, position, task_items):
+        """Context menu for several selected tasks"""
+        count = len(task_items)
+        menu = QMenu()
+
+        finish_action = menu.addAction(f"Finish {count} Tasks")
+        reopen_action = menu.addAction(f"Reopen {count} Tasks")
+        move_action = menu.addAction(f"Move {count} Tasks to Project...")
+        rename_action = menu.addAction(f"Rename {count} Tasks...")
+        delete_action = menu.addAction(f"Delete {count} Tasks")
+
+        action = menu.exec(self.projectTreeWidget.viewport().mapToGlobal(position))
+
+        if action == finish_action:
+            self.finish_tasks(task_items)
+        elif action == reopen_action:
+            self.reopen_tasks(task_items)
+        elif action == move_action:
+            self.move_tasks(task_items)
+        elif action == rename_action:
+            self.rename_tasks(task_items)
+        elif action == delete_action:
+            self.delete_tasks(task_items)
+
+    def refuse_running_tasks(self, task_items, title, verb):
+        """Warn and return True if any of the tasks is running"""
+        running = [item.text(0) for item in task_items if item.data(0, 1) in self.running_tasks]
+        if running:
+            QMessageBox.warning(
+                self,
+                title,
+                f"Cannot {verb} a running task. Please pause or finish it first:\n{running[0]}"
+            )
+        return bool(running)
+
+    def finish_tasks(self, task_items):
+        """Finish the selected tasks"""
+        task_items = [item for item in task_items if item.status_rank != 2]
+        if not task_items:
+            return
+        start = time.perf_counter()
+        self.db.finish_tasks([item.data(0, 1) for item in task_items])
+
+        # Projects with a running task are rebuilt, their saved time and highlight change
+        project_items = {item.parent().data(0, 1): item.parent() for item in task_items}
+        rebuild_ids = {item.parent().data(0, 1) for item in task_items if item.data(0, 1) in self.running_tasks}
+        for item in task_items:
+            if item.parent().data(0, 1) not in rebuild_ids:
+                self.set_task_item_state(item, True, False)
+
+        self.finish_bulk_update(project_items, rebuild_ids)
+        print(f"Finished {len(task_items)} tasks in {time.perf_counter() - start:.2f}s")
+
+    def reopen_tasks(self, task_items):
+        """Reopen the selected finished tasks (as paused)"""
+        task_items = [item for item in task_items if item.status_rank == 2]
+        if not task_items:
+            return
+        start = time.perf_counter()
+        self.db.reopen_tasks([item.data(0, 1) for item in task_items])
+
+        for item in task_items:
+            self.set_task_item_state(item, False, False)
+
+        self.finish_bulk_update({item.parent().data(0, 1): item.parent() for item in task_items})
+        print(f"Reopened {len(task_items)} tasks in {time.perf_counter() - start:.2f}s")
+
+    def move_tasks(self, task_items):
+        """Move the selected tasks to another project"""
+        if self.refuse_running_tasks(task_items, "Cannot Move", "move"):
+            return
+
+        project_items = [self.projectTreeWidget.topLevelItem(i)
+                         for i in range(self.projectTreeWidget.topLevelItemCount())]
+        labels = [f"{item.text(0)} (#{item.data(0, 1)})" for item in project_items]
+        label, ok = QInputDialog.getItem(
+            self,
+            "Move Tasks",
+            f"Move {len(task_items)} tasks to project:",
+            labels,
+            editable=False
+        )
+        if not ok:
+            return
+        target_item = project_items[labels.index(label)]
+        target_id = target_item.data(0, 1)
+
+        task_items = [item for item in task_items if item.parent() is not target_item]
+        if not task_items:
+            return
+        start = time.perf_counter()
+        self.db.move_tasks([item.data(0, 1) for item in task_items], target_id)
+
+        changed_items = self.take_task_items(task_items)
+        changed_items[target_id] = target_item
+        target_item.addChildren(task_items)
+        for item in task_items:
+            # The buttons do not move with the row
+            self.set_task_item_state(item, item.status_rank == 2, False)
+
+        self.finish_bulk_update(changed_items)
+        print(f"Moved {len(task_items)} tasks to project {target_id} in {time.perf_counter() - start:.2f}s")
+
+    def rename_tasks(self, task_items):
+        """Rename the selected tasks from a pattern"""
+        pattern, ok = QInputDialog.getText(
+            self,
+            "Rename Tasks",
+            "New name ({name} = current name, {n} = number, {project} = project):",
+            text="{name}"
+        )
+        if not ok or not pattern.strip():
+            return
+
+        try:
+            new_names = {
+                item.data(0, 1): pattern.format(name=item.text(0), n=n, project=item.parent().text(0)).strip()
+                for n, item in enumerate(task_items, start=1)
+            }
+        except (KeyError, IndexError, ValueError) as e:
+            QMessageBox.warning(self, "Rename Tasks", f"Invalid pattern: {e}")
+            return
+        if not all(new_names.values()):
+            QMessageBox.warning(self, "Rename Tasks", "The pattern gives an empty task name.")
+            return
+
+        start = time.perf_counter()
+        self.db.rename_tasks(new_names)
+
+        for item in task_items:
+            new_name = new_names[item.data(0, 1)]
+            item.setText(0, new_name)
+            item.name_key = new_name.lower()
+
+        # Project totals are unchanged
+        self.finish_bulk_update({})
+        print(f"Renamed {len(task_items)} tasks in {time.perf_counter() - start:.2f}s")
+
+    def delete_tasks(self, task_items):
+        """Delete the selected tasks"""
+        if self.refuse_running_tasks(task_items, "Cannot Delete", "delete"):
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Delete Tasks",
+            f"Are you sure you want to delete {len(task_items)} tasks?\n\n"
+            "This action cannot be undone.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        start = time.perf_counter()
+        self.db.delete_tasks([item.data(0, 1) for item in task_items])
+
+        self.finish_bulk_update(self.take_task_items(task_items))
+        print(f"Deleted {len(task_items)} tasks in {time.perf_counter() - start:.2f}s")
+
+    def finish_bulk_update(self, project_items, rebuild_ids=()):
+        """Refresh the project rows (id -> item) a bulk action changed, keeping their task rows"""
+        # The bulk action's own commit is already on screen
+        self.change_watcher.catch_up()
+
+        for project_id, project_item in project_items.items():
+            if project_id in rebuild_ids:
+                continue
+            project = self.db.get_project_summary(project_id)
+            if project is not None:
+                self.update_project_row(project_item, project)
+                project_item.last_worked = max(
+                    (project_item.child(j).last_worked for j in range(project_item.childCount())), default=0)
+
+        if rebuild_ids:
+            # Also re-sorts, filters and syncs the timers
+            self.reload_project_items(list(rebuild_ids))
+            return
+        if self.is_custom_sort():
+            self.apply_sort()
+        self.apply_tag_filter()
+        self.sync_running_tasks()
+
+    # ===== CLIENTS AND TAGS =====
+
+    def edit_project_clients(self, project_id, project_name):
+        """Set the clients of a project (comma separated)"""
+        current = ", ".join(self.db.get_project_clients(project_id))
+        names, ok = QInputDialog.getText(
+            self,
+            "Set Clients",
+            f"Clients of '{project_name}' (comma separated):",
+            text=current
+        )
+        if ok:
+            self.db.set_project_clients(project_id, names.split(','))
+            print(f"Set clients of project {project_id} to '{names}'")
+
+    def edit_task_tags(self, task_id, task_name, project_id):
+        """Set the tags of a task (comma separated), e.g. billable"""
+        current = ", ".join(self.db.get_task_tags(task_id))
+        names, ok = QInputDialog.getText(
+            self,
+            "Set Tags",
+            f"Tags of '{task_name}' (comma separated, e.g. billable):",
+            text=current
+        )
+        if ok:
+            self.db.set_task_tags(task_id, names.split(','))
+            self.refresh_tag_filter_options()
+            # Only this project's rows can change
+            self.reload_project_items({project_id})
+            print(f"Set tags of task {task_id} to '{names}'")
+
+    def refresh_tag_filter_options(self):
+        """Fill the tag filter with the current tags, keeping the selection"""
+        selected = self.tagFilterComboBox.currentData()
+        self.tagFilterComboBox.blockSignals(True)
+        self.tagFilterComboBox.clear()
+        self.tagFilterComboBox.addItem("All tasks", None)
+        for tag_id, tag_name in self.db.get_tags():
+            self.tagFilterComboBox.addItem(tag_name, tag_name)
+        index = self.tagFilterComboBox.findData(selected)
+        self.tagFilterComboBox.setCurrentIndex(max(index, 0))
+        self.tagFilterComboBox.blockSignals(False)
+
+    def apply_tag_filter(self):
+        """Hide tasks without the selected tag (and projects left empty), no reload needed"""
+        tag = self.tagFilterComboBox.currentData()
+        task_ids = self.db.get_task_ids_with_tag(tag) if tag else None
+
+        for i in range(self.projectTreeWidget.topLevelItemCount()):
+            project_item = self.projectTreeWidget.topLevelItem(i)
+            visible_tasks = 0
+            for j in range(project_item.childCount()):
+                task_item = project_item.child(j)
+                hidden = task_ids is not None and task_item.data(0, 1) not in task_ids
+                task_item.setHidden(hidden)
+                visible_tasks += not hidden
+            project_item.setHidden(task_ids is not None and visible_tasks == 0)
+
+    # ===== SORTING =====
+
+    def is_custom_sort(self):
+        """True unless the tree should stay in database order"""
+        return self.sortComboBox.currentData() != 'newest' or self.groupByStatusCheckBox.isChecked()
+
+    def change_sort(self):
+        """Sort box or group checkbox changed: re-order and remember the choice"""
+        self.apply_sort()
+        self.db.set_setting(SORT_MODE_SETTING, self.sortComboBox.currentData())
+        self.db.set_setting(GROUP_BY_STATUS_SETTING, '1' if self.groupByStatusCheckBox.isChecked() else '0')
+
+    def apply_sort(self):
+        """Re-order projects and tasks from the values cached on the items"""
+        start = time.perf_counter()
+        mode = self.sortComboBox.currentData()
+        group_by_status = self.groupByStatusCheckBox.isChecked()
+
+        for i in range(self.projectTreeWidget.topLevelItemCount()):
+            project_item = self.projectTreeWidget.topLevelItem(i)
+            project_item.update_sort_key(mode, group_by_status)
+            for j in range(project_item.childCount()):
+                project_item.child(j).update_sort_key(mode, group_by_status)
+
+        # Sorting is left disabled on the widget, so timer ticks never re-sort
+        self.projectTreeWidget.sortItems(0, Qt.SortOrder.AscendingOrder)
+        print(f"Sorted tree by {mode} in {time.perf_counter() - start:.2f}s")
+
+    # ===== TREE METHODS =====           
+    
+    def setup_tree(self, tree):
+        """Set up a project tree (the one from the .ui file, or one made for another workspace)"""
+        tree.setUniformRowHeights(True)
+        tree.setIndentation(18)
+
+        # Ctrl/Shift-click selects several tasks for the bulk actions
+        tree.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+
+        # Rows of collapsed projects are not ticked, refresh them when shown
+        tree.itemExpanded.connect(self.update_running_tasks)
+
+        # Setup right-click context menu for the tree
+        tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        tree.customContextMenuRequested.connect(self.show_context_menu)
+
+        # Set column widths
+        tree.setColumnWidth(0, 300)  # Name column
+        tree.setColumnWidth(1, 100)  # Time column
+        tree.setColumnWidth(2, 250)  # Actions column
+        tree.setColumnWidth(3, 100)  # Status column
+
+    def create_tree(self):
+        """Make an empty project tree like the one in the .ui file and show it"""
+        tree = QTreeWidget()
+        tree.setHeaderLabels(self.tree_header_labels)
+        self.setup_tree(tree)
+        self.treeStack.addWidget(tree)
+        return tree
+
+    def show_context_menu(self, position):
+        """Show context menu when right-clicking on tree items"""
+        item = self.projectTreeWidget.itemAt(position)
+        if item is None:
+            return
+
+        # Right-click inside a selection of several tasks acts on all of them
+        if item.parent() is not None and item.isSelected():
+            task_items = self.get_selected_task_items()
+            if len(task_items) > 1:
+                self.show_bulk_menu(position, task_items)
+                return
+        
+        menu = QMenu()
+        
+        # Check if this is a project item (parent is None) or task item (has parent)
+        if item.parent() is None:
+            # This is a PROJECT item
+            project_id = item.data(0, 1)
+            project_name = item.text(0)
+            
+            add_task_action = menu.addAction("Add Task")
+            rename_project_action = menu.addAction("Rename Project")
+            clients_action = menu.addAction("Set Clients...")
+            delete_project_action = menu.addAction("Delete Project")
+            
+            action = menu.exec(self.projectTreeWidget.viewport().mapToGlobal(position))
+            
+            if action == add_task_action:
+                self.add_task_to_project(project_id, project_name)
+            elif action == clients_action:
+                self.edit_project_clients(project_id, project_name)
+            elif action == rename_project_action:
+                self.rename_project(project_id, project_name)
+            elif action == delete_project_action:
+                self.delete_project(project_id, project_name)
+        
+        else:
+            # This is a TASK item
+            task_id = item.data(0, 1)
+            task_name = item.text(0)
+            
+            rename_task_action = menu.addAction("Rename Task")
+            tags_action = menu.addAction("Set Tags...")
+            delete_task_action = menu.addAction("Delete Task")
+            
+            action = menu.exec(self.projectTreeWidget.viewport().mapToGlobal(position))
+            
+            if action == rename_task_action:
+                self.rename_task(task_id, task_name)
+            elif action == tags_action:
+                self.edit_task_tags(task_id, task_name, item.parent().data(0, 1))
+            elif action == delete_task_action:
+                self.delete_task(task_id, task_name)
+
+    def get_tree_state(self):
+        state = {}
+        for i in range(self.projectTreeWidget.topLevelItemCount()):
+            item = self.projectTreeWidget.topLevelItem(i)
+            project_id = item.data(0, 1)
+            state[project_id] = item.isExpanded()
+        return state
+    
+    def restore_tree_state(self, state):
+        for i in range(self.projectTreeWidget.topLevelItemCount()):
+            item = self.projectTreeWidget.topLevelItem(i)
+            project_id = item.data(0, 1)
+            if project_id in state:
+                item.setExpanded(state[project_id])
+
+
+        
+    def load_projects(self):
+        """Load all projects from database into the tree widget"""
+        # The full reload covers everything committed so far
+        self.change_watcher.catch_up()
+
+        #Get current state of tree
+        tree_state = self.get_tree_state()
+
+        # Clear the tree. Its row widgets are only deleteLater'd, so delete
+        # them now rather than building the new rows next to the old ones
+        self.projectTreeWidget.clear()
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+        self.running_tasks = {}
+        self.running_task_items = {}
+        self.project_base_seconds = {}
+        
+        # Get all projects (with their totals) from database
+        projects = self.db.get_project_summaries()
+        self.last_worked = self.db.get_last_worked()
+        
+        print(f"Loaded {len(projects)} projects from database")
+        
+        # Add each project to the tree
+        for project in projects:
+            # Create a tree item for the project
+            project_item = SortableTreeItem(self.projectTreeWidget)
+            self.populate_project_item(project_item, project)
+        
+        #Stretch Collumns out with window
+        header = self.projectTreeWidget.header()
+        for col in range(self.projectTreeWidget.columnCount()):
+            header.setSectionResizeMode(col, header.ResizeMode.Stretch)
+
+
+        self.restore_tree_state(tree_state)
+        if self.is_custom_sort():
+            self.apply_sort()
+        self.apply_tag_filter()
+        self.sync_running_tasks()
+
+    def populate_project_item(self, project_item, project_summary):
+        """Fill a project tree item from its summary row (see get_project_summaries) and add its tasks"""
+        project_id = project_summary[0]
+        running_count = project_summary[5]
+        self.update_project_row(project_item, project_summary)
+        project_item.last_worked = 0
+
+        # Get tasks for this project
+        tasks = self.db.get_tasks_for_project(project_id) if project_summary[3] else []
+
+        # Make project item expandable
+        project_item.setExpanded(False)
+
+        # Add tasks under this project
+        for task in tasks:
+            self.add_task_item(project_item, task)
+
+        # Highlight running tasks
+        if running_count:
+            self.highlight_running_task(project_item)
+
+    def update_project_row(self, project_item, project_summary):
+        """Show a project's summary row (name, total time, task count) without touching its tasks"""
+        project_id, project_name, total_seconds, task_count, finished_count, running_count = project_summary
+        project_item.setText(0, project_name)  # Column 0: Name
+        
+        # Store the project ID in the item (we'll need this later)
+        project_item.setData(0, 1, project_id)  # Store ID in role 1
+
+        # Values for sorting without going back to the database
+        project_item.item_id = project_id
+        project_item.is_project = True
+        project_item.name_key = project_name.lower()
+        project_item.seconds = total_seconds
+        if running_count:
+            project_item.status_rank = 0
+        elif finished_count < task_count:
+            project_item.status_rank = 1
+        elif task_count:
+            project_item.status_rank = 2
+        else:
+            project_item.status_rank = 3
+        
+        # Total time for the project (summed by SQLite)
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        seconds = total_seconds % 60
+        time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        
+        project_item.setText(1, time_str)  # Column 1: Time
+        project_item.setText(3, f"{task_count} task(s)")  # Column 3: Status
+        self.project_base_seconds[project_id] = total_seconds
+
+    def add_task_item(self, project_item, task):
+        """Add a task row (see get_tasks_for_project) under its project"""
+        task_id, task_name, total_seconds, is_finished, is_running = task
+        
+        # Create a tree item for the task (child of project)
+        task_item = SortableTreeItem(project_item)
+        task_item.setText(0, task_name)  # Column 0: Task name
+        
+        # Store the task ID in the item
+        task_item.setData(0, 1, task_id)
+
+        task_item.item_id = task_id
+        task_item.name_key = task_name.lower()
+        task_item.seconds = total_seconds
+        task_item.last_worked = self.last_worked.get(task_id, 0)
+        project_item.last_worked = max(project_item.last_worked, task_item.last_worked)
+        
+        # Format and display time
+        hours = total_seconds // 3600
+        minutes = (total_seconds % 3600) // 60
+        seconds = total_seconds % 60
+        time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        task_item.setText(1, time_str)  # Column 1: Time
+
+        self.set_task_item_state(task_item, is_finished, is_running)
+
+    def set_task_item_state(self, task_item, is_finished, is_running):
+        """Show a task row's action buttons and status"""
+        task_id = task_item.data(0, 1)
+        task_item.status_rank = 2 if is_finished else (0 if is_running else 1)
+
+        # Column 2: Action buttons
+        button_widget = self.create_task_buttons(task_item, task_id, is_finished, is_running)
+        self.projectTreeWidget.setItemWidget(task_item, 2, button_widget)
+        
+        # Column 3: Status
+        if is_finished:
+            task_item.setText(3, "Finished")
+        elif is_running:
+            task_item.setText(3, "Running")
+            self.running_task_items[task_id] = task_item
+        else:
+            task_item.setText(3, "Paused")
+
+    def highlight_running_task(self, project_item):
+        """Highlight the running tasks and their parent project"""
+        projectOpen = False
+        for j in range(project_item.childCount()):
+            task_item = project_item.child(j)
+            task_id = task_item.data(0, 1)
+            
+            if task_id in self.running_task_items:
+                projectOpen = True
+
+                # Set a light blue background
+                for col in range(self.projectTreeWidget.columnCount()):
+                    task_item.setBackground(col, QBrush(QColor("#23cff6")))  # pale blue
+                    task_item.setForeground(col, QBrush(QColor("#1e3a8a")))  # dark blue text
+
+                    for col in range(self.projectTreeWidget.columnCount()):
+                        font = task_item.font(col)
+                        font.setBold(True)
+                        task_item.setFont(col, font)
+
+        # Highlight parent project
+        if projectOpen:
+            for col in range(self.projectTreeWidget.columnCount()):
+                project_item.setBackground(col, QBrush(QColor("#23cff6"))) 
+                project_item.setForeground(col, QBrush(QColor("#1d4ed8")))
+
+                for col in range(self.projectTreeWidget.columnCount()):
+                        font = project_item.font(col)
+                        font.setBold(True)
+                        project_item.setFont(col, font)
+
+    def reload_project_items(self, project_ids):
+        """Rebuild only the given project rows (changes made by another instance or script)"""
+        project_items = {}
+        for i in range(self.projectTreeWidget.topLevelItemCount()):
+            item = self.projectTreeWidget.topLevelItem(i)
+            project_items[item.data(0, 1)] = item
+
+        self.last_worked.update(self.db.get_last_worked(project_ids))
+        for project_id in project_ids:
+            project = self.db.get_project_summary(project_id)
+            old_item = project_items.get(project_id)
+
+            if old_item is not None:
+                index = self.projectTreeWidget.indexOfTopLevelItem(old_item)
+                expanded = old_item.isExpanded()
+                self.projectTreeWidget.takeTopLevelItem(index)
+            else:
+                # New projects go first, matching the created_at DESC order
+                index = 0
+                expanded = False
+
+            if project is None:
+                continue
+
+            project_item = SortableTreeItem()
+            self.projectTreeWidget.insertTopLevelItem(index, project_item)
+            self.populate_project_item(project_item, project)
+            project_item.setExpanded(expanded)
+
+        # Rebuilt rows were put back at their old place, re-sort if needed
+        if self.is_custom_sort():
+            self.apply_sort()
+
+        # Running task items may have been rebuilt (or started/paused elsewhere)
+        self.apply_tag_filter()
+        self.sync_running_tasks()
+
+        print(f"Reloaded {len(project_ids)} changed project(s)")
+
+    # ===== TIMER =====
+
+    def sync_running_tasks(self):
+        """Match the open sessions in the database with their tree items"""
+        self.running_tasks = {}
+        for task_id, project_id, task_name, total_seconds, started_at in self.db.get_running_sessions():
+            task_item = self.running_task_items.get(task_id)
+            if task_item is not None:
+                self.running_tasks[task_id] = (task_item, started_at, total_seconds)
+
+        # Drop rows that were rebuilt or are no longer running
+        self.running_task_items = {task_id: running[0] for task_id, running in self.running_tasks.items()}
+        self.update_running_tasks()
+
+    def update_running_tasks(self):
+        """Called every second to update the running tasks' time display.
+
+        Only the running rows and their projects are touched, so a tick costs
+        the same however many tasks the tree holds. Rows inside collapsed
+        projects are skipped (their project total is still updated).
+        """
+        if not self.running_tasks:
+            return
+
+        now = time.time()
+        project_elapsed = {}
+        for task_item, started_at, base_seconds in self.running_tasks.values():
+            # Each session runs on its own clock
+            elapsed_seconds = max(0, int(now - started_at))
+
+            project_item = task_item.parent()
+            if project_item is None:
+                continue
+            if project_item.isExpanded():
+                task_item.setText(1, format_time(base_seconds + elapsed_seconds))
+
+            project_id = project_item.data(0, 1)
+            _, project_seconds = project_elapsed.get(project_id, (project_item, 0))
+            project_elapsed[project_id] = (project_item, project_seconds + elapsed_seconds)
+
+        # Project total = stored total + every open session in it
+        for project_id, (project_item, elapsed_seconds) in project_elapsed.items():
+            project_item.setText(1, format_time(self.project_base_seconds.get(project_id, 0) + elapsed_seconds))
+
+    def running_task_seconds(self, task_id):
+        """Current total of a running task, including its open session"""
+        task_item, started_at, base_seconds = self.running_tasks[task_id]
+        return base_seconds + max(0, int(time.time() - started_at))
+
+    # ===== REMOTE COMMANDS =====
+
+    def handle_remote_command(self, command):
+        """Run a command sent by a second launch (--start / --pause / --status)"""
+        action = command.get('action')
+
+        if action == 'start':
+            task = self.db.find_task(command.get('task', ''))
+            if task is None:
+                return {'ok': False, 'message': f"No task found for '{command.get('task')}'"}
+
+            task_id, project_id, task_name, is_finished = task
+            if task_id in self.running_tasks:
+                return {'ok': True, 'message': f"Task '{task_name}' is already running", 'task_id': task_id}
+            running_task = self.db.get_running_task()
+            if running_task and not self.concurrent_timers:
+                return {'ok': False,
+                        'message': f"Please pause or finish the currently running task first: {running_task[2]}"}
+            if is_finished:
+                return {'ok': False, 'message': f"Task '{task_name}' is finished, reopen it first"}
+
+            self.start_task(task_id)
+            if task_id not in self.running_tasks:
+                return {'ok': False, 'message': f"Could not start task '{task_name}'"}
+            return {'ok': True, 'message': f"Started task '{task_name}'", 'task_id': task_id}
+
+        if action == 'pause':
+            if command.get('task'):
+                task = self.db.find_task(command['task'])
+                if task is None or task[0] not in self.running_tasks:
+                    return {'ok': False, 'message': f"Task '{command['task']}' is not running"}
+                task_ids = [task[0]]
+            else:
+                task_ids = list(self.running_tasks)
+            if not task_ids:
+                return {'ok': False, 'message': "No task is running"}
+
+            task_names = [self.running_tasks[task_id][0].text(0) for task_id in task_ids]
+            for task_id in task_ids:
+                self.db.pause_task(task_id)
+            self.load_projects()
+            print(f"Paused task(s) {task_ids}")
+            return {'ok': True,
+                    'message': "Paused " + ", ".join(f"task '{name}'" for name in task_names),
+                    'task_id': task_ids[0],
+                    'task_ids': task_ids}
+
+        if action == 'status':
+            if not self.running_tasks:
+                return {'ok': True, 'message': "No task is running", 'task_id': None, 'running': []}
+
+            running = [
+                {'task_id': task_id, 'name': task_item.text(0), 'seconds': self.running_task_seconds(task_id)}
+                for task_id, (task_item, started_at, base_seconds) in self.running_tasks.items()
+            ]
+            return {'ok': True,
+                    'message': "Running: " + ", ".join(
+                        f"{task['name']} ({format_time(task['seconds'])})" for task in running),
+                    'task_id': running[0]['task_id'],
+                    'seconds': running[0]['seconds'],
+                    'running': running}
+
+        # Plain second launch: bring the existing window to the front
+        self.showNormal()
+        self.raise_()
+        self.activateWindow()
+        return {'ok': True, 'message': "Time Tracker is already running"}
+
+    # ===== REPORTS =====
+
+    def show_time_analytics(self):
+        """Show distributions of tracked time computed from the session history"""
+        # Imported here so NumPy is only loaded when a report is opened
+        from analytics import compute_report, WEEKDAY_NAMES
+
+        try:
+            report = compute_report(self.db)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to compute analytics:\n{e}")
+            return
+
+        dialog = QDialog(self)
+        load_ui('ui/analytics_dialog.ui', dialog)
+        dialog.buttonBox.rejected.connect(dialog.reject)
+
+        if report['session_count']:
+            dialog.summaryLabel.setText(
+                f"{report['session_count']} session(s), {report['total_hours']:.1f} hour(s) tracked"
+            )
+
+        # Hours per weekday
+        table = dialog.weekdayTable
+        table.setColumnCount(2)
+        table.setHorizontalHeaderLabels(['Weekday', 'Hours'])
+        table.setRowCount(len(WEEKDAY_NAMES))
+        for row, day_name in enumerate(WEEKDAY_NAMES):
+            table.setItem(row, 0, QTableWidgetItem(day_name))
+            table.setItem(row, 1, QTableWidgetItem(f"{report['weekday_hours'][row]:.2f}"))
+
+        # Hour-of-day heatmap, shaded relative to the busiest hour
+        table = dialog.heatmapTable
+        heatmap = report['heatmap']
+        busiest = heatmap.max() or 1
+        table.setRowCount(7)
+        table.setColumnCount(24)
+        table.setVerticalHeaderLabels(WEEKDAY_NAMES)
+        table.setHorizontalHeaderLabels([f"{hour:02d}" for hour in range(24)])
+        for row in range(7):
+            for col in range(24):
+                hours = heatmap[row, col]
+                cell = QTableWidgetItem(f"{hours:.1f}" if hours else "")
+                shade = int(255 - 200 * hours / busiest)
+                cell.setBackground(QBrush(QColor(shade, shade, 255)))
+                table.setItem(row, col, cell)
+        table.resizeColumnsToContents()
+
+        # Per-project weekly trend
+        table = dialog.trendTable
+        project_names = dict(self.db.get_all_projects())
+        table.setRowCount(len(report['trend_projects']))
+        table.setColumnCount(len(report['week_starts']) + 1)
+        table.setHorizontalHeaderLabels(
+            ['Project'] + [week_start.strftime("%d %b") for week_start in report['week_starts']]
+        )
+        for row, project_id in enumerate(report['trend_projects']):
+            table.setItem(row, 0, QTableWidgetItem(project_names.get(int(project_id), "(deleted)")))
+            for col, hours in enumerate(report['trend'][row], start=1):
+                table.setItem(row, col, QTableWidgetItem(f"{hours:.1f}"))
+
+        # Session length percentiles
+        table = dialog.percentileTable
+        table.setColumnCount(2)
+        table.setHorizontalHeaderLabels(['Percentile', 'Session Length (HH:MM:SS)'])
+        table.setRowCount(len(report['percentiles']))
+        for row, (percentile, length) in enumerate(report['percentiles'].items()):
+            total_seconds = int(length)
+            hours = total_seconds // 3600
+            minutes = (total_seconds % 3600) // 60
+            seconds = total_seconds % 60
+            table.setItem(row, 0, QTableWidgetItem(f"P{percentile}"))
+            table.setItem(row, 1, QTableWidgetItem(f"{hours:02d}:{minutes:02d}:{seconds:02d}"))
+
+        dialog.exec()
+
+    # ===== WORKSPACES =====
+
+    def create_change_watcher(self):
+        """Watch the open workspace's database for commits made elsewhere"""
+        watcher = ChangeWatcher(self.db, parent=self)
+        watcher.projectsChanged.connect(self.reload_project_items)
+        return watcher
+
+    def load_workspace_settings(self):
+        """Show the settings stored in the open workspace's database"""
+        self.concurrent_timers = self.db.get_setting(CONCURRENT_TIMERS_SETTING, '0') == '1'
+
+        widgets = (self.actionConcurrentTimers, self.actionWorkingSet, self.sortComboBox, self.groupByStatusCheckBox)
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.actionConcurrentTimers.setChecked(self.concurrent_timers)
+        self.actionWorkingSet.setChecked(self.db.get_setting(WORKING_SET_SETTING, '0') == '1')
+        self.sortComboBox.setCurrentIndex(max(self.sortComboBox.findData(self.db.get_setting(SORT_MODE_SETTING)), 0))
+        self.groupByStatusCheckBox.setChecked(self.db.get_setting(GROUP_BY_STATUS_SETTING, '0') == '1')
+        for widget in widgets:
+            widget.blockSignals(False)
+
+        self.refresh_tag_filter_options()
+
+    def refresh_workspace_options(self):
+        """Fill the workspace switcher from the registry, selecting the open workspace"""
+        self.workspaceComboBox.blockSignals(True)
+        self.workspaceComboBox.clear()
+        for name in self.workspaces.names():
+            self.workspaceComboBox.addItem(name, self.workspaces.db_path(name))
+
+        index = self.workspaceComboBox.findData(self.db.db_path)
+        if index < 0:
+            # A database opened by path that is not registered
+            self.workspaceComboBox.addItem(os.path.basename(self.db.db_path), self.db.db_path)
+            index = self.workspaceComboBox.count() - 1
+        self.workspaceComboBox.setCurrentIndex(index)
+        self.workspaceComboBox.blockSignals(False)
+
+    def change_workspace(self):
+        """Handler for the workspace switcher"""
+        db_path = self.workspaceComboBox.currentData()
+        if db_path is None or db_path == self.db.db_path:
+            return
+
+        if not self.switch_workspace(db_path):
+            self.refresh_workspace_options()
+            return
+
+        name = self.workspaceComboBox.currentText()
+        if name in self.workspaces.names():
+            self.workspaces.set_current(name)
+
+    def switch_workspace(self, db_path):
+        """Show another workspace, reusing its open database and tree when it is cached.
+
+        The workspace shown until now is parked in the cache as it is. A
+        cached workspace comes back without a reload: its change watcher
+        reports what other instances committed meanwhile and only those
+        projects are rebuilt. Returns False if the database can't be opened.
+        """
+        start = time.perf_counter()
+
+        state = self.workspace_cache.pop(db_path)
+        if state is None:
+            try:
+                db = open_database(db_path, pool_size=WORKSPACE_POOL_SIZE)
+            except Exception as e:
+                QMessageBox.critical(self, "Workspace", f"Failed to open {db_path}:\n{e}")
+                return False
+
+        # Park the current workspace (running timers keep running in its database)
+        self.maintenance.stop()
+        self.export_scheduler.stop()
+        self.change_watcher.pause()
+        for evicted in self.workspace_cache.put(self.db.db_path, WorkspaceState(self)):
+            self.close_workspace(evicted)
+
+        if state is not None:
+            state.restore(self)
+            self.treeStack.setCurrentWidget(self.projectTreeWidget)
+            self.load_workspace_settings()
+            self.apply_tag_filter()
+            self.change_watcher.resume()
+            self.sync_running_tasks()
+        else:
+            self.db = db
+            self.projectTreeWidget = self.create_tree()
+            self.treeStack.setCurrentWidget(self.projectTreeWidget)
+            self.change_watcher = self.create_change_watcher()
+            self.load_workspace_settings()
+            self.load_projects()
+            self.change_watcher.start()
+
+        self.maintenance.db = self.db
+        self.export_scheduler.db = self.db
+        self.maintenance.start()
+        self.export_scheduler.start()
+
+        print(f"Switched to {self.db.db_path} ({'cached' if state is not None else 'loaded'}) "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        self.workspaceSwitched.emit(self.db.db_path)
+        return True
+
+    def reopen_database(self):
+        """Open the shown workspace's database again, e.g. after switching the working set on or off"""
+        self.maintenance.stop()
+        self.export_scheduler.stop()
+        self.change_watcher.stop()
+        self.change_watcher.deleteLater()
+        self.db.close()  # Flushes a working set
+
+        self.db = open_database(self.db.db_path, pool_size=WORKSPACE_POOL_SIZE)
+        self.change_watcher = self.create_change_watcher()
+        self.load_projects()
+        self.change_watcher.start()
+
+        self.maintenance.db = self.db
+        self.export_scheduler.db = self.db
+        self.maintenance.start()
+        self.export_scheduler.start()
+
+    def close_workspace(self, state):
+        """Release a workspace pushed out of the cache"""
+        state.change_watcher.stop()
+        state.change_watcher.deleteLater()
+        self.treeStack.removeWidget(state.projectTreeWidget)
+        state.projectTreeWidget.deleteLater()
+        state.db.close()
+        print(f"Closed workspace {state.db.db_path}")
+
+    def add_workspace(self):
+        """Register a database file (new or existing) as a workspace and switch to it"""
+        name, ok = QInputDialog.getText(self, "New Workspace", "Workspace name (e.g. a client):")
+        name = name.strip()
+        if not ok or not name:
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Workspace Database",
+            os.path.join(os.path.dirname(DEFAULT_DB_PATH), f"{name}.db"),
+            "Database Files (*.db)",
+            options=QFileDialog.Option.DontConfirmOverwrite  # An existing database is opened, not replaced
+        )
+        if not file_path:
+            return
+
+        try:
+            self.workspaces.add(name, file_path)
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, "New Workspace", str(e))
+            return
+
+        self.refresh_workspace_options()
+        self.workspaceComboBox.setCurrentIndex(self.workspaceComboBox.findText(name))
+
+    def remove_workspace(self):
+        """Take the shown workspace off the list (its database file is kept)"""
+        name = self.workspaceComboBox.currentText()
+        if name not in self.workspaces.names() or name == DEFAULT_WORKSPACE:
+            QMessageBox.information(self, "Remove Workspace", "The Default workspace cannot be removed.")
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Remove Workspace",
+            f"Remove '{name}' from the workspace list?\n\n"
+            f"Its database file is kept:\n{self.workspaces.db_path(name)}",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        # Show the Default workspace, then forget this one
+        self.workspaceComboBox.setCurrentIndex(0)
+        try:
+            self.workspaces.remove(name)
+        except (ValueError, OSError) as e:
+            QMessageBox.warning(self, "Remove Workspace", str(e))
+        self.refresh_workspace_options()
+        print(f"Removed workspace '{name}'")
+
+    # ===== HANDLE CLOSING =====
+
+    def closeEvent(self, event: QCloseEvent):
+        """Handle window close event"""
+        # Timers may also run in workspaces that are open but not shown
+        parked_tasks = [(state.db, task_id) for state in self.workspace_cache.values()
+                        for task_id in state.running_tasks]
+
+        # Check if a task is running
+        if self.running_tasks or parked_tasks:
+            # Show warning
+            reply = QMessageBox.warning(
+                self,
+                "Task Running",
+                "A task is currently running. Are you sure you want to close?\n\n"
+                "The timer will stop and current progress will be saved.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No
+            )
+            
+            if reply == QMessageBox.StandardButton.No:
+                event.ignore()  # Cancel the close
+                return
+            else:
+                # Save the running tasks before closing
+                for task_id in list(self.running_tasks):
+                    self.db.pause_task(task_id)
+                for db, task_id in parked_tasks:
+                    db.pause_task(task_id)
+        
+        # Accept the close event (actually close the application)
+        self.change_watcher.stop()
+        for state in self.workspace_cache.values():
+            state.change_watcher.stop()
+        self.maintenance.stop()
+        self.export_scheduler.stop()
+        if self.export_worker is not None:
+            self.export_worker.wait()
+        # Working sets write what is still pending
+        self.db.close()
+        for state in self.workspace_cache.values():
+            state.db.close()
+        event.accept()
+   
+    # ===== EXPORTING =====
+
+    def export_to_csv(self):
+        # Check if another task is already running
+        running_task = self.db.get_running_task()
+        if running_task:
+            QMessageBox.warning(
+                self, 
+                "Task Running", 
+                f"Please pause or finish the currently running task first:\n{running_task[2]}"
+            )
+            return
+
+        """Export all projects and tasks to CSV (.csv)"""
+        from exporters import write_csv
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export to CSV",
+            "exports/time_tracker_export.csv",
+            "CSV Files (*.csv)"
+        )
+
+        if not file_path:
+            return
+
+        try:
+            write_csv(self.db, file_path)
+
+            # Automatically open the CSV file after saving
+            self.open_exported_file(file_path)
+
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to export CSV:\n{e}")
+
+    def export_to_excel(self):
+        """Export all projects and tasks to Excel (.xlsx)"""
+        from exporters import write_excel
+
+        # Check if another task is already running
+        running_task = self.db.get_running_task()
+        if running_task:
+            QMessageBox.warning(
+                self, 
+                "Task Running", 
+                f"Please pause or finish the currently running task first:\n{running_task[2]}"
+            )
+            return
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export to Excel",
+            "exports/time_tracker_export.xlsx",
+            "Excel Files (*.xlsx)"
+        )
+
+        if not file_path:
+            return
+
+        try:
+            write_excel(self.db, file_path)
+
+            QMessageBox.information(
+                self,
+                "Export Successful",
+                f"Data exported successfully to:\n{file_path}"
+            )
+
+            # Open the Excel file
+            self.open_exported_file(file_path)
+
+        except Exception as e:
+            QMessageBox.critical(
+                self,
+                "Export Failed",
+                f"Failed to export data:\n{str(e)}"
+            )
+
+    def open_exported_file(self, file_path):
+        """Open an exported file in its default application (any platform)"""
+        if not QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(file_path))):
+            print(f"No application to open {file_path}")
+
+    def export_to_columnar(self):
+        """Export flat, typed task rows for analytics tools (Parquet / Arrow / JSON Lines)"""
+        from exporters import export_columnar, pyarrow_available
+
+        if pyarrow_available():
+            default_path = "exports/time_tracker_export.parquet"
+            file_filter = ("Parquet Files (*.parquet);;"
+                           "Arrow IPC Files (*.arrow);;"
+                           "JSON Lines Files (*.jsonl)")
+        else:
+            # Without pyarrow only JSON Lines can be written
+            default_path = "exports/time_tracker_export.jsonl"
+            file_filter = "JSON Lines Files (*.jsonl)"
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export for Analytics",
+            default_path,
+            file_filter
+        )
+
+        if not file_path:
+            return
+
+        try:
+            row_count = export_columnar(self.db, file_path)
+
+            QMessageBox.information(
+                self,
+                "Export Successful",
+                f"Exported {row_count} row(s) to:\n{file_path}"
+            )
+
+        except Exception as e:
+            QMessageBox.critical(
+                self,
+                "Export Failed",
+                f"Failed to export data:\n{str(e)}"
+            )
+
+
+    def export_all_formats(self):
+        """Export CSV, Excel and analytics files of one snapshot together, in the background"""
+        from export_scheduler import EXPORT_FORMATS, ExportWorker
+
+        if self.export_worker is not None:
+            QMessageBox.information(self, "Export Running", "The previous export is still being written.")
+            return
+
+        directory = QFileDialog.getExistingDirectory(self, "Export All Formats", os.path.abspath("exports"))
+        if not directory:
+            return
+
+        # The worker reads the database file, which must hold everything shown
+        self.db.flush()
+        self.export_worker = ExportWorker(self.db.db_path, directory, list(EXPORT_FORMATS), parent=self)
+        self.export_worker.exported.connect(lambda paths, watermark: QMessageBox.information(
+            self,
+            "Export Successful",
+            "Data exported successfully to:\n" + "\n".join(paths)
+        ))
+        self.export_worker.failed.connect(lambda message: QMessageBox.critical(
+            self,
+            "Export Failed",
+            f"Failed to export data:\n{message}"
+        ))
+        self.export_worker.finished.connect(self.export_all_formats_finished)
+        self.export_worker.start()
+        self.statusbar.showMessage(f"Exporting to {directory}...")
+
+    def export_all_formats_finished(self):
+        """Release the finished export worker"""
+        self.statusbar.clearMessage()
+        self.export_worker.deleteLater()
+        self.export_worker = None
+
+    def export_changes(self):
+        """Export only projects/tasks changed since the previous change export (.jsonl)"""
+        from exporters import export_delta
+
+        file_path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export Changes Since Last Sync",
+            f"exports/time_tracker_changes_{datetime.now():%Y%m%d_%H%M%S}.jsonl",
+            "JSON Lines Files (*.jsonl)"
+        )
+
+        if not file_path:
+            return
+
+        try:
+            change_count = export_delta(self.db, file_path)
+
+            QMessageBox.information(
+                self,
+                "Export Successful",
+                f"Exported {change_count} change(s) to:\n{file_path}"
+            )
+
+        except Exception as e:
+            QMessageBox.critical(
+                self,
+                "Export Failed",
+                f"Failed to export changes:\n{str(e)}"
+            )
+
+
+    def configure_scheduled_export(self):
+        """Set the schedule, folder and formats of automatic exports"""
+        from export_scheduler import (CronSchedule, SCHEDULE_SETTING, DIRECTORY_SETTING,
+                                      DEFAULT_FORMATS, FORMATS_SETTING)
+
+        dialog = QDialog(self)
+        load_ui('ui/export_schedule_dialog.ui', dialog)
+
+        format_boxes = {
+            'csv': dialog.csvCheckBox,
+            'xlsx': dialog.excelCheckBox,
+            'columnar': dialog.columnarCheckBox,
+        }
+        dialog.scheduleLineEdit.setText(self.db.get_setting(SCHEDULE_SETTING, ''))
+        dialog.directoryLineEdit.setText(
+            self.db.get_setting(DIRECTORY_SETTING, os.path.abspath('exports')))
+        formats = self.db.get_setting(FORMATS_SETTING, DEFAULT_FORMATS).split(',')
+        for export_format, check_box in format_boxes.items():
+            check_box.setChecked(export_format in formats)
+
+        def browse():
+            directory = QFileDialog.getExistingDirectory(dialog, "Export Folder", dialog.directoryLineEdit.text())
+            if directory:
+                dialog.directoryLineEdit.setText(directory)
+
+        def show_next_run():
+            spec = dialog.scheduleLineEdit.text().strip()
+            if not spec:
+                dialog.nextRunLabel.setText("Scheduled exports are off")
+                return
+            try:
+                next_run = CronSchedule(spec).next_after(time.time())
+            except ValueError as e:
+                dialog.nextRunLabel.setText(str(e))
+                return
+            if next_run is None:
+                dialog.nextRunLabel.setText("This schedule never runs")
+            else:
+                dialog.nextRunLabel.setText(f"Next export: {datetime.fromtimestamp(next_run):%Y-%m-%d %H:%M}")
+
+        dialog.browseButton.clicked.connect(browse)
+        dialog.scheduleLineEdit.textChanged.connect(show_next_run)
+        dialog.buttonBox.accepted.connect(dialog.accept)
+        dialog.buttonBox.rejected.connect(dialog.reject)
+        show_next_run()
+
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        spec = dialog.scheduleLineEdit.text().strip()
+        directory = dialog.directoryLineEdit.text().strip()
+        formats = [export_format for export_format, check_box in format_boxes.items() if check_box.isChecked()]
+        if spec and (not directory or not formats):
+            QMessageBox.warning(self, "Scheduled Export", "Please choose an export folder and at least one format.")
+            return
+
+        try:
+            self.export_scheduler.configure(spec, directory, formats)
+            print(f"Scheduled export set to '{spec}' in {directory} ({', '.join(formats)})")
+        except ValueError as e:
+            QMessageBox.warning(self, "Scheduled Export", f"Invalid schedule:\n{e}")
+
+
+if __name__ == '__main__':
+    # Export worker processes start this script again (needed for the frozen exe)
+    multiprocessing.freeze_support()
+
+    # Forward the command line to an already running instance and exit
+    args = parse_arguments(sys.argv[1:])
+    command = command_from_arguments(args)
+    # One running window per install, whichever workspace it shows
+    server_name = instance_name(DEFAULT_DB_PATH)
+    reply = send_command(server_name, command)
+    if reply is not None:
+        print(reply['message'])
+        sys.exit(0 if reply['ok'] else 1)
+    if command['action'] in ('pause', 'status'):
+        print("Time Tracker is not running")
+        sys.exit(1)
+
+    app = QApplication(sys.argv)
+
+    # Claim the name before building the window, so a launch made during
+    # start-up waits for this instance instead of opening a second one
+    instance_server = InstanceServer(parent=app)
+    if not instance_server.listen(server_name):
+        reply = send_command(server_name, command)
+        if reply is not None:
+            print(reply['message'])
+            sys.exit(0 if reply['ok'] else 1)
+        print(f"Could not listen for commands on {server_name}")
+
+    app.setWindowIcon(QIcon(resource_path("assets/stopwatch.ico")))
+    app.setStyleSheet(load_stylesheet())
+    window = TimeTrackerApp()
+    instance_server.set_handler(window.handle_remote_command)
+
+    if args.api_port:
+        from api_server import ApiServer
+
+        api_server = ApiServer(
+            window.db.db_path,
+            controller=CommandBridge(window.handle_remote_command, parent=window),
+            host=args.api_host,
+            port=args.api_port
+        )
+        try:
+            api_server.start()
+            app.aboutToQuit.connect(api_server.stop)
+            # Reads follow the shown workspace, like the timer commands do
+            window.workspaceSwitched.connect(api_server.set_database)
+        except OSError as e:
+            print(e)
+
+    window.show()
+    if command['action'] == 'start':
+        print(window.handle_remote_command(command)['message'])
+    sys.exit(app.exec())
@@ -0,0 +1,105 @@
+import threading
+import time
+
+from PyQt6.QtCore import QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+
+# ===== IDLE-TIME MAINTENANCE =====
+
+IDLE_SECONDS = 120  # No keyboard/mouse input for this long counts as idle
+MAINTENANCE_INTERVAL = 6 * 3600  # At most one complete pass per interval
+LAST_RUN_SETTING = 'maintenance_last_run'
+STOP_TIMEOUT = 2.0  # Seconds stop() waits for an interrupted step
+
+ACTIVITY_EVENTS = (
+    QEvent.Type.KeyPress,
+    QEvent.Type.MouseButtonPress,
+    QEvent.Type.Wheel,
+)
+
+
+class MaintenanceScheduler(QObject):
+    """Run DatabaseManager.run_maintenance while nothing is going on.
+
+    A pass starts when no task is running (is_busy returns False), the
+    user has not touched the app for idle_seconds and the last complete
+    pass is older than interval_seconds. It runs on a background thread
+    with its own connection, one step at a time, and stops as soon as the
+    user comes back or a task starts (aborting the statement in progress);
+    the next idle period picks it up again.
+    """
+
+    def __init__(self, db, is_busy, idle_seconds=IDLE_SECONDS, interval_seconds=MAINTENANCE_INTERVAL,
+                 check_interval_ms=30000, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.is_busy = is_busy
+        self.idle_seconds = idle_seconds
+        self.interval_seconds = interval_seconds
+
+        self.last_activity = time.monotonic()
+        self.interrupted = threading.Event()
+        self.thread = None
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(check_interval_ms)
+        self.timer.timeout.connect(self.check_idle)
+
+    def start(self):
+        """Start watching for idle periods"""
+        QApplication.instance().installEventFilter(self)
+        self.timer.start()
+
+    def stop(self):
+        """Stop watching and interrupt a running step"""
+        self.timer.stop()
+        self.interrupted.set()
+        if self.thread is not None:
+            # The step aborts within a few thousand SQLite instructions; a
+            # thread stuck in I/O is left to finish on its own connection
+            self.thread.join(STOP_TIMEOUT)
+            if self.thread.is_alive():
+                print("Maintenance step still running, leaving it to finish in the background")
+            else:
+                self.thread = None
+
+    def eventFilter(self, watched, event):
+        """Note user input, and interrupt a running pass"""
+        if event.type() in ACTIVITY_EVENTS:
+            self.last_activity = time.monotonic()
+            self.interrupted.set()
+        return False
+
+    def is_idle(self):
+        """True while no task runs and the user has been away long enough"""
+        if self.interrupted.is_set() or self.is_busy():
+            return False
+        return time.monotonic() - self.last_activity >= self.idle_seconds
+
+    def check_idle(self):
+        """Timer tick: start a pass if it is due and the app is idle"""
+        if self.thread is not None and self.thread.is_alive():
+            return
+
+        self.interrupted.clear()
+        if not self.is_idle():
+            return
+
+        last_run = float(self.db.get_setting(LAST_RUN_SETTING, '0'))
+        if time.time() - last_run < self.interval_seconds:
+            return
+
+        # The pass keeps its database, even if db is switched to another workspace meanwhile
+        self.thread = threading.Thread(target=self.run_pass, args=(self.db,), name="Maintenance", daemon=True)
+        self.thread.start()
+
+    def run_pass(self, db):
+        """Thread body: run the maintenance steps on db while the app stays idle"""
+        try:
+            if db.run_maintenance(self.is_idle):
+                db.set_setting(LAST_RUN_SETTING, time.time())
+            else:
+                print("Maintenance interrupted, it runs again in the next idle period")
+        except Exception as e:
+            # Maintenance is optional, a locked or read-only file must not break the app
+            print(f"Maintenance failed: {e}")
@@ -0,0 +1,209 @@
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Render without a display
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+from database_manager import DatabaseManager
+
+# ===== MEMORY BUDGET TEST =====
+#
+# Loads a synthetic database into the main window (offscreen), then runs
+# start / tick / pause / reload cycles and watches both the Python heap
+# (tracemalloc) and the process RSS, which also covers the Qt widgets
+# created per task row. Fails when the window costs more than the budget
+# (after load or after any reload), when the first reload adds more than
+# the load itself did, or when memory keeps growing from cycle to cycle:
+#
+#   python memory_test.py --tasks 5000 --cycles 30
+
+
+def current_rss():
+    """Resident set size of this process in bytes (None if unknown)"""
+    if sys.platform.startswith('linux'):
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ('cb', wintypes.DWORD),
+                ('PageFaultCount', wintypes.DWORD),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb)
+        return counters.WorkingSetSize
+
+    return None
+
+
+def format_mb(size):
+    """Format a byte count as MB"""
+    return "n/a" if size is None else f"{size / (1024 * 1024):.1f} MB"
+
+
+def settle(app):
+    """Run pending events (including deleteLater) and collect garbage"""
+    # Deferred deletes only run inside a real event loop, as in the app
+    QTimer.singleShot(0, app.quit)
+    app.exec()
+    gc.collect()
+
+
+def build_database(db_path, projects, tasks):
+    """Fill a new database with synthetic projects and tasks"""
+    db = DatabaseManager(db_path, verbose=False)
+    records = (
+        (f"Project {i % projects + 1}", f"Task {i + 1}", (i * 37) % 36000, i % 7 == 3)
+        for i in range(tasks)
+    )
+    db.bulk_import(records)
+    return db
+
+
+def measure(app, window, cycles):
+    """Run start/tick/pause/reload cycles, return [(python_bytes, rss_bytes)] per cycle"""
+    conn = window.db.get_connection()
+    task_ids = [row[0] for row in conn.execute('SELECT id FROM tasks WHERE is_finished = 0 LIMIT 100')]
+    conn.close()
+    samples = []
+    for cycle in range(cycles):
+        task_id = task_ids[cycle % len(task_ids)]
+        window.start_task(task_id)
+        window.update_running_tasks()
+        window.pause_task(task_id)
+        window.load_projects()
+        settle(app)
+        samples.append((tracemalloc.get_traced_memory()[0], current_rss()))
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Memory budget test for the main window")
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--cycles", type=int, default=15, help="start/pause/reload cycles")
+    parser.add_argument("--warmup", type=int, default=5, help="cycles ignored for the growth check")
+    parser.add_argument("--budget-mb", type=float, default=250.0,
+                        help="maximum memory the loaded window may add (default: %(default)s)")
+    parser.add_argument("--reload-jump", type=float, default=1.0,
+                        help="maximum growth of the first reload, as a fraction of the load (default: %(default)s)")
+    parser.add_argument("--growth-kb", type=float, default=1024.0,
+                        help="maximum growth over the measured cycles (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    temp_dir = tempfile.TemporaryDirectory()
+    db_path = os.path.join(temp_dir.name, 'memory.db')
+    build_database(db_path, args.projects, args.tasks)
+
+    app = QApplication(sys.argv)
+
+    from main import TimeTrackerApp
+
+    settle(app)
+    tracemalloc.start()
+    rss_before = current_rss()
+    python_before = tracemalloc.get_traced_memory()[0]
+
+    start = time.perf_counter()
+    window = TimeTrackerApp(db_path)
+    settle(app)
+    load_time = time.perf_counter() - start
+
+    rss_loaded = current_rss()
+    python_loaded = tracemalloc.get_traced_memory()[0]
+    snapshot_loaded = tracemalloc.take_snapshot()
+
+    samples = measure(app, window, args.cycles)
+    snapshot_final = tracemalloc.take_snapshot()
+
+    print(f"{args.tasks} tasks in {args.projects} projects, loaded in {load_time:.2f}s")
+    print(f"Python heap after load:      {format_mb(python_loaded - python_before)} "
+          f"({(python_loaded - python_before) / args.tasks:.0f} bytes/task)")
+    if rss_before is not None:
+        print(f"RSS after load:              {format_mb(rss_loaded - rss_before)} "
+              f"({(rss_loaded - rss_before) / args.tasks:.0f} bytes/task, {format_mb(rss_loaded)} in total)")
+
+    print("Cycle  Python heap   RSS")
+    for cycle, (python_bytes, rss_bytes) in enumerate(samples, 1):
+        print(f"{cycle:>5}  {format_mb(python_bytes):>11}  {format_mb(rss_bytes):>10}")
+
+    # Growth is measured after the warm-up cycles: the allocator keeps some
+    # freed memory around and PyQt frees the slots of deleted buttons one
+    # event loop pass later, so the first reloads always grow a little
+    first_python, first_rss = samples[min(args.warmup, len(samples) - 1)]
+    last_python, last_rss = samples[-1]
+    python_growth = last_python - first_python
+    rss_growth = None if first_rss is None else last_rss - first_rss
+    print(f"Growth after warm-up:        Python {python_growth / 1024:.0f} KB, "
+          f"RSS {'n/a' if rss_growth is None else f'{rss_growth / 1024:.0f} KB'}")
+
+    print("Largest Python allocations added since load:")
+    for stat in snapshot_final.compare_to(snapshot_loaded, 'lineno')[:5]:
+        print(f"    {stat}")
+
+    # Per-task cost is taken once reloads have settled: the first reload
+    # builds new rows while the allocator still holds the old ones
+    steady_python, steady_rss = samples[-1]
+    print(f"Python heap after reloads:   {format_mb(steady_python - python_before)} "
+          f"({(steady_python - python_before) / args.tasks:.0f} bytes/task)")
+    if rss_before is not None:
+        print(f"RSS after reloads:           {format_mb(steady_rss - rss_before)} "
+              f"({(steady_rss - rss_before) / args.tasks:.0f} bytes/task)")
+        loaded_cost = rss_loaded - rss_before
+        reload_jump = samples[0][1] - rss_loaded
+        window_cost = max([rss_loaded] + [rss_bytes for _, rss_bytes in samples]) - rss_before
+        print(f"Peak RSS for the window:     {format_mb(window_cost)} ({window_cost / args.tasks:.0f} bytes/task)")
+    else:
+        loaded_cost = python_loaded - python_before
+        reload_jump = samples[0][0] - python_loaded
+        window_cost = max([python_loaded] + [python_bytes for python_bytes, _ in samples]) - python_before
+    print(f"First reload added:          {format_mb(reload_jump)} ({reload_jump / max(loaded_cost, 1):.0%} of the load)")
+
+    failures = []
+    if window_cost > args.budget_mb * 1024 * 1024:
+        failures.append(f"window uses {format_mb(window_cost)}, budget is {args.budget_mb:.0f} MB")
+    if reload_jump > loaded_cost * args.reload_jump:
+        failures.append(f"first reload added {format_mb(reload_jump)}, the load itself took {format_mb(loaded_cost)}")
+    if python_growth > args.growth_kb * 1024:
+        failures.append(f"Python heap grew {python_growth / 1024:.0f} KB over the cycles")
+    if rss_growth is not None and rss_growth > args.growth_kb * 1024:
+        failures.append(f"RSS grew {rss_growth / 1024:.0f} KB over the cycles")
+
+    window.close()
+    window.db.close()
+    tracemalloc.stop()
+    temp_dir.cleanup()
+
+    if failures:
+        for failure in failures:
+            print(f"FAILED: {failure}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
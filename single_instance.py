@@ -0,0 +1,158 @@
+import getpass
+import hashlib
+import json
+import os
+import threading
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtNetwork import QAbstractSocket, QLocalServer, QLocalSocket
+
+# ===== SINGLE INSTANCE / COMMAND CHANNEL =====
+#
+# The first instance listens on a local socket (a named pipe on Windows).
+# Later launches connect, send one JSON command line, print the JSON reply
+# and exit without ever creating a window.
+
+CONNECT_TIMEOUT_MS = 200
+REPLY_TIMEOUT_MS = 30000  # The running instance may still be building its window
+
+
+def instance_name(db_path):
+    """Socket name shared by every instance of this user working on the same database"""
+    digest = hashlib.sha1(os.path.abspath(db_path).lower().encode('utf-8')).hexdigest()[:12]
+    return f"TimeTracker-{getpass.getuser()}-{digest}"
+
+
+def instance_running(name):
+    """True if an instance is listening on name (a stale socket file does not count)"""
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return False
+    socket.disconnectFromServer()
+    return True
+
+
+def send_command(name, command):
+    """Send a command to the running instance.
+
+    Returns the reply dict, or None if no instance is running.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    if not socket.waitForConnected(CONNECT_TIMEOUT_MS):
+        return None
+
+    socket.write((json.dumps(command) + '\n').encode('utf-8'))
+    socket.flush()
+    socket.waitForBytesWritten(REPLY_TIMEOUT_MS)
+
+    reply = b''
+    while not reply.endswith(b'\n'):
+        if not socket.waitForReadyRead(REPLY_TIMEOUT_MS):
+            break
+        reply += bytes(socket.readAll())
+    socket.disconnectFromServer()
+
+    if not reply:
+        return {'ok': False, 'message': 'The running instance did not reply'}
+    return json.loads(reply.decode('utf-8'))
+
+
+class InstanceServer(QObject):
+    """Accept commands from later launches and pass them to a handler.
+
+    The handler receives the command dict and returns a reply dict with
+    at least 'ok' and 'message'. The name is claimed before the window
+    exists; commands that arrive until set_handler is called wait for it.
+    """
+
+    def __init__(self, handler=None, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.waiting = []
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self.accept_connections)
+
+    def listen(self, name):
+        """Start listening. Returns False if the name could not be claimed."""
+        # Windows lets several servers share a pipe name, so ask first
+        if instance_running(name):
+            return False
+        if self.server.listen(name):
+            return True
+
+        # A crashed instance can leave a stale socket file behind (Unix).
+        # Only remove it when nothing answers on it.
+        if self.server.serverError() == QAbstractSocket.SocketError.AddressInUseError:
+            if instance_running(name):
+                return False
+            QLocalServer.removeServer(name)
+            return self.server.listen(name)
+        return False
+
+    def set_handler(self, handler):
+        """Start running commands, including those that arrived meanwhile"""
+        self.handler = handler
+        waiting, self.waiting = self.waiting, []
+        for socket in waiting:
+            self.read_command(socket)
+
+    def close(self):
+        """Stop accepting commands"""
+        self.server.close()
+
+    def accept_connections(self):
+        """Read the command of every pending connection"""
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            socket.readyRead.connect(lambda socket=socket: self.read_command(socket))
+            socket.disconnected.connect(socket.deleteLater)
+
+    def read_command(self, socket):
+        """Run a complete command line and write the reply back"""
+        if not socket.canReadLine():
+            return
+        if self.handler is None:
+            if socket not in self.waiting:
+                self.waiting.append(socket)
+                socket.disconnected.connect(lambda socket=socket: self.waiting.remove(socket)
+                                            if socket in self.waiting else None)
+            return
+
+        line = bytes(socket.readLine()).decode('utf-8')
+        try:
+            reply = self.handler(json.loads(line))
+        except Exception as e:
+            reply = {'ok': False, 'message': f"Command failed: {e}"}
+
+        socket.write((json.dumps(reply) + '\n').encode('utf-8'))
+        socket.flush()
+        socket.disconnectFromServer()
+
+
+class CommandBridge(QObject):
+    """Call a command handler on the GUI thread from any other thread.
+
+    Used by the HTTP API, whose requests are served on worker threads while
+    the timer state lives in the window. Calling the bridge blocks until the
+    handler has run and returns its reply.
+    """
+
+    requested = pyqtSignal(object)
+
+    def __init__(self, handler, parent=None):
+        super().__init__(parent)
+        self.handler = handler
+        self.reply = None
+        self.lock = threading.Lock()
+        self.requested.connect(self.run_handler, Qt.ConnectionType.BlockingQueuedConnection)
+
+    def run_handler(self, command):
+        self.reply = self.handler(command)
+
+    def __call__(self, command):
+        with self.lock:
+            self.requested.emit(command)
+            return self.reply
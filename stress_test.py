@@ -0,0 +1,145 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from database_manager import DatabaseManager
+from database_setup import create_database
+
+# ===== MULTI-PROCESS WRITE STRESS TEST =====
+#
+# Several processes hammer one database with the app's timer writes at the
+# same time: start/pause on shared tasks (with duplicate pauses), renames and
+# new tasks. Afterwards every credited second must be accounted for:
+#
+#   sum of seconds returned by pause_task
+#     == sum of tasks.total_seconds
+#     == sum of whole seconds of every closed session
+#
+# and no session may be left open. Run with:
+#
+#   python stress_test.py --processes 8 --operations 300
+
+
+def worker(db_path, worker_id, operations, project_id, task_ids, results):
+    """Run random timer operations, report (credited_seconds, lock_errors, operations)"""
+    db = DatabaseManager(db_path, verbose=False)
+    rng = random.Random(worker_id)
+    credited = 0
+    lock_errors = 0
+
+    for i in range(operations):
+        task_id = rng.choice(task_ids)
+        try:
+            roll = rng.random()
+            if roll < 0.45:
+                # Back-dated start so every pause credits a few seconds
+                db.start_task(task_id, started_at=time.time() - rng.randint(1, 120))
+            elif roll < 0.85:
+                credited += db.pause_task(task_id)
+                # A duplicate pause (e.g. a retried request) must credit nothing
+                if rng.random() < 0.3:
+                    credited += db.pause_task(task_id)
+            elif roll < 0.95:
+                db.rename_task(task_id, f"Task {task_id} (renamed by {worker_id}/{i})")
+            else:
+                db.add_task(project_id, f"Extra task {worker_id}/{i}")
+        except sqlite3.OperationalError as e:
+            print(f"Worker {worker_id}: {e}")
+            lock_errors += 1
+
+    # Leave nothing running
+    for task_id in task_ids:
+        try:
+            credited += db.pause_task(task_id)
+        except sqlite3.OperationalError as e:
+            print(f"Worker {worker_id}: {e}")
+            lock_errors += 1
+
+    results.put((credited, lock_errors, operations))
+
+
+def check_database(db_path, credited):
+    """Compare the credited seconds with the stored totals and sessions"""
+    conn = sqlite3.connect(db_path)
+    total_seconds = conn.execute('SELECT COALESCE(SUM(total_seconds), 0) FROM tasks').fetchone()[0]
+    session_seconds = sum(int(ended_at - started_at) for started_at, ended_at in
+                          conn.execute('SELECT started_at, ended_at FROM sessions WHERE ended_at IS NOT NULL'))
+    open_sessions = conn.execute('SELECT COUNT(*) FROM sessions WHERE ended_at IS NULL').fetchone()[0]
+    running_tasks = conn.execute('SELECT COUNT(*) FROM tasks WHERE is_running = 1').fetchone()[0]
+    session_count = conn.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+    conn.close()
+
+    print(f"Sessions:             {session_count}")
+    print(f"Credited by pauses:   {credited}s")
+    print(f"Sum of task totals:   {total_seconds}s")
+    print(f"Sum of session times: {session_seconds}s")
+    print(f"Open sessions:        {open_sessions}")
+    print(f"Tasks still running:  {running_tasks}")
+
+    return (credited == total_seconds == session_seconds
+            and open_sessions == 0 and running_tasks == 0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multi-process write contention test")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--operations", type=int, default=300, help="operations per process")
+    parser.add_argument("--tasks", type=int, default=5, help="shared tasks (fewer means more contention)")
+    parser.add_argument("--db", help="database file (default: a temporary file)")
+    args = parser.parse_args(argv)
+
+    temp_dir = None
+    db_path = args.db
+    if db_path is None:
+        temp_dir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(temp_dir.name, 'stress.db')
+
+    create_database(db_path, verbose=False)
+    db = DatabaseManager(db_path, verbose=False)
+    project_id = db.add_project("Stress test")
+    task_ids = [db.add_task(project_id, f"Task {i + 1}") for i in range(args.tasks)]
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(db_path, worker_id, args.operations, project_id, task_ids, results))
+        for worker_id in range(args.processes)
+    ]
+
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - start
+
+    # A worker that died (e.g. on an unexpected exception) reports nothing
+    crashed = sum(1 for process in processes if process.exitcode != 0)
+    outcomes = [results.get() for _ in range(len(processes) - crashed)]
+
+    credited = sum(outcome[0] for outcome in outcomes)
+    lock_errors = sum(outcome[1] for outcome in outcomes)
+    operations = sum(outcome[2] for outcome in outcomes)
+
+    print(f"{args.processes} processes, {operations} operations in {elapsed:.2f}s "
+          f"({operations / elapsed:.0f} ops/s)")
+    print(f"Lock errors:          {lock_errors}")
+    print(f"Crashed workers:      {crashed}")
+    consistent = check_database(db_path, credited)
+
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+    if consistent and lock_errors == 0 and crashed == 0:
+        print("OK")
+        return 0
+    print("FAILED")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,856 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from database_manager import BULK_CHUNK_SIZE, DatabaseManager, is_busy_error
+
+# ===== IN-MEMORY WORKING SET =====
+#
+# With the working set a workspace is read into memory once when it is
+# opened. Reads are answered from memory and writes change memory at once,
+# so nothing the user clicks waits for the disk. Every write is also
+# appended to a journal file next to the database (<db>-writes.jsonl) that
+# a background thread applies to SQLite in one transaction per batch.
+#
+# Durability: the journal goes to the OS with every write, so a crash of
+# the app loses nothing; it is replayed the next time the database is
+# opened (records up to the sequence number stored with the last applied
+# batch are skipped). Writes reach the database file itself at most
+# FLUSH_INTERVAL seconds after they were made.
+#
+# The same thread reads what other programs commit; the window's thread
+# only merges the rows it has read, so it never waits for the disk.
+#
+# Turned on per workspace (Settings > Keep Workspace in Memory).
+
+WORKING_SET_SETTING = 'working_set'
+JOURNAL_SEQ_SETTING = 'journal_applied_seq'
+JOURNAL_SUFFIX = '-writes.jsonl'
+
+FLUSH_INTERVAL = 1.0  # Seconds between flushes
+FLUSH_BATCH_SIZE = 500  # Pending writes that start a flush early
+ID_BLOCK_SIZE = 100  # Ids claimed at a time for new projects and tasks
+
+# Columns of a task in memory
+TASK_PROJECT, TASK_NAME, TASK_SECONDS, TASK_FINISHED, TASK_RUNNING, TASK_CREATED = range(6)
+
+
+def journal_path(db_path):
+    """Journal file of a database"""
+    return f"{db_path}{JOURNAL_SUFFIX}"
+
+
+def read_journal(path):
+    """Read (seq, op, args) records, stopping at a line cut short by a crash"""
+    records = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    seq, op, args = json.loads(line)
+                except ValueError:
+                    break
+                records.append((seq, op, args))
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _insert_project(db, project_id, name, created_at):
+    db.run_write(lambda cursor: cursor.execute(
+        'INSERT INTO projects (id, name, created_at) VALUES (?, ?, ?)', (project_id, name, created_at)))
+
+
+def _insert_task(db, task_id, project_id, name, created_at):
+    db.run_write(lambda cursor: cursor.execute(
+        'INSERT INTO tasks (id, project_id, name, created_at) VALUES (?, ?, ?, ?)',
+        (task_id, project_id, name, created_at)))
+
+
+def _rename_tasks(db, new_names):
+    # JSON has no integer keys, the names travel as (task_id, name) pairs
+    DatabaseManager.rename_tasks(db, dict(new_names))
+
+
+# Journal op -> function(db, *args) making the write in SQLite. Inserts
+# carry the id and created_at handed out in memory, timer writes the time
+# of the click, so a replay writes exactly what was shown.
+JOURNAL_OPS = {
+    'insert_project': _insert_project,
+    'rename_project': DatabaseManager.rename_project,
+    'delete_project': DatabaseManager.delete_project,
+    'insert_task': _insert_task,
+    'update_task_time': DatabaseManager.update_task_time,
+    'finish_task': DatabaseManager.finish_task,
+    'reopen_task': DatabaseManager.reopen_task,
+    'rename_task': DatabaseManager.rename_task,
+    'delete_task': DatabaseManager.delete_task,
+    'finish_tasks': DatabaseManager.finish_tasks,
+    'reopen_tasks': DatabaseManager.reopen_tasks,
+    'rename_tasks': _rename_tasks,
+    'delete_tasks': DatabaseManager.delete_tasks,
+    'move_tasks': DatabaseManager.move_tasks,
+    'start_task': DatabaseManager.start_task,
+    'pause_task': DatabaseManager.pause_task,
+    'set_project_clients': DatabaseManager.set_project_clients,
+    'set_task_tags': DatabaseManager.set_task_tags,
+    'set_setting': DatabaseManager.set_setting,
+}
+
+
+def write_records(db, cursor, records):
+    """Make the records' writes inside the caller's run_batch transaction.
+
+    An exclusive start finding another timer already running in the file
+    (started by another program within the flush interval) is dropped, as
+    it would have been had it been written at once. Returns the project ids
+    of dropped starts, whose rows in memory no longer match the file.
+    """
+    lost_project_ids = set()
+    for seq, op, args in records:
+        result = JOURNAL_OPS[op](db, *args)
+        if op == 'start_task' and args[1] and result is None:
+            row = cursor.execute('SELECT project_id FROM tasks WHERE id = ?', (args[0],)).fetchone()
+            if row is not None:
+                lost_project_ids.add(row[0])
+            print(f"Dropped the start of task {args[0]}, another timer was started elsewhere meanwhile")
+    cursor.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                   (JOURNAL_SEQ_SETTING, str(records[-1][0])))
+    return lost_project_ids
+
+
+def write_records_one_by_one(db, records):
+    """Apply records in a transaction each, dropping those SQLite refuses.
+
+    Used when a whole batch fails (e.g. a task deleted by another program
+    meanwhile), so one bad record cannot hold up the rest of the journal.
+    Returns the project ids of dropped starts (see write_records).
+    """
+    lost_project_ids = set()
+    for record in records:
+        try:
+            lost_project_ids |= db.run_batch(lambda cursor: write_records(db, cursor, [record]))
+        except sqlite3.Error as e:
+            if isinstance(e, sqlite3.OperationalError) and is_busy_error(e):
+                raise
+            print(f"Dropped journaled {record[1]}{tuple(record[2])}: {e}")
+            db.run_write(lambda cursor: cursor.execute(
+                'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (JOURNAL_SEQ_SETTING, str(record[0]))))
+    return lost_project_ids
+
+
+def replay_journal(db):
+    """Apply what a crashed session left in the journal, return the last sequence number"""
+    path = journal_path(db.db_path)
+    records = read_journal(path)
+    applied = int(DatabaseManager.get_setting(db, JOURNAL_SEQ_SETTING, 0))
+    missing = [record for record in records if record[0] > applied]
+
+    if missing:
+        try:
+            db.run_batch(lambda cursor: write_records(db, cursor, missing))
+        except sqlite3.Error as e:
+            if isinstance(e, sqlite3.OperationalError) and is_busy_error(e):
+                raise
+            write_records_one_by_one(db, missing)
+        print(f"Replayed {len(missing)} journaled write(s) into {db.db_path}")
+
+    if os.path.exists(path):
+        os.remove(path)
+    return max([applied] + [record[0] for record in records])
+
+
+class LoadedRows:
+    """Rows of some (or all) projects read from SQLite, merged into memory by WorkingSetDatabase.apply_rows"""
+
+    def __init__(self):
+        self.projects = {}  # id -> [name, created_at]
+        self.tasks = {}  # id -> [project_id, name, total_seconds, is_finished, is_running, created_at]
+        self.open_sessions = {}  # task id -> started_at
+        self.last_ended = {}  # task id -> end of its latest closed session
+        self.task_tags = {}  # task id -> set of lower-case tag names
+        self.project_clients = {}  # project id -> set of lower-case client names
+        self.tags = {}  # lower-case name -> (id, name), always all of them
+        self.clients = {}
+
+
+def read_rows(cursor, project_ids=None):
+    """Read projects (all, or the given ids) with their tasks, sessions and links into LoadedRows"""
+    rows = LoadedRows()
+    if project_ids is None:
+        filters = [('', [])]
+    else:
+        project_ids = list(project_ids)
+        filters = []
+        for start in range(0, len(project_ids), BULK_CHUNK_SIZE):
+            chunk = project_ids[start:start + BULK_CHUNK_SIZE]
+            filters.append((f'IN ({", ".join("?" * len(chunk))})', chunk))
+
+    for id_filter, params in filters:
+        def where(column):
+            return f'AND {column} {id_filter}' if id_filter else ''
+
+        cursor.execute(f'SELECT id, name, created_at FROM projects WHERE 1 {where("id")}', params)
+        for project_id, name, created_at in cursor.fetchall():
+            rows.projects[project_id] = [name, created_at]
+
+        cursor.execute(f'''
+            SELECT id, project_id, name, total_seconds, is_finished, is_running, created_at
+            FROM tasks WHERE 1 {where("project_id")}
+        ''', params)
+        for task_id, *task in cursor.fetchall():
+            rows.tasks[task_id] = task
+
+        cursor.execute(f'''
+            SELECT s.task_id, s.started_at
+            FROM sessions s
+            JOIN tasks t ON t.id = s.task_id
+            WHERE s.ended_at IS NULL {where("t.project_id")}
+        ''', params)
+        rows.open_sessions.update(cursor.fetchall())
+
+        cursor.execute(f'''
+            SELECT s.task_id, MAX(s.ended_at)
+            FROM sessions s
+            JOIN tasks t ON t.id = s.task_id
+            WHERE s.ended_at IS NOT NULL {where("t.project_id")}
+            GROUP BY s.task_id
+        ''', params)
+        rows.last_ended.update(cursor.fetchall())
+
+        cursor.execute(f'''
+            SELECT tt.task_id, lower(g.name)
+            FROM task_tags tt
+            JOIN tags g ON g.id = tt.tag_id
+            JOIN tasks t ON t.id = tt.task_id
+            WHERE 1 {where("t.project_id")}
+        ''', params)
+        for task_id, key in cursor.fetchall():
+            rows.task_tags.setdefault(task_id, set()).add(key)
+
+        cursor.execute(f'''
+            SELECT pc.project_id, lower(c.name)
+            FROM project_clients pc
+            JOIN clients c ON c.id = pc.client_id
+            WHERE 1 {where("pc.project_id")}
+        ''', params)
+        for project_id, key in cursor.fetchall():
+            rows.project_clients.setdefault(project_id, set()).add(key)
+
+    # Few enough to always read whole
+    rows.tags = {name.lower(): (tag_id, name) for tag_id, name in cursor.execute('SELECT id, name FROM tags')}
+    rows.clients = {name.lower(): (client_id, name) for client_id, name in cursor.execute('SELECT id, name FROM clients')}
+    return rows
+
+
+def open_database(db_path, verbose=True, pool_size=0):
+    """Open a workspace's database, with a working set if the workspace is set up for one"""
+    db = DatabaseManager(db_path, verbose, pool_size=pool_size)
+    replay_journal(db)
+    if db.get_setting(WORKING_SET_SETTING, '0') != '1':
+        return db
+    db.close()
+    return WorkingSetDatabase(db_path, verbose=False, pool_size=pool_size)
+
+
+class WorkingSetDatabase(DatabaseManager):
+    """DatabaseManager answering from memory, with write-behind through a journal.
+
+    The reads and writes the window uses are served from memory; reports,
+    exports and imports flush first and then use SQLite as usual. Memory
+    is only read and changed on the thread that owns the window, the
+    flusher thread only touches the journal and SQLite.
+
+    New projects and tasks take ids from blocks claimed in sqlite_sequence,
+    so rows other programs add meanwhile never collide with them. What
+    other programs commit is read by the flusher thread and merged into
+    memory by take_changed_project_ids (polled by the ChangeWatcher).
+    """
+
+    def __init__(self, db_path, verbose=True, flush_interval=FLUSH_INTERVAL, **kwargs):
+        super().__init__(db_path, verbose, **kwargs)
+        self.flush_interval = flush_interval
+        self.seq = replay_journal(self)
+
+        self.journal_lock = threading.Lock()  # pending and the journal file
+        self.flush_lock = threading.Lock()  # one flush at a time
+        # synced_watermark and the change bookkeeping; only ever held for a
+        # few assignments, the window's thread takes it every watcher tick
+        self.sync_lock = threading.Lock()
+        self.pending = []
+        self.applied_seq = self.seq  # Last record committed to the file
+        self.journal_file = open(journal_path(self.db_path), 'a', encoding='utf-8')
+
+        # Rows of projects changed elsewhere, read by the flusher for the window's thread
+        self.changes = queue.Queue()
+        self.changes_waiting = False  # A read is queued and not merged yet
+        self.stale_project_ids = set()  # Memory known to differ from the file (dropped starts)
+
+        start = time.perf_counter()
+        self.load()
+        self.free_ids = {'projects': [], 'tasks': []}
+        for table in self.free_ids:
+            self.reserve_ids(table)
+        print(f"Loaded {len(self.tasks)} tasks of {self.db_path} into memory "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        self.stopping = threading.Event()
+        self.wake = threading.Event()
+        self.flusher = threading.Thread(target=self.flush_loop, name="journal-flusher", daemon=True)
+        self.flusher.start()
+
+    # ===== LOADING =====
+
+    def load(self):
+        """Read the whole workspace into memory in one read transaction"""
+        self.projects = {}
+        self.tasks = {}
+        self.project_tasks = {}  # project id -> set of task ids
+        self.running_ids = set()
+        self.open_sessions = {}
+        self.last_ended = {}
+        self.task_tags = {}
+        self.project_clients = {}
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            rows = read_rows(cursor)
+            self.settings = dict(cursor.execute('SELECT key, value FROM settings'))
+            self.synced_watermark = self.get_change_watermark(conn)
+            conn.commit()
+        finally:
+            conn.close()
+        self.apply_rows(rows)
+
+        # Rows read before this load are older than what it just read
+        while not self.changes.empty():
+            self.changes.get_nowait()
+        self.changes_waiting = False
+
+    def apply_rows(self, rows, project_ids=()):
+        """Replace the given projects in memory with rows read from the file"""
+        for project_id in project_ids:
+            self.forget_project(project_id)
+        for project_id, project in rows.projects.items():
+            self.projects[project_id] = project
+            self.project_tasks.setdefault(project_id, set())
+        for task_id, task in rows.tasks.items():
+            self.put_task(task_id, task)
+        self.open_sessions.update(rows.open_sessions)
+        self.last_ended.update(rows.last_ended)
+        for task_id, keys in rows.task_tags.items():
+            self.task_tags.setdefault(task_id, set()).update(keys)
+        for project_id, keys in rows.project_clients.items():
+            self.project_clients.setdefault(project_id, set()).update(keys)
+        self.tags = rows.tags
+        self.clients = rows.clients
+
+    def put_task(self, task_id, task):
+        """Store a task row (moving it if it was held under another project)"""
+        if task_id in self.tasks:
+            self.project_tasks[self.tasks[task_id][TASK_PROJECT]].discard(task_id)
+        self.tasks[task_id] = task
+        self.project_tasks.setdefault(task[TASK_PROJECT], set()).add(task_id)
+        if task[TASK_RUNNING]:
+            self.running_ids.add(task_id)
+        else:
+            self.running_ids.discard(task_id)
+
+    def forget_task(self, task_id):
+        """Drop a task and everything hanging off it (like ON DELETE CASCADE)"""
+        task = self.tasks.pop(task_id, None)
+        if task is None:
+            return
+        self.project_tasks[task[TASK_PROJECT]].discard(task_id)
+        self.running_ids.discard(task_id)
+        self.open_sessions.pop(task_id, None)
+        self.last_ended.pop(task_id, None)
+        self.task_tags.pop(task_id, None)
+
+    def forget_project(self, project_id):
+        """Drop a project with its tasks"""
+        for task_id in list(self.project_tasks.get(project_id, ())):
+            self.forget_task(task_id)
+        self.project_tasks.pop(project_id, None)
+        self.projects.pop(project_id, None)
+        self.project_clients.pop(project_id, None)
+
+    def reserve_ids(self, table):
+        """Claim the next ID_BLOCK_SIZE ids of a table for rows added in memory"""
+        def reserve(cursor):
+            cursor.execute(f'''
+                SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),
+                           COALESCE((SELECT MAX(id) FROM {table}), 0))
+            ''', (table,))
+            first_id = cursor.fetchone()[0] + 1
+            cursor.execute('DELETE FROM sqlite_sequence WHERE name = ?', (table,))
+            cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)',
+                           (table, first_id + ID_BLOCK_SIZE - 1))
+            return first_id
+
+        first_id = self.run_write(reserve)
+        # Handed out from the end of the list, lowest first
+        self.free_ids[table] = list(range(first_id + ID_BLOCK_SIZE - 1, first_id - 1, -1))
+
+    def next_id(self, table):
+        """Take an id for a new row"""
+        if not self.free_ids[table]:
+            self.reserve_ids(table)
+        return self.free_ids[table].pop()
+
+    # ===== JOURNAL AND FLUSHING =====
+
+    def journal(self, op, *args):
+        """Append a write to the journal, for the flusher to apply to SQLite"""
+        with self.journal_lock:
+            self.seq += 1
+            record = (self.seq, op, list(args))
+            self.journal_file.write(json.dumps(record) + '\n')
+            self.journal_file.flush()
+            self.pending.append(record)
+            if len(self.pending) >= FLUSH_BATCH_SIZE:
+                self.wake.set()
+
+    def flush(self):
+        """Apply the pending writes to SQLite in one transaction, return how many"""
+        with self.flush_lock:
+            with self.journal_lock:
+                records = list(self.pending)
+            if not records:
+                return 0
+
+            def apply(cursor):
+                before = self.get_change_watermark(cursor.connection)
+                lost_project_ids = write_records(self, cursor, records)
+                return before, self.get_change_watermark(cursor.connection), lost_project_ids
+
+            try:
+                before, after, lost_project_ids = self.run_batch(apply)
+            except sqlite3.Error as e:
+                if isinstance(e, sqlite3.OperationalError) and is_busy_error(e):
+                    raise
+                print(f"Journal batch failed ({e}), applying its writes one at a time")
+                before = after = None
+                lost_project_ids = write_records_one_by_one(self, records)
+
+            with self.sync_lock:
+                # Only our own commits since the last sync: memory still matches
+                # (synced_watermark only grows meanwhile, as changes are merged)
+                if before is not None and before <= self.synced_watermark:
+                    self.synced_watermark = max(self.synced_watermark, after)
+                self.applied_seq = records[-1][0]
+                self.stale_project_ids |= lost_project_ids
+
+            with self.journal_lock:
+                del self.pending[:len(records)]
+                self.rewrite_journal()
+            return len(records)
+
+    def rewrite_journal(self):
+        """Cut the applied records from the journal file (journal_lock held)"""
+        if not self.pending:
+            self.journal_file.seek(0)
+            self.journal_file.truncate()
+            return
+
+        # Writes made during the flush stay, the file is replaced in one step
+        path = journal_path(self.db_path)
+        with open(f"{path}.tmp", 'w', encoding='utf-8') as f:
+            f.writelines(json.dumps(record) + '\n' for record in self.pending)
+        self.journal_file.close()
+        os.replace(f"{path}.tmp", path)
+        self.journal_file = open(path, 'a', encoding='utf-8')
+
+    def flush_loop(self):
+        """Flusher thread: flush and read changes made elsewhere every flush_interval (or when woken)"""
+        while not self.stopping.is_set():
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            try:
+                count = self.flush()
+                self.read_changes()
+            except Exception as e:
+                print(f"Journal flush failed, retrying: {e}")
+                continue
+            if count:
+                print(f"Flushed {count} journaled write(s)")
+
+    def read_changes(self):
+        """Flusher thread: read the projects other programs changed, for take_changed_project_ids"""
+        with self.sync_lock:
+            if self.changes_waiting:
+                return
+            since = self.synced_watermark
+            stale_ids = set(self.stale_project_ids)
+            # Every record up to here is in the file before the read starts
+            read_seq = self.applied_seq
+
+        conn = self.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            watermark = self.get_change_watermark(conn)
+            if watermark <= since and not stale_ids:
+                return
+            project_ids = DatabaseManager.get_changed_project_ids(self, since, conn) | stale_ids
+            rows = read_rows(cursor, project_ids)
+        finally:
+            conn.close()  # Ends the read transaction
+
+        with self.sync_lock:
+            self.stale_project_ids -= stale_ids
+            self.changes_waiting = True
+        self.changes.put((project_ids, rows, watermark, read_seq))
+
+    def close(self):
+        """Stop the flusher, write everything still pending and close the journal"""
+        if self.flusher is not None:
+            self.stopping.set()
+            self.wake.set()
+            self.flusher.join()
+            self.flusher = None
+
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                # Kept in the journal, replayed the next time the database is opened
+                print(f"Could not flush the journal on close: {e}")
+            self.journal_file.close()
+            if not self.pending:
+                os.remove(journal_path(self.db_path))
+        super().close()
+
+    # ===== CHANGE TRACKING METHODS =====
+
+    def get_changed_project_ids(self, watermark, conn=None):
+        """Something was committed: have the flusher read it now.
+
+        Nothing is read here, on the window's thread; the projects come back
+        through take_changed_project_ids on a later ChangeWatcher tick.
+        """
+        self.wake.set()
+        return set()
+
+    def take_changed_project_ids(self):
+        """Merge rows the flusher read of projects changed elsewhere, return their ids"""
+        try:
+            project_ids, rows, watermark, read_seq = self.changes.get_nowait()
+        except queue.Empty:
+            return set()
+
+        with self.sync_lock:
+            self.changes_waiting = False
+            if self.seq > read_seq:
+                # Written in memory after the read started, so these rows
+                # may be older than memory: have them read again
+                self.stale_project_ids |= project_ids
+                self.wake.set()
+                return set()
+            self.synced_watermark = max(self.synced_watermark, watermark)
+        # Memory is only touched on this thread, no lock needed
+        self.apply_rows(rows, project_ids)
+        return project_ids
+
+    # ===== READS FROM MEMORY =====
+
+    def project_order(self):
+        """Project ids ordered like get_all_projects (newest first)"""
+        return sorted(self.projects, key=lambda project_id: (self.projects[project_id][1], project_id), reverse=True)
+
+    def project_summary(self, project_id):
+        """Summary row of a project from memory"""
+        total_seconds = finished_count = running_count = 0
+        task_ids = self.project_tasks[project_id]
+        for task_id in task_ids:
+            task = self.tasks[task_id]
+            total_seconds += task[TASK_SECONDS]
+            finished_count += bool(task[TASK_FINISHED])
+            running_count += bool(task[TASK_RUNNING])
+        return (project_id, self.projects[project_id][0], total_seconds, len(task_ids),
+                finished_count, running_count)
+
+    def get_all_projects(self):
+        return [(project_id, self.projects[project_id][0]) for project_id in self.project_order()]
+
+    def get_project_summaries(self):
+        return [self.project_summary(project_id) for project_id in self.project_order()]
+
+    def get_project_summary(self, project_id):
+        if project_id not in self.projects:
+            return None
+        return self.project_summary(project_id)
+
+    def get_totals(self):
+        return (len(self.projects),
+                len(self.tasks),
+                sum(task[TASK_SECONDS] for task in self.tasks.values()),
+                sum(1 for task in self.tasks.values() if task[TASK_FINISHED]),
+                len(self.running_ids))
+
+    def get_tasks_for_project(self, project_id):
+        tasks = []
+        for task_id in sorted(self.project_tasks.get(project_id, ())):
+            task = self.tasks[task_id]
+            tasks.append((task_id, task[TASK_NAME], task[TASK_SECONDS], task[TASK_FINISHED], task[TASK_RUNNING]))
+        return tasks
+
+    def find_task(self, task):
+        if str(task).isdigit():
+            task_id = int(task)
+            if task_id not in self.tasks:
+                return None
+        else:
+            # Open tasks first, then the newest
+            matches = [task_id for task_id, row in self.tasks.items() if row[TASK_NAME].lower() == task.lower()]
+            if not matches:
+                return None
+            task_id = min(matches, key=lambda task_id: (self.tasks[task_id][TASK_FINISHED], -task_id))
+        row = self.tasks[task_id]
+        return (task_id, row[TASK_PROJECT], row[TASK_NAME], row[TASK_FINISHED])
+
+    def get_running_sessions(self):
+        sessions = []
+        for task_id, started_at in sorted(self.open_sessions.items(), key=lambda item: item[1]):
+            task = self.tasks[task_id]
+            if task[TASK_RUNNING]:
+                sessions.append((task_id, task[TASK_PROJECT], task[TASK_NAME], task[TASK_SECONDS], started_at))
+        return sessions
+
+    def get_last_worked(self, project_ids=None):
+        now = time.time()
+        last_worked = dict(self.last_ended)
+        last_worked.update((task_id, now) for task_id in self.open_sessions)
+        if project_ids is not None:
+            project_ids = set(project_ids)
+            last_worked = {task_id: worked for task_id, worked in last_worked.items()
+                           if self.tasks[task_id][TASK_PROJECT] in project_ids}
+        return last_worked
+
+    def get_running_task(self):
+        for task_id in self.running_ids:
+            task = self.tasks[task_id]
+            return (task_id, task[TASK_PROJECT], task[TASK_NAME])
+        return None
+
+    def get_clients(self):
+        return sorted(self.clients.values(), key=lambda client: client[1].lower())
+
+    def get_tags(self):
+        return sorted(self.tags.values(), key=lambda tag: tag[1].lower())
+
+    def get_project_clients(self, project_id):
+        return sorted((self.clients[key][1] for key in self.project_clients.get(project_id, ())), key=str.lower)
+
+    def get_task_tags(self, task_id):
+        return sorted((self.tags[key][1] for key in self.task_tags.get(task_id, ())), key=str.lower)
+
+    def get_task_ids_with_tag(self, tag_name):
+        key = tag_name.lower()
+        return {task_id for task_id, keys in self.task_tags.items() if key in keys}
+
+    def get_setting(self, key, default=None):
+        return self.settings.get(key, default)
+
+    # ===== READS FROM SQLITE (AFTER A FLUSH) =====
+
+    def get_filtered_totals(self, client=None, tag=None, start=None, end=None):
+        self.flush()
+        return super().get_filtered_totals(client, tag, start, end)
+
+    def iter_session_rows(self, since=None):
+        self.flush()
+        return super().iter_session_rows(since)
+
+    def iter_task_rows(self, batch_size=50000):
+        self.flush()
+        return super().iter_task_rows(batch_size)
+
+    def get_export_snapshot(self, snapshot_path):
+        self.flush()
+        return super().get_export_snapshot(snapshot_path)
+
+    def get_changes_since(self, watermark):
+        self.flush()
+        return super().get_changes_since(watermark)
+
+    def bulk_import(self, records, batch_size=50000):
+        self.flush()
+        result = super().bulk_import(records, batch_size)
+        with self.sync_lock:
+            self.load()
+        return result
+
+    def run_maintenance(self, should_continue=None):
+        self.flush()
+        return super().run_maintenance(should_continue)
+
+    # ===== WRITES TO MEMORY =====
+
+    def add_project(self, name):
+        project_id = self.next_id('projects')
+        created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        self.projects[project_id] = [name, created_at]
+        self.project_tasks[project_id] = set()
+        self.journal('insert_project', project_id, name, created_at)
+        return project_id
+
+    def rename_project(self, project_id, new_name):
+        if project_id in self.projects:
+            self.projects[project_id][0] = new_name
+        self.journal('rename_project', project_id, new_name)
+
+    def delete_project(self, project_id):
+        self.forget_project(project_id)
+        self.journal('delete_project', project_id)
+
+    def add_task(self, project_id, name):
+        if project_id not in self.projects:
+            raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+        task_id = self.next_id('tasks')
+        created_at = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        self.put_task(task_id, [project_id, name, 0, 0, 0, created_at])
+        self.journal('insert_task', task_id, project_id, name, created_at)
+        return task_id
+
+    def update_task_time(self, task_id, total_seconds):
+        if task_id in self.tasks:
+            self.tasks[task_id][TASK_SECONDS] = total_seconds
+        self.journal('update_task_time', task_id, total_seconds)
+
+    def close_session(self, task_id, now):
+        """Close a task's open session in memory, return the seconds credited"""
+        if task_id not in self.open_sessions:
+            return 0
+        started_at = self.open_sessions.pop(task_id)
+        ended_at = max(now, started_at)
+        credited = int(ended_at - started_at)
+        self.tasks[task_id][TASK_SECONDS] += credited
+        self.last_ended[task_id] = max(self.last_ended.get(task_id, ended_at), ended_at)
+        return credited
+
+    def set_finished(self, task_id, now):
+        """Finish a task in memory"""
+        if task_id in self.tasks:
+            self.close_session(task_id, now)
+            self.tasks[task_id][TASK_FINISHED] = 1
+            self.tasks[task_id][TASK_RUNNING] = 0
+            self.running_ids.discard(task_id)
+
+    def finish_task(self, task_id, now=None):
+        now = now if now is not None else time.time()
+        self.set_finished(task_id, now)
+        self.journal('finish_task', task_id, now)
+
+    def reopen_task(self, task_id):
+        if task_id in self.tasks:
+            self.tasks[task_id][TASK_FINISHED] = 0
+        self.journal('reopen_task', task_id)
+
+    def rename_task(self, task_id, new_name):
+        if task_id in self.tasks:
+            self.tasks[task_id][TASK_NAME] = new_name
+        self.journal('rename_task', task_id, new_name)
+
+    def delete_task(self, task_id):
+        self.forget_task(task_id)
+        self.journal('delete_task', task_id)
+
+    def finish_tasks(self, task_ids, now=None):
+        task_ids = list(task_ids)
+        now = now if now is not None else time.time()
+        for task_id in task_ids:
+            self.set_finished(task_id, now)
+        self.journal('finish_tasks', task_ids, now)
+
+    def reopen_tasks(self, task_ids):
+        task_ids = list(task_ids)
+        for task_id in task_ids:
+            if task_id in self.tasks:
+                self.tasks[task_id][TASK_FINISHED] = 0
+        self.journal('reopen_tasks', task_ids)
+
+    def rename_tasks(self, new_names):
+        for task_id, name in new_names.items():
+            if task_id in self.tasks:
+                self.tasks[task_id][TASK_NAME] = name
+        self.journal('rename_tasks', list(new_names.items()))
+
+    def delete_tasks(self, task_ids):
+        task_ids = list(task_ids)
+        for task_id in task_ids:
+            self.forget_task(task_id)
+        self.journal('delete_tasks', task_ids)
+
+    def move_tasks(self, task_ids, project_id):
+        task_ids = [task_id for task_id in task_ids if task_id in self.tasks]
+        if project_id not in self.projects:
+            raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+        source_ids = {self.tasks[task_id][TASK_PROJECT] for task_id in task_ids}
+        source_ids.discard(project_id)
+        for task_id in task_ids:
+            task = list(self.tasks[task_id])
+            task[TASK_PROJECT] = project_id
+            self.put_task(task_id, task)
+        self.journal('move_tasks', task_ids, project_id)
+        return source_ids
+
+    def start_task(self, task_id, exclusive=False, started_at=None):
+        if task_id in self.open_sessions:
+            return self.open_sessions[task_id]
+        if task_id not in self.tasks:
+            raise sqlite3.IntegrityError("FOREIGN KEY constraint failed")
+        if exclusive and self.running_ids - {task_id}:
+            return None
+
+        session_start = started_at if started_at is not None else time.time()
+        self.open_sessions[task_id] = session_start
+        self.tasks[task_id][TASK_RUNNING] = 1
+        self.running_ids.add(task_id)
+        # The file decides again when it is written, see write_records
+        self.journal('start_task', task_id, exclusive, session_start)
+        return session_start
+
+    def pause_task(self, task_id, now=None):
+        if task_id not in self.open_sessions and task_id not in self.running_ids:
+            return 0  # Nothing to pause, nothing to journal
+        now = now if now is not None else time.time()
+        credited = self.close_session(task_id, now)
+        self.tasks[task_id][TASK_RUNNING] = 0
+        self.running_ids.discard(task_id)
+        self.journal('pause_task', task_id, now)
+        return credited
+
+    def set_links(self, names_by_key, links, owner_id, names):
+        """Make an owner's links exactly the given names in memory (see DatabaseManager._set_links)"""
+        keys = {}
+        for name in names:
+            if name.strip():
+                keys.setdefault(name.strip().lower(), name.strip())
+        for key, name in keys.items():
+            if key not in names_by_key:
+                # SQLite hands out the next id too, unless another program adds one first
+                names_by_key[key] = (max((row[0] for row in names_by_key.values()), default=0) + 1, name)
+        links[owner_id] = set(keys)
+
+    def set_project_clients(self, project_id, client_names):
+        if project_id not in self.projects:
+            return
+        client_names = list(client_names)
+        self.set_links(self.clients, self.project_clients, project_id, client_names)
+        self.journal('set_project_clients', project_id, client_names)
+
+    def set_task_tags(self, task_id, tag_names):
+        if task_id not in self.tasks:
+            return
+        tag_names = list(tag_names)
+        self.set_links(self.tags, self.task_tags, task_id, tag_names)
+        self.journal('set_task_tags', task_id, tag_names)
+
+    def set_setting(self, key, value):
+        self.settings[key] = str(value)
+        self.journal('set_setting', key, str(value))
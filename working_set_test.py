@@ -0,0 +1,148 @@
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from database_manager import DatabaseManager
+from working_set import WORKING_SET_SETTING, WorkingSetDatabase, journal_path, open_database
+
+# ===== WORKING SET LATENCY AND CRASH TEST =====
+#
+# 1. Times the app's interactive writes (start, pause, rename, finish,
+#    reopen) against the same database written directly and through the
+#    working set.
+# 2. Makes the same writes in a child process that is killed before its
+#    journal is flushed, opens the database again and checks that the
+#    replayed database matches what the child had in memory, row for row
+#    (credited time and session times included).
+#
+#   python working_set_test.py --tasks 5000 --operations 500
+
+
+# Clock of the crash runs: one simulated minute per write, so the child
+# and the reference credit exactly the same seconds
+CRASH_CLOCK_START = 1700000000.0
+
+
+def timer_operations(db, task_ids, operations, seed, clock_start=None):
+    """Run random interactive writes, return the latency of each (seconds).
+
+    Timer writes are stamped clock_start + one minute per write, or with
+    the real time when clock_start is None.
+    """
+    rng = random.Random(seed)
+    latencies = []
+    for i in range(operations):
+        task_id = rng.choice(task_ids)
+        roll = rng.random()
+        now = time.time() if clock_start is None else clock_start + i * 60
+        start = time.perf_counter()
+        if roll < 0.3:
+            db.start_task(task_id, started_at=now - rng.randint(1, 120))
+        elif roll < 0.6:
+            db.pause_task(task_id, now=now)
+        elif roll < 0.8:
+            db.rename_task(task_id, f"Task {task_id} ({i})")
+        elif roll < 0.9:
+            db.finish_task(task_id, now=now)
+        else:
+            db.reopen_task(task_id)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def describe(name, latencies):
+    """One line of latency statistics"""
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{name:<14} median {statistics.median(ordered) * 1000:7.3f} ms   "
+          f"p99 {p99 * 1000:7.3f} ms   max {ordered[-1] * 1000:7.3f} ms")
+
+
+def snapshot(db_path):
+    """Everything the writes can change, straight from SQLite"""
+    conn = sqlite3.connect(db_path)
+    tasks = conn.execute('SELECT id, project_id, name, total_seconds, is_finished, is_running FROM tasks ORDER BY id').fetchall()
+    sessions = conn.execute('SELECT task_id, started_at, ended_at FROM sessions ORDER BY id').fetchall()
+    conn.close()
+    return tasks, sessions
+
+
+def crash_child(db_path, operations, seed):
+    """Child process: write through a working set that never flushes, then die"""
+    db = WorkingSetDatabase(db_path, verbose=False, flush_interval=3600)
+    task_ids = list(db.tasks)
+    project_id = db.add_project("Added before the crash")
+    task_ids.append(db.add_task(project_id, "Added before the crash"))
+    timer_operations(db, task_ids, operations, seed, CRASH_CLOCK_START)
+    print(f"Child journaled {len(db.pending)} writes, crashing")
+    sys.stdout.flush()
+    os._exit(1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Working set latency and crash replay test")
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--operations", type=int, default=500)
+    parser.add_argument("--crash-child", metavar="DB", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.crash_child:
+        crash_child(args.crash_child, args.operations, seed=2)
+
+    temp_dir = tempfile.TemporaryDirectory()
+    db_path = os.path.join(temp_dir.name, 'working_set.db')
+    db = DatabaseManager(db_path, verbose=False)
+    db.bulk_import((f"Project {i % 50}", f"Task {i}", i, False) for i in range(args.tasks))
+    task_ids = [task_id for task_id, *_ in snapshot(db_path)[0]]
+
+    describe("Direct", timer_operations(db, task_ids, args.operations, seed=1))
+
+    db.set_setting(WORKING_SET_SETTING, '1')
+    db = open_database(db_path, verbose=False)
+    describe("Working set", timer_operations(db, task_ids, args.operations, seed=1))
+    start = time.perf_counter()
+    db.close()
+    print(f"Final flush took {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    # What the child process ends up with in memory, made by a clean run on a copy
+    expected_path = os.path.join(temp_dir.name, 'expected.db')
+    source = sqlite3.connect(db_path)
+    copy = sqlite3.connect(expected_path)
+    source.backup(copy)
+    source.close()
+    copy.close()
+    reference = WorkingSetDatabase(expected_path, verbose=False, flush_interval=3600)
+    reference_ids = list(reference.tasks)
+    project_id = reference.add_project("Added before the crash")
+    reference_ids.append(reference.add_task(project_id, "Added before the crash"))
+    timer_operations(reference, reference_ids, args.operations, seed=2, clock_start=CRASH_CLOCK_START)
+    reference.close()
+
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--crash-child", db_path,
+                    "--operations", str(args.operations)])
+    journal_left = os.path.exists(journal_path(db_path))
+    open_database(db_path, verbose=False).close()
+
+    tasks, sessions = snapshot(db_path)
+    expected_tasks, expected_sessions = snapshot(expected_path)
+    consistent = journal_left and tasks == expected_tasks and sessions == expected_sessions
+    print(f"Journal left by the crash: {journal_left}")
+    print(f"Tasks after replay:        {len(tasks)} (expected {len(expected_tasks)})")
+    print(f"Sessions after replay:     {len(sessions)} (expected {len(expected_sessions)})")
+
+    temp_dir.cleanup()
+    if consistent:
+        print("OK")
+        return 0
+    print("FAILED")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+from collections import OrderedDict
+
+from database_manager import DEFAULT_DB_PATH
+
+# ===== WORKSPACE REGISTRY =====
+
+DEFAULT_WORKSPACE = 'Default'
+REGISTRY_FILE = 'workspaces.json'
+
+
+def config_dir():
+    """Per-user folder for the app's own files (TIMETRACKER_CONFIG_DIR overrides it)"""
+    override = os.environ.get('TIMETRACKER_CONFIG_DIR')
+    if override:
+        return override
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    return os.path.join(base, 'TimeTracker')
+
+
+class WorkspaceRegistry:
+    """Named database files, stored as JSON in the user's config folder.
+
+    Paths are kept absolute so a workspace means the same file whatever
+    the working directory. The Default workspace always exists and points
+    at DEFAULT_DB_PATH.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(config_dir(), REGISTRY_FILE)
+        self.workspaces = OrderedDict([(DEFAULT_WORKSPACE, DEFAULT_DB_PATH)])
+        self.current = DEFAULT_WORKSPACE
+        self.load()
+
+    def load(self):
+        """Read the registry file (a missing or broken file leaves just Default)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Could not read workspaces from {self.path}: {e}")
+            return
+
+        for name, db_path in data.get('workspaces', {}).items():
+            if name != DEFAULT_WORKSPACE:
+                self.workspaces[name] = os.path.abspath(db_path)
+        if data.get('current') in self.workspaces:
+            self.current = data['current']
+
+    def save(self):
+        """Write the registry file (replaced in one step, never half-written)"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Default is not stored, it follows the program if that is moved
+        workspaces = {name: db_path for name, db_path in self.workspaces.items() if name != DEFAULT_WORKSPACE}
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'current': self.current, 'workspaces': workspaces}, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def names(self):
+        """Workspace names in the order they were added"""
+        return list(self.workspaces)
+
+    def db_path(self, name):
+        """Database file of a workspace (KeyError if unknown)"""
+        return self.workspaces[name]
+
+    def add(self, name, db_path):
+        """Register a database file under a new name"""
+        name = name.strip()
+        if not name:
+            raise ValueError("Workspace name cannot be empty")
+        if name in self.workspaces:
+            raise ValueError(f"A workspace named '{name}' already exists")
+        self.workspaces[name] = os.path.abspath(db_path)
+        self.save()
+
+    def remove(self, name):
+        """Forget a workspace (its database file is kept)"""
+        if name == DEFAULT_WORKSPACE:
+            raise ValueError("The Default workspace cannot be removed")
+        del self.workspaces[name]
+        if self.current == name:
+            self.current = DEFAULT_WORKSPACE
+        self.save()
+
+    def set_current(self, name):
+        """Remember the workspace to open at the next start"""
+        if name not in self.workspaces:
+            raise KeyError(name)
+        self.current = name
+        self.save()
+
+
+# ===== RECENT WORKSPACE CACHE =====
+
+class WorkspaceCache:
+    """Least recently used cache of open workspaces.
+
+    put returns the entries pushed out, for the caller to close. Entries
+    for which can_evict returns False (e.g. with a running timer) are kept
+    even beyond the limit.
+    """
+
+    def __init__(self, size, can_evict=None):
+        self.size = size
+        self.can_evict = can_evict or (lambda entry: True)
+        self.entries = OrderedDict()
+
+    def put(self, name, entry):
+        """Add an entry as most recently used, return the evicted entries"""
+        self.entries[name] = entry
+        self.entries.move_to_end(name)
+
+        evicted = []
+        for old_name in list(self.entries)[:-1]:
+            if len(self.entries) <= self.size:
+                break
+            if self.can_evict(self.entries[old_name]):
+                evicted.append(self.entries.pop(old_name))
+        return evicted
+
+    def pop(self, name):
+        """Remove an entry, None if not cached"""
+        return self.entries.pop(name, None)
+
+    def values(self):
+        """All cached entries, least recently used first"""
+        return list(self.entries.values())